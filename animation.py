@@ -0,0 +1,51 @@
+import pygame
+from assets import load_image, has_display
+from blit_format import optimize
+
+class AnimationBank:
+    """Every frame of a sprite set in its original, mirrored and hit-flash versions, built once and shared.
+
+    Entities keep only a state name, frame index and facing/flash flags and look their Surface up here.
+    """
+    def __init__(self, frames):
+        self.frames = {}  # state -> (flipped, flash) -> list of Surfaces
+        for state, images in frames.items():
+            mirrored = [pygame.transform.flip(image, True, False) for image in images]
+            if has_display():
+                mirrored = [optimize(image) for image in mirrored]
+            self.frames[state] = {
+                (False, False): images,
+                (True, False): mirrored,
+                (False, True): [self.flash_frame(image) for image in images],
+                (True, True): [self.flash_frame(image) for image in mirrored],
+            }
+
+    def flash_frame(self, image):
+        """Half-transparent copy shown while the sprite flashes after taking a hit."""
+        flash_surface = image.copy()
+        if flash_surface.get_flags() & pygame.SRCALPHA:
+            flash_surface.fill((255, 255, 255, 128), special_flags=pygame.BLEND_RGBA_MULT)
+        else:
+            flash_surface.set_alpha(128)  # Solid or colorkeyed sprite: fade the whole surface instead
+        if has_display():
+            flash_surface = optimize(flash_surface)
+        return flash_surface
+
+    def frame(self, state, index, flipped=False, flash=False):
+        return self.frames[state][(flipped, flash)][index]
+
+    def frame_count(self, state):
+        return len(self.frames[state][(False, False)])
+
+# Banks shared by every entity using the same sprite set, keyed by (name, size)
+animation_banks = {}
+
+def load_animation_bank(name, paths, size):
+    """Return the shared bank for a sprite set, loading it on first use. paths maps state -> list of image paths."""
+    key = (name, size)
+    bank = animation_banks.get(key)
+    if bank is None:
+        frames = {state: [load_image(path, (size, size)) for path in state_paths] for state, state_paths in paths.items()}
+        bank = AnimationBank(frames)
+        animation_banks[key] = bank
+    return bank
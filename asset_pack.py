@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import mmap
+import struct
+import numpy as np
+import pygame
+
+# Pack file: header, JSON index, then the atlas pixels and the decoded sounds, back to back
+MAGIC = b'DPAK'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHI')  # magic, version, index length in bytes
+PACK_PATH = 'assets/baked.pak'
+ATLAS_WIDTH = 1024
+
+def image_key(path, size, mode):
+    """How an image request is named in the index; matches the asset cache's (path, size, mode) key."""
+    return f"{path}|{size[0]}x{size[1]}|{mode}" if size is not None else f"{path}||{mode}"
+
+def pack_frames(frames, width=ATLAS_WIDTH):
+    """Place (w, h) frames on shelves, tallest first; return their (x, y) positions and the atlas height."""
+    positions = [None] * len(frames)
+    x = y = shelf_height = 0
+    for index in sorted(range(len(frames)), key=lambda index: -frames[index][1]):
+        frame_width, frame_height = frames[index]
+        if x + frame_width > width:
+            x, y, shelf_height = 0, y + shelf_height, 0
+        positions[index] = (x, y)
+        x += frame_width
+        shelf_height = max(shelf_height, frame_height)
+    return positions, y + shelf_height
+
+def bake(out_path, image_keys, sound_paths, resource_path=lambda path: path):
+    """Pre-scale every (path, size, mode) image into one RGBA atlas and decode every sound to PCM, into one file.
+
+    Sounds are decoded with the running mixer's format, which the index records; without a mixer none are baked.
+    """
+    image_keys = sorted(set(image_keys), key=lambda key: image_key(*key))
+    frames = []
+    for path, size, mode in image_keys:
+        surface = pygame.image.load(resource_path(path))
+        if size is not None:
+            surface = pygame.transform.scale(surface, size)
+        frames.append(surface)
+    positions, atlas_height = pack_frames([frame.get_size() for frame in frames])
+
+    atlas = np.zeros((atlas_height, ATLAS_WIDTH, 4), dtype=np.uint8)
+    images = {}
+    for (path, size, mode), frame, (x, y) in zip(image_keys, frames, positions):
+        frame_width, frame_height = frame.get_size()
+        # Copy the pixels rather than blitting, so semi-transparent edges aren't blended with the empty atlas
+        pixels = np.frombuffer(pygame.image.tobytes(frame, 'RGBA'), dtype=np.uint8)
+        atlas[y:y + frame_height, x:x + frame_width] = pixels.reshape(frame_height, frame_width, 4)
+        images[image_key(path, size, mode)] = [x, y, frame_width, frame_height]
+
+    blobs = [atlas.tobytes()]
+    offset = len(blobs[0])
+    sounds = {}
+    mixer_format = pygame.mixer.get_init()
+    if mixer_format:
+        for path in sorted(set(sound_paths)):
+            raw = pygame.mixer.Sound(resource_path(path)).get_raw()
+            sounds[path] = [offset, len(raw)]
+            blobs.append(raw)
+            offset += len(raw)
+
+    index = json.dumps({
+        'atlas': [0, len(blobs[0]), ATLAS_WIDTH, atlas_height],
+        'images': images,
+        'mixer': list(mixer_format) if mixer_format else None,
+        'sounds': sounds,
+    }).encode()
+    with open(out_path, 'wb') as pack_file:
+        pack_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(index)))
+        pack_file.write(index)
+        for blob in blobs:
+            pack_file.write(blob)
+    return len(images), len(sounds), HEADER.size + len(index) + offset
+
+class AssetPack:
+    """A baked pack, memory-mapped: images are slices of one atlas and sounds are read straight from the PCM.
+
+    Requests the pack doesn't cover (a size changed since baking, a sound baked for another mixer
+    format) return None, and the asset cache decodes the original file instead.
+    """
+    def __init__(self, mapped, index, data_offset):
+        self.mapped = mapped  # Kept open while the atlas or sounds may still read from it
+        self.index = index
+        self.data_offset = data_offset
+        offset, length, width, height = index['atlas']
+        start = data_offset + offset
+        self.atlas = pygame.image.frombuffer(memoryview(mapped)[start:start + length], (width, height), 'RGBA')
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            self.atlas = self.atlas.convert_alpha()  # One conversion for every sprite
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as pack_file:
+            mapped = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) < HEADER.size:
+            raise ValueError(f"{path} is too short to be an asset pack")
+        magic, version, index_length = HEADER.unpack_from(mapped)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an asset pack")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has asset pack version {version}, expected {FORMAT_VERSION}")
+        index = json.loads(mapped[HEADER.size:HEADER.size + index_length])
+        return cls(mapped, index, HEADER.size + index_length)
+
+    def image(self, path, size, mode):
+        rect = self.index['images'].get(image_key(path, size, mode))
+        if rect is None:
+            return None
+        surface = self.atlas.subsurface(rect)
+        if mode == 'opaque' and pygame.display.get_surface() is not None:
+            surface = surface.convert()  # Opaque tiles blit faster without the alpha channel
+        return surface
+
+    def sound(self, path):
+        entry = self.index['sounds'].get(path)
+        if entry is None or pygame.mixer.get_init() != tuple(self.index['mixer'] or ()):
+            return None
+        start = self.data_offset + entry[0]
+        return pygame.mixer.Sound(buffer=self.mapped[start:start + entry[1]])
+
+def bake_game_assets(out_path=PACK_PATH):
+    """Build a game headless to find every image size it asks for, then bake those and the sound effects."""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    pygame.mixer.init()
+    from assets import asset_cache, resource_path
+    from game import Game
+    from sound_bank import SOUNDS
+
+    Game(1280, 720)  # Loads every sprite, tile and projectile frame at the sizes settings.py gives them
+    sound_paths = [path for path, max_voices, priority in SOUNDS.values()]
+    return bake(resource_path(out_path), list(asset_cache.images), sound_paths, resource_path)
+
+if __name__ == "__main__":
+    # python asset_pack.py [out.pak]   re-run after changing any sprite, sound or size in settings.py
+    out_path = sys.argv[1] if len(sys.argv) > 1 else PACK_PATH
+    image_count, sound_count, size = bake_game_assets(out_path)
+    print(f"Baked {image_count} images and {sound_count} sounds into {out_path} ({size / 1024:.0f} KB)")
@@ -0,0 +1,172 @@
+import pygame
+import sys
+import os
+from collections import OrderedDict
+from blit_format import optimize
+
+def resource_path(relative_path):
+    """ Get the absolute path to the resource, works for dev and for PyInstaller """
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+class NullSound:
+    """Stands in for pygame.mixer.Sound when the mixer isn't running, so game code can play sounds unconditionally."""
+    def play(self, *args, **kwargs):
+        return None
+
+    def stop(self):
+        pass
+
+    def set_volume(self, volume):
+        pass
+
+    def get_raw(self):
+        return b''
+
+null_sound = NullSound()
+
+def has_display():
+    """True once a display mode is set; surfaces can only be converted to the display format after that."""
+    return pygame.display.get_init() and pygame.display.get_surface() is not None
+
+class AssetCache:
+    """Decodes and scales every image and sound once, then hands out the shared Surface or Sound."""
+    def __init__(self):
+        self.images = {}  # (path, size, mode) -> Surface
+        self.sounds = {}  # path -> Sound
+        self.sound_bytes = {}  # path -> decoded PCM size
+        self.hits = 0
+        self.misses = 0
+        self.pack = None  # Baked AssetPack consulted before decoding an original file
+        self.packed = 0  # Misses served from the pack
+
+    def use_pack(self, path):
+        """Serve images and sounds from the baked pack at path when it exists; returns whether it was loaded."""
+        from asset_pack import AssetPack  # Only needed when a pack has been baked
+        path = resource_path(path)
+        if not os.path.exists(path):
+            return False
+        self.pack = AssetPack.load(path)
+        return True
+
+    def image(self, path, size=None, mode='alpha'):
+        """Return the image at path converted with mode ('alpha', 'opaque' or None) and scaled to size.
+
+        The Surface is shared, so callers must copy it before drawing on it.
+        """
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+        key = (path, size, mode)
+        surface = self.images.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        if self.pack is not None:
+            surface = self.pack.image(path, size, mode)
+            if surface is not None:
+                if mode == 'alpha' and has_display():
+                    surface = optimize(surface)
+                self.packed += 1
+                self.images[key] = surface
+                return surface
+        surface = pygame.image.load(resource_path(path))
+        if not has_display():
+            pass  # Headless: keep the decoded pixel format, nothing will be blitted to a screen
+        elif mode == 'alpha':
+            surface = surface.convert_alpha()
+        elif mode == 'opaque':
+            surface = surface.convert()
+        if size is not None:
+            surface = pygame.transform.scale(surface, size)
+        if mode == 'alpha' and has_display():
+            surface = optimize(surface)  # Plain, colorkeyed or RLE alpha, whichever draws it the same for less
+        self.images[key] = surface
+        return surface
+
+    def sound(self, path):
+        """Return the shared Sound for path, decoding it on first use (a silent stand-in without a mixer)."""
+        sound = self.sounds.get(path)
+        if sound is not None:
+            self.hits += 1
+            return sound
+        if not pygame.mixer.get_init():
+            return null_sound  # Not cached, so the real Sound loads once the mixer is up
+
+        self.misses += 1
+        sound = self.pack.sound(path) if self.pack is not None else None
+        if sound is not None:
+            self.packed += 1
+        else:
+            sound = pygame.mixer.Sound(resource_path(path))
+        self.sounds[path] = sound
+        self.sound_bytes[path] = len(sound.get_raw())
+        return sound
+
+    def bytes_held(self):
+        image_bytes = sum(surface.get_bytesize() * surface.get_width() * surface.get_height() for surface in self.images.values())
+        return image_bytes + sum(self.sound_bytes.values())
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'packed': self.packed,
+            'images': len(self.images),
+            'sounds': len(self.sounds),
+            'bytes': self.bytes_held(),
+        }
+
+    def report(self):
+        stats = self.stats()
+        return (f"Asset cache: {stats['hits']} hits, {stats['misses']} misses ({stats['packed']} from the baked pack), "
+                f"{stats['images']} images, {stats['sounds']} sounds, {stats['bytes'] / 1024:.0f} KB held")
+
+class RotationCache:
+    """Pre-rotated copies of shared surfaces keyed by (surface, quantized angle), least recently used evicted first."""
+    def __init__(self, angle_buckets=64, max_entries=512):
+        self.angle_buckets = angle_buckets  # 64 buckets = 5.625 degree steps, exact for the 8 aim directions
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (surface, bucket) -> rotated Surface
+        self.hits = 0
+        self.misses = 0
+
+    def quantize(self, angle):
+        return round(angle % 360 * self.angle_buckets / 360) % self.angle_buckets
+
+    def rotated(self, surface, angle):
+        """Return surface rotated by angle degrees (counter-clockwise), snapped to the nearest bucket."""
+        bucket = self.quantize(angle)
+        key = (surface, bucket)
+        rotated = self.entries.get(key)
+        if rotated is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return rotated
+
+        self.misses += 1
+        rotated = pygame.transform.rotate(surface, bucket * 360 / self.angle_buckets)
+        if has_display():
+            rotated = optimize(rotated)
+        self.entries[key] = rotated
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return rotated
+
+# Process-wide caches shared by every module
+asset_cache = AssetCache()
+rotation_cache = RotationCache()
+
+def load_image(path, size=None, mode='alpha'):
+    return asset_cache.image(path, size, mode)
+
+def load_sound(path):
+    return asset_cache.sound(path)
+
+def rotate_image(surface, angle):
+    return rotation_cache.rotated(surface, angle)
@@ -0,0 +1,236 @@
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import tracemalloc
+import statistics
+import numpy as np
+from generator import generate_layout, TERRAIN_TYPES, WALL
+from tilestore import TileStore
+
+MAP_SIZES = [100, 250, 500, 1000, 2000]
+
+# Fixed-seed gameplay scenarios: map size in tiles, enemies by kind and projectiles kept alive every tick
+SCENARIOS = {
+    '100x100 map, 5 goblins': {'map': 100, 'goblins': 5},
+    '300 goblins + 30 mages + 5 bosses': {'map': 200, 'goblins': 300, 'mages': 30, 'bosses': 5},
+    '200 live projectiles': {'map': 100, 'goblins': 20, 'projectiles': 200},
+}
+GENERATION_SCENARIO = '1000x1000 map generation'
+# Scenario phases and the Game.simulate / Game.draw profiler scopes each one adds up
+PHASE_SCOPES = {
+    'player_movement': ('player',),
+    'projectile_update': ('projectiles',),
+    'hit_resolution': ('hits',),
+    'enemy_update': ('pathfinding', 'enemies'),
+    'dungeon_draw': ('draw dungeon',),
+    'sprite_draw': ('queue sprites', 'draw sprites'),
+    'hud_draw': ('draw hud',),
+}
+PHASES = tuple(PHASE_SCOPES) + ('tick',)
+SCREEN_SIZE = (1280, 720)
+
+def time_generation(size, terrain, repeats=3, seed=0):
+    """Return the median time in milliseconds to generate a size x size map."""
+    timings = []
+    for repeat in range(repeats):
+        start = time.perf_counter()
+        generate_layout(size, size, terrain, seed + repeat)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def benchmark_generation():
+    """Print how generation time scales with map size for every terrain type."""
+    print(f"{'size':>11} " + " ".join(f"{terrain:>12}" for terrain in TERRAIN_TYPES))
+    for size in MAP_SIZES:
+        timings = [time_generation(size, terrain) for terrain in TERRAIN_TYPES]
+        print(f"{f'{size}x{size}':>11} " + " ".join(f"{timing:>10.1f}ms" for timing in timings))
+
+def benchmark_tile_store(size=2000):
+    """Compare the one-byte tile store against the old nested lists of '0'/'1' strings."""
+    store = TileStore.from_types(generate_layout(size, size, 'caves', 0), np.random.default_rng(0))
+
+    # The old layout: a list of lists of one-character strings (the per-cell Surface maps came on top of this)
+    tracemalloc.start()
+    start = time.perf_counter()
+    nested = [['1' if tile == WALL else '0' for tile in row] for row in store.types().tolist()]
+    nested_ms = (time.perf_counter() - start) * 1000
+    nested_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del nested
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'map.dng')
+        store.save(path)
+        start = time.perf_counter()
+        loaded = TileStore.load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        mapped = TileStore.load(path, use_mmap=True)
+        mmap_ms = (time.perf_counter() - start) * 1000
+        assert (loaded.data == store.data).all() and mapped.tile_type(5, 5) == store.tile_type(5, 5)
+        del loaded, mapped
+
+    print(f"{size}x{size} tiles")
+    print(f"  nested lists: {nested_bytes / 1e6:8.1f} MB, built in {nested_ms:7.1f} ms")
+    print(f"  tile store:   {store.nbytes() / 1e6:8.1f} MB, loaded in {load_ms:7.1f} ms, memory-mapped in {mmap_ms:.2f} ms")
+
+def percentiles(timings):
+    """p50/p95/p99 and max of a list of millisecond timings."""
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    return {'p50': round(float(p50), 4), 'p95': round(float(p95), 4), 'p99': round(float(p99), 4),
+            'max': round(float(max(timings)), 4)}
+
+def build_scenario(preset, seed):
+    """A Game on a fixed seed with the preset's enemies, and an unkillable player so every tick does full work."""
+    from game import Game  # Imported here so the generation benchmarks don't need pygame
+    from enemy import Enemy, RangedEnemy, BossMeleeEnemy
+
+    random.seed(seed)
+    game = Game(*SCREEN_SIZE, preset['map'], preset['map'], seed=seed)
+    game.player.max_health = game.player.health = 10 ** 9
+
+    # Not kept off the view like a round's spawns, so the crowd is on screen and drawn every frame
+    enemies = game.enemies
+    enemies.clear()
+    for _ in range(preset.get('mages', 0)):
+        RangedEnemy(*game.spawn_position(40), *SCREEN_SIZE, store=enemies)
+    for _ in range(preset.get('goblins', 0)):
+        Enemy(*game.spawn_position(40), store=enemies)
+    for _ in range(preset.get('bosses', 0)):
+        BossMeleeEnemy(*game.spawn_position(80), store=enemies)
+    for enemy in enemies:
+        enemy.health = 10 ** 9  # Nobody dies, so the enemy count stays fixed for the whole run
+    return game
+
+def refill_projectiles(game, count, rng):
+    """Fire player shots in random directions until count projectiles are live."""
+    import pygame
+    from projectile import ENERGY
+    from settings import TILE_SIZE
+
+    map_size = game.dungeon_width_in_tiles * TILE_SIZE
+    center = game.player.rect.center
+    while len(game.projectiles) < count:
+        angle = rng.uniform(0, 2 * np.pi)
+        game.projectiles.spawn(ENERGY, center[0], center[1], pygame.math.Vector2(np.cos(angle), np.sin(angle)), map_size, map_size)
+
+def run_scenario(preset, ticks=600, warmup=60, seed=0):
+    """Step a scenario with scripted input through Game.simulate and Game.draw and return
+    per-phase timing percentiles in milliseconds, read from the profiler scopes."""
+    import pygame
+    from game_clock import GameClock
+    from headless import RandomInput
+    from profiler import profiler
+
+    game = build_scenario(preset, seed)
+    screen = pygame.display.get_surface()
+    clock = GameClock()
+    script = RandomInput(random.Random(seed), action_chance=0)
+    rng = random.Random(seed)
+    timings = {phase: [] for phase in PHASES}
+    if not profiler.enabled:
+        profiler.toggle()
+
+    for tick in range(warmup + ticks):
+        if preset.get('projectiles'):
+            refill_projectiles(game, preset['projectiles'], rng)
+        keys, actions = script(tick)
+        profiler.phase_ms = {}  # Only this tick's scopes
+        tick_start = time.perf_counter()
+        game.simulate(keys, clock.now)
+        game.draw(screen)
+        tick_end = time.perf_counter()
+        clock.advance()
+
+        if tick >= warmup:
+            phase_ms = profiler.phase_ms
+            for phase, scopes in PHASE_SCOPES.items():
+                timings[phase].append(sum(phase_ms.get(scope, 0.0) for scope in scopes))
+            timings['tick'].append((tick_end - tick_start) * 1000)
+        profiler.end_frame()  # Forgets old trace events so a long run doesn't pile them up
+    profiler.toggle()
+
+    return {phase: percentiles(values) for phase, values in timings.items()}
+
+def run_generation_scenario(size=1000, repeats=10, seed=0):
+    timings = []
+    for repeat in range(repeats):
+        start = time.perf_counter()
+        generate_layout(size, size, 'structures', seed + repeat)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {'generation': percentiles(timings)}
+
+def benchmark_scenarios(ticks=600, seed=0):
+    """Run every scenario preset and return {scenario: {phase: {p50, p95, p99, max}}}."""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import pygame
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode(SCREEN_SIZE)  # Chunk surfaces are converted to the display format, like in the game
+
+    results = {}
+    for name, preset in SCENARIOS.items():
+        results[name] = run_scenario(preset, ticks, seed=seed)
+        print_scenario(name, results[name])
+    results[GENERATION_SCENARIO] = run_generation_scenario(seed=seed)
+    print_scenario(GENERATION_SCENARIO, results[GENERATION_SCENARIO])
+    pygame.quit()
+    return results
+
+def print_scenario(name, phases):
+    print(name)
+    for phase, stats in phases.items():
+        print(f"  {phase:>17}: p50 {stats['p50']:8.3f} ms  p95 {stats['p95']:8.3f} ms  p99 {stats['p99']:8.3f} ms")
+
+def compare(old_path, new_path, threshold=0.10):
+    """Print the p95 change of every scenario phase between two result files; return True if any regressed."""
+    with open(old_path) as file:
+        old = json.load(file)['scenarios']
+    with open(new_path) as file:
+        new = json.load(file)['scenarios']
+    regressed = False
+    for name, phases in new.items():
+        for phase, stats in phases.items():
+            before = old.get(name, {}).get(phase)
+            if before is None:
+                continue
+            change = (stats['p95'] - before['p95']) / before['p95'] if before['p95'] else 0.0
+            flag = '  REGRESSION' if change > threshold else ''
+            regressed |= bool(flag)
+            print(f"{name} / {phase}: p95 {before['p95']:.3f} -> {stats['p95']:.3f} ms ({change:+.0%}){flag}")
+    return regressed
+
+if __name__ == "__main__":
+    # python benchmark.py                      map generation and tile store tables
+    # python benchmark.py scenarios [out.json] fixed-seed gameplay scenarios, optionally saved as JSON
+    # python benchmark.py replay session.drec [out.json]  time a recorded session
+    # python benchmark.py compare old.json new.json
+    if len(sys.argv) > 1 and sys.argv[1] == 'scenarios':
+        results = {'seed': 0, 'scenarios': benchmark_scenarios()}
+        if len(sys.argv) > 2:
+            with open(sys.argv[2], 'w') as file:
+                json.dump(results, file, indent=2)
+            print(f"Wrote {sys.argv[2]}")
+    elif len(sys.argv) > 2 and sys.argv[1] == 'replay':
+        # A recorded session re-run headless, timed with the same percentiles as the scenarios
+        from headless import replay
+        step_timings = {}
+        summary = replay(sys.argv[2], step_timings)
+        if not summary['digest_matches']:
+            print(f"warning: {sys.argv[2]} DIVERGED from the recording")
+        name = os.path.basename(sys.argv[2])
+        phases = {phase: percentiles(timings) for phase, timings in step_timings.items()}
+        print_scenario(name, phases)
+        if len(sys.argv) > 3:
+            with open(sys.argv[3], 'w') as file:
+                json.dump({'scenarios': {name: phases}}, file, indent=2)
+            print(f"Wrote {sys.argv[3]}")
+    elif len(sys.argv) > 1 and sys.argv[1] == 'compare':
+        sys.exit(1 if compare(sys.argv[2], sys.argv[3]) else 0)
+    else:
+        benchmark_generation()
+        benchmark_tile_store()
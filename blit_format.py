@@ -0,0 +1,91 @@
+import os
+import timeit
+import numpy as np
+import pygame
+
+# Colours tried, in order, as the colorkey of a sprite with only fully opaque and fully clear pixels
+COLORKEY_CANDIDATES = ((255, 0, 255), (0, 255, 255), (1, 2, 3), (254, 1, 253))
+
+def alpha_kind(surface):
+    """'opaque' if every pixel is solid, 'binary' if each is either solid or clear, otherwise 'alpha'."""
+    if not surface.get_flags() & pygame.SRCALPHA:
+        return 'opaque'
+    alpha = pygame.surfarray.array_alpha(surface)
+    if alpha.min() == 255:
+        return 'opaque'
+    if np.isin(alpha, (0, 255)).all():
+        return 'binary'
+    return 'alpha'
+
+def optimize(surface):
+    """Return surface in the cheapest display format that draws it the same.
+
+    Solid sprites become plain display-format surfaces, sprites with only clear and solid pixels get
+    an RLE colorkey, and sprites with soft edges keep per-pixel alpha but RLE-encoded, so blits
+    skip the clear runs. The result is always a new surface; surface itself may be shared and is
+    left as it was. Needs a display mode to be set, since it converts to the display format.
+    """
+    colorkey = surface.get_colorkey()
+    if colorkey is not None:
+        keyed = surface.copy()
+        keyed.set_colorkey(colorkey, pygame.RLEACCEL)  # Already keyed, e.g. a rotated copy of a keyed sprite
+        return keyed
+    kind = alpha_kind(surface)
+    if kind == 'opaque':
+        return surface.convert()
+    if kind == 'binary':
+        colorkey = unused_color(surface)
+        if colorkey is not None:
+            keyed = surface.convert()
+            pixels = pygame.surfarray.pixels3d(keyed)
+            pixels[pygame.surfarray.array_alpha(surface) == 0] = colorkey
+            del pixels  # Unlock before the surface is RLE-encoded
+            keyed.set_colorkey(colorkey, pygame.RLEACCEL)
+            return keyed
+    encoded = surface.convert_alpha()
+    encoded.set_alpha(255, pygame.RLEACCEL)
+    return encoded
+
+def unused_color(surface):
+    """A colour no solid pixel of surface uses, or None if every candidate is taken."""
+    solid = pygame.surfarray.array3d(surface)[pygame.surfarray.array_alpha(surface) == 255]
+    for color in COLORKEY_CANDIDATES:
+        if not (solid == color).all(axis=1).any():
+            return color
+    return None
+
+def blit_cost(screen, surface, special_flags=0, number=2000):
+    """Microseconds per blit of surface onto screen."""
+    return timeit.timeit(lambda: screen.blit(surface, (100, 100), special_flags=special_flags), number=number) / number * 1e6
+
+def report(screen_size=(1280, 720)):
+    """Print, for every image a game loads, its alpha kind and blit cost before and after optimizing.
+
+    'before' is the plain convert_alpha() surface every sprite used to be; 'premultiplied' is that
+    surface blitted with BLEND_PREMULTIPLIED, the other way to cut per-pixel alpha cost.
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.display.init()
+    screen = pygame.display.set_mode(screen_size)
+    from assets import asset_cache, resource_path
+    from game import Game
+
+    Game(*screen_size)  # Loads every sprite and tile the game draws
+    print(f"{'image':>28} {'size':>9} {'kind':>7} {'before':>9} {'premultiplied':>13} {'after':>9}")
+    total_before = total_after = 0
+    for (path, size, mode), surface in sorted(asset_cache.images.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+        original = pygame.image.load(resource_path(path))
+        original = original.convert_alpha() if mode == 'alpha' else original.convert()
+        if size is not None:
+            original = pygame.transform.scale(original, size)
+        before = blit_cost(screen, original)
+        premultiplied = blit_cost(screen, original.premul_alpha(), pygame.BLEND_PREMULTIPLIED) if mode == 'alpha' else before
+        after = blit_cost(screen, surface)
+        total_before += before
+        total_after += after
+        print(f"{os.path.basename(path):>28} {'x'.join(map(str, surface.get_size())):>9} {alpha_kind(original):>7} "
+              f"{before:7.2f}us {premultiplied:11.2f}us {after:7.2f}us")
+    print(f"one blit of every image: {total_before:.1f}us before, {total_after:.1f}us after")
+
+if __name__ == "__main__":
+    report()
@@ -0,0 +1,81 @@
+import pygame
+from collections import OrderedDict
+from settings import TILE_SIZE
+from generator import WALL
+from tilestore import TYPE_MASK, VARIANT_MASK, VARIANT_SHIFT
+
+class ChunkCache:
+    """Pre-rendered floor and wall chunks, so drawing the map only blits the chunks on screen."""
+    def __init__(self, dungeon, chunk_tiles=16, max_chunks=48):
+        self.dungeon = dungeon
+        self.chunk_tiles = chunk_tiles  # Chunk width and height in tiles
+        self.chunk_pixels = chunk_tiles * TILE_SIZE
+        self.max_chunks = max_chunks  # Least recently drawn chunks are evicted past this
+        self.chunks = OrderedDict()  # (chunk_x, chunk_y) -> Surface, oldest first
+        self.chunks_x = (dungeon.tiles_x + chunk_tiles - 1) // chunk_tiles
+        self.chunks_y = (dungeon.tiles_y + chunk_tiles - 1) // chunk_tiles
+
+    def build_chunk(self, chunk_x, chunk_y):
+        """Bake the tiles of one chunk into a single surface."""
+        first_x = chunk_x * self.chunk_tiles
+        first_y = chunk_y * self.chunk_tiles
+        last_x = min(first_x + self.chunk_tiles, self.dungeon.tiles_x)
+        last_y = min(first_y + self.chunk_tiles, self.dungeon.tiles_y)
+
+        surface = pygame.Surface(((last_x - first_x) * TILE_SIZE, (last_y - first_y) * TILE_SIZE)).convert()
+        cells = self.dungeon.store.data[first_y:last_y, first_x:last_x]
+        tiles = (cells & TYPE_MASK).tolist()
+        variants = ((cells & VARIANT_MASK) >> VARIANT_SHIFT).tolist()
+        wall_tiles = self.dungeon.wall_tiles
+        ground_tiles = self.dungeon.ground_tiles
+        blits = []
+        for row_index, row in enumerate(tiles):
+            for col_index, tile in enumerate(row):
+                # Variants are stored 0-7 and wrap to however many images the tile type has
+                if tile == WALL:
+                    tile_image = wall_tiles[variants[row_index][col_index] % len(wall_tiles)]
+                else:
+                    tile_image = ground_tiles[variants[row_index][col_index] % len(ground_tiles)]
+                blits.append((tile_image, (col_index * TILE_SIZE, row_index * TILE_SIZE)))
+        surface.blits(blits, doreturn=False)
+        return surface
+
+    def get_chunk(self, chunk_x, chunk_y):
+        """Return the baked chunk surface, building it on a cache miss."""
+        key = (chunk_x, chunk_y)
+        surface = self.chunks.get(key)
+        if surface is None:
+            surface = self.build_chunk(chunk_x, chunk_y)
+            self.chunks[key] = surface
+            # Evict the least recently used chunks to keep memory bounded
+            while len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return surface
+
+    def invalidate_tile(self, tile_x, tile_y):
+        """Drop the chunk containing a changed tile so it is rebuilt on its next draw."""
+        self.chunks.pop((tile_x // self.chunk_tiles, tile_y // self.chunk_tiles), None)
+
+    def clear(self):
+        self.chunks.clear()
+
+    def draw(self, screen, camera_offset):
+        """Blit only the chunks that intersect the camera."""
+        screen_width, screen_height = screen.get_size()
+        first_x = max(0, int(camera_offset[0]) // self.chunk_pixels)
+        first_y = max(0, int(camera_offset[1]) // self.chunk_pixels)
+        last_x = min(self.chunks_x - 1, int(camera_offset[0] + screen_width - 1) // self.chunk_pixels)
+        last_y = min(self.chunks_y - 1, int(camera_offset[1] + screen_height - 1) // self.chunk_pixels)
+
+        # Never evict chunks that are on screen this frame (e.g. after resizing to a bigger display)
+        visible_chunks = (last_x - first_x + 1) * (last_y - first_y + 1)
+        if visible_chunks > self.max_chunks:
+            self.max_chunks = visible_chunks
+
+        for chunk_y in range(first_y, last_y + 1):
+            for chunk_x in range(first_x, last_x + 1):
+                screen_x = chunk_x * self.chunk_pixels - camera_offset[0]
+                screen_y = chunk_y * self.chunk_pixels - camera_offset[1]
+                screen.blit(self.get_chunk(chunk_x, chunk_y), (screen_x, screen_y))
@@ -0,0 +1,100 @@
+import pygame
+import numpy as np
+from settings import TILE_SIZE
+from tilestore import WALKABLE, BLOCKS_PROJECTILES
+
+# Tile byte -> blocked lookups for collides_rects: walls stop whatever lacks the walkable flag,
+# projectiles stop at tiles flagged as blocking them
+STOPS_MOVEMENT = (np.arange(256) & WALKABLE) == 0
+STOPS_PROJECTILES = (np.arange(256) & BLOCKS_PROJECTILES) != 0
+
+class CollisionGrid:
+    """Wall lookups by tile coordinates, read straight from the tile store's walkable flags."""
+    def __init__(self, store, tile_size=TILE_SIZE):
+        self.store = store
+        self.tiles_x = store.tiles_x
+        self.tiles_y = store.tiles_y
+        self.tile_size = tile_size
+        self.cells = store.cells  # Flat tile bytes, row-major
+        self.tiles = store.data.reshape(-1)  # The same bytes as an array, for batched lookups
+        self.version = 0  # Bumped on every change so dependent caches know to refresh
+
+    def mark_changed(self):
+        """Call after editing the store so flow fields and other caches refresh."""
+        self.version += 1
+
+    def solid_mask(self, first_x=0, first_y=0, last_x=None, last_y=None):
+        """Return a bool array, True for tiles that block movement, over the whole map or the window up to (last_x, last_y) exclusive."""
+        return (self.store.data[first_y:last_y, first_x:last_x] & WALKABLE) == 0
+
+    def is_solid_tile(self, tile_x, tile_y):
+        """Return True if the tile is a wall. Tiles outside the map are not walls."""
+        if 0 <= tile_x < self.tiles_x and 0 <= tile_y < self.tiles_y:
+            return not self.cells[tile_y * self.tiles_x + tile_x] & WALKABLE
+        return False
+
+    def tile_range(self, rect):
+        """Return the (first_x, first_y, last_x, last_y) tiles a rect overlaps, clamped to the map."""
+        first_x = max(0, rect.left // self.tile_size)
+        first_y = max(0, rect.top // self.tile_size)
+        last_x = min(self.tiles_x - 1, (rect.right - 1) // self.tile_size)
+        last_y = min(self.tiles_y - 1, (rect.bottom - 1) // self.tile_size)
+        return first_x, first_y, last_x, last_y
+
+    def collides_rect(self, rect):
+        """Check if a rect overlaps any wall tile, looking only at the tiles under it."""
+        if rect.width <= 0 or rect.height <= 0:
+            return False  # Same as colliderect, empty rects never collide
+        first_x, first_y, last_x, last_y = self.tile_range(rect)
+        cells = self.cells
+        for tile_y in range(first_y, last_y + 1):
+            offset = tile_y * self.tiles_x
+            for tile_x in range(first_x, last_x + 1):
+                if not cells[offset + tile_x] & WALKABLE:
+                    return True
+        return False
+
+    def collides_rects(self, left, top, width, height, stops=STOPS_MOVEMENT):
+        """Batched collides_rect: arrays of rects in, a bool array out (True where the rect overlaps a blocking tile).
+
+        Only the tiles under the rects are read, so a memory-mapped map pages in just the parts in use.
+        Pass stops=STOPS_PROJECTILES to test against the tiles that stop projectiles instead of walls.
+        """
+        left = np.asarray(left, dtype=np.int64)
+        top = np.asarray(top, dtype=np.int64)
+        width = np.asarray(width, dtype=np.int64)
+        height = np.asarray(height, dtype=np.int64)
+        # Same clamped tile range as tile_range
+        first_x = np.maximum(0, left // self.tile_size)
+        first_y = np.maximum(0, top // self.tile_size)
+        last_x = np.minimum(self.tiles_x - 1, (left + width - 1) // self.tile_size)
+        last_y = np.minimum(self.tiles_y - 1, (top + height - 1) // self.tile_size)
+        inside = (width > 0) & (height > 0) & (first_x <= last_x) & (first_y <= last_y)
+        if not inside.any():
+            return np.zeros(inside.shape, dtype=bool)
+
+        # Every rect looks at the widest block of tiles any of them covers, masking off the tiles past its own
+        span_x = int((last_x - first_x)[inside].max()) + 1
+        span_y = int((last_y - first_y)[inside].max()) + 1
+        offset_y, offset_x = np.divmod(np.arange(span_x * span_y), span_x)
+        tile_x = first_x[:, None] + offset_x
+        tile_y = first_y[:, None] + offset_y
+        covered = inside[:, None] & (tile_x <= last_x[:, None]) & (tile_y <= last_y[:, None])
+        index = np.where(covered, tile_y * self.tiles_x + tile_x, 0)
+        return (covered & stops[self.tiles[index]]).any(axis=1)
+
+    def collides_point(self, x, y):
+        """Check if a pixel position lies inside a wall tile."""
+        return self.is_solid_tile(int(x) // self.tile_size, int(y) // self.tile_size)
+
+    def walls_in_rect(self, rect):
+        """Return wall Rects for the tiles a rect overlaps (for code that needs the actual rects)."""
+        walls = []
+        if rect.width <= 0 or rect.height <= 0:
+            return walls
+        first_x, first_y, last_x, last_y = self.tile_range(rect)
+        for tile_y in range(first_y, last_y + 1):
+            for tile_x in range(first_x, last_x + 1):
+                if not self.cells[tile_y * self.tiles_x + tile_x] & WALKABLE:
+                    walls.append(pygame.Rect(tile_x * self.tile_size, tile_y * self.tile_size, self.tile_size, self.tile_size))
+        return walls
@@ -1,166 +1,162 @@
 import pygame
-import random
-import sys
-import os
+import numpy as np
 from settings import TILE_SIZE
+from assets import load_image
+from collision_grid import CollisionGrid
+from chunk_cache import ChunkCache
+from generator import generate_layout, FLOOR, WALL
+from open_tiles import OpenTileIndex
+from tilestore import TileStore, TYPE_MASK
 
-def resource_path(relative_path):
-    """ Get the absolute path to the resource, works for dev and for PyInstaller """
-    try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
+class TileRow:
+    """One row of the layout, read and written as '0'/'1' characters."""
+    def __init__(self, dungeon, row_index):
+        self.dungeon = dungeon
+        self.store = dungeon.store
+        self.row_index = row_index
+
+    def __getitem__(self, col_index):
+        return '1' if self.store.tile_type(col_index, self.row_index) == WALL else '0'
+
+    def __setitem__(self, col_index, tile):
+        # Through set_tile, so the collision grid, region index and chunk cache see the change
+        self.dungeon.set_tile(col_index, self.row_index, tile)
+
+    def __len__(self):
+        return self.store.tiles_x
+
+    def __iter__(self):
+        return iter(['1' if tile == WALL else '0' for tile in (self.store.data[self.row_index] & TYPE_MASK).tolist()])
+
+class TileLayout:
+    """List-of-rows view over a dungeon's tile store, so layout[y][x] == '1' keeps working."""
+    def __init__(self, dungeon):
+        self.dungeon = dungeon
+        self.store = dungeon.store
+
+    def __getitem__(self, row_index):
+        return TileRow(self.dungeon, row_index)
+
+    def __len__(self):
+        return self.store.tiles_y
+
+    def __iter__(self):
+        return (TileRow(self.dungeon, row_index) for row_index in range(self.store.tiles_y))
 
 class Dungeon:
-    def __init__(self, width_in_tiles, height_in_tiles):
+    def __init__(self, width_in_tiles, height_in_tiles, terrain='structures', seed=None, store=None):
         self.tiles_x = width_in_tiles
         self.tiles_y = height_in_tiles
+        self.terrain = terrain  # One of generator.TERRAIN_TYPES
+        self.rng = np.random.default_rng(seed)
         # Load and scale the wall tile image
-        wall_tile1 = pygame.transform.scale(pygame.image.load(resource_path('assets/wall.png')).convert(), (TILE_SIZE, TILE_SIZE))
-        wall_tile2 = pygame.transform.scale(pygame.image.load(resource_path('assets/wall2.png')).convert(), (TILE_SIZE, TILE_SIZE))
-        wall_tile3 = pygame.transform.scale(pygame.image.load(resource_path('assets/wall3.png')).convert(), (TILE_SIZE, TILE_SIZE))
-        wall_tile4 = pygame.transform.scale(pygame.image.load(resource_path('assets/wall4.png')).convert(), (TILE_SIZE, TILE_SIZE))
+        wall_tile1 = load_image('assets/wall.png', (TILE_SIZE, TILE_SIZE), 'opaque')
+        wall_tile2 = load_image('assets/wall2.png', (TILE_SIZE, TILE_SIZE), 'opaque')
+        wall_tile3 = load_image('assets/wall3.png', (TILE_SIZE, TILE_SIZE), 'opaque')
+        wall_tile4 = load_image('assets/wall4.png', (TILE_SIZE, TILE_SIZE), 'opaque')
         self.wall_tiles = [wall_tile1, wall_tile2, wall_tile3, wall_tile4]
-        self.wall_tile_map = self.generate_wall_tile_map()
         # Load and scale both ground tile images
-        ground_tile1 = pygame.transform.scale(pygame.image.load(resource_path('assets/dirt.png')).convert(), (TILE_SIZE, TILE_SIZE))
-        ground_tile2 = pygame.transform.scale(pygame.image.load(resource_path('assets/dirt2.png')).convert(), (TILE_SIZE, TILE_SIZE))
+        ground_tile1 = load_image('assets/dirt.png', (TILE_SIZE, TILE_SIZE), 'opaque')
+        ground_tile2 = load_image('assets/dirt2.png', (TILE_SIZE, TILE_SIZE), 'opaque')
         # Store them in a list to choose from randomly
         self.ground_tiles = [ground_tile1, ground_tile2]
-        self.ground_tile_map = self.generate_ground_tile_map()
-        self.font = pygame.font.SysFont(None, 24)  # Font for rendering numbers
-        self.layout = self.generate_dungeon()
+        # One byte per tile (type, image variant, flags), layout is a '0'/'1' view over it
+        self.store = store if store is not None else TileStore.from_types(self.generate_dungeon(), self.rng)
+        self.layout = TileLayout(self)
+        # Wall lookups go through the grid, which reads the store's walkable flags
+        self.collision_grid = CollisionGrid(self.store)
+        # Walkable tiles grouped by connected region, for spawning without rejection loops
+        self.open_tiles = OpenTileIndex(self.store)
+        # Floor and walls are baked into chunk surfaces, rebuilt only when their tiles change
+        self.chunk_cache = ChunkCache(self)
+
+    @classmethod
+    def load(cls, path, use_mmap=True, seed=None):
+        """Open a map saved with save(); large maps are memory-mapped instead of read in full."""
+        store = TileStore.load(path, use_mmap)
+        return cls(store.tiles_x, store.tiles_y, seed=seed, store=store)
+
+    def save(self, path):
+        self.store.save(path)
 
     def generate_dungeon(self):
-        # Create an open layout with walkable space ('0') and walls ('1')
-        layout = [['0' for _ in range(self.tiles_x)] for _ in range(self.tiles_y)]
-        
-        # Add predefined shapes and DFS structures
-        self.add_structures(layout)
-        self.add_dfs_structures(layout)
-
-        return layout
-
-    def generate_ground_tile_map(self):
-        """Generate a random ground tile for each ground position in the dungeon."""
-        ground_tile_map = []
-        for row in range(self.tiles_y):
-            ground_tile_map.append([random.choice(self.ground_tiles) for _ in range(self.tiles_x)])
-        return ground_tile_map
-    
-    def generate_wall_tile_map(self):
-        """Generate a random wall tile for each wall position in the dungeon."""
-        wall_tile_map = []
-        for row in range(self.tiles_y):
-            wall_tile_map.append([random.choice(self.wall_tiles) for _ in range(self.tiles_x)])
-        return wall_tile_map
-    
-    def add_structures(self, layout):
-        # Define some predefined shapes
-        shapes = [
-            # Long horizontal wall
-            [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0)],
-
-            # Long vertical wall
-            [(0, 0), (0, 1), (0, 2), (0, 3), (0, 4)],
-
-            # L-shape
-            [(0, 0), (1, 0), (2, 0), (0, 1), (0, 2)],
-
-            # U-shape
-            [(0, 0), (1, 0), (2, 0), (0, 1), (2, 1), (0, 2), (2, 2)],
-
-            # Helix shape
-            [(0, 0), (1, 0), (2, 0), (2, 1), (1, 1), (1, 2), (2, 2)]
-        ]
-
-        # Add a few smaller structures
-        num_structures = random.randint(15, 20)
-        for _ in range(num_structures):
-            shape = random.choice(shapes)
-            width = max(x for x, y in shape) + 1
-            height = max(y for x, y in shape) + 1
-            x = random.randint(0, self.tiles_x - width - 1)
-            y = random.randint(0, self.tiles_y - height - 1)
-
-            for dx, dy in shape:
-                layout[y + dy][x + dx] = '1'
-
-    def add_dfs_structures(self, layout):
-        num_structures = random.randint(8, 12)
-        for _ in range(num_structures):
-            start_x = random.randint(1, self.tiles_x - 2)
-            start_y = random.randint(1, self.tiles_y - 2)
-            self.dfs_structure(layout, start_x, start_y, depth_limit=10)
-            
-    def dfs_structure(self, layout, x, y, depth_limit):
-        stack = [(x, y, 0)]
-        layout[y][x] = '1'
-
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-
-        while stack:
-            cx, cy, depth = stack[-1]
-            random.shuffle(directions)  # Randomize the direction order
-            moved = False
-
-            for dx, dy in directions:
-                nx, ny = cx + dx, cy + dy
-                if 0 <= nx < self.tiles_x and 0 <= ny < self.tiles_y and layout[ny][nx] == '0':
-                    if depth < depth_limit:  # Limit the depth of the DFS
-                        layout[ny][nx] = '1'
-                        stack.append((nx, ny, depth + 1))
-                        moved = True
-                        break
-
-            if not moved:
-                stack.pop()  # Backtrack if no movement is possible
-
-    def clear_spawn_area(self, layout, x, y):
+        """Generate the FLOOR/WALL array for the selected terrain type."""
+        return generate_layout(self.tiles_x, self.tiles_y, self.terrain, self.rng)
+
+    def set_tile(self, x, y, tile):
+        """Change a single tile ('0' or '1') and keep the collision grid in sync."""
+        self.store.set_type(x, y, WALL if tile == '1' else FLOOR)
+        self.collision_grid.mark_changed()
+        self.open_tiles.set_open(x, y, tile == '0')
+        self.chunk_cache.invalidate_tile(x, y)
+
+    def clear_spawn_area(self, x, y):
         """Ensure that the spawn area is clear."""
         if 0 <= x < self.tiles_x and 0 <= y < self.tiles_y:
-            layout[y][x] = '0'
+            self.set_tile(x, y, '0')
             if x + 1 < self.tiles_x:
-                layout[y][x + 1] = '0'
+                self.set_tile(x + 1, y, '0')
             if y + 1 < self.tiles_y:
-                layout[y + 1][x] = '0'
+                self.set_tile(x, y + 1, '0')
                 if x + 1 < self.tiles_x:
-                    layout[y + 1][x + 1] = '0'
-
-    def get_walls(self):
-        walls = []
-        for row_index, row in enumerate(self.layout):
-            for col_index, tile in enumerate(row):
-                if tile == "1":
-                    wall_rect = pygame.Rect(col_index * TILE_SIZE, row_index * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-                    walls.append(wall_rect)
-        return walls
-
-    def get_random_open_position(self):
-        """Return a random open position (i.e., '0') in the dungeon."""
-        while True:
-            x = random.randint(1, self.tiles_x - 2)
-            y = random.randint(1, self.tiles_y - 2)
-            if self.layout[y][x] == '0':  # Ensure the tile is walkable
-                return x * TILE_SIZE, y * TILE_SIZE
+                    self.set_tile(x + 1, y + 1, '0')
+
+    def get_random_open_position(self, near=None, min_distance=0, outside_rect=None, size=TILE_SIZE, region=None, attempts=16):
+        """Return a random open position (i.e., '0') in the dungeon.
+
+        With near (a Rect, usually the player's) the position is drawn from the region connected to it,
+        at least min_distance pixels away. outside_rect (e.g. the camera) excludes positions it overlaps,
+        and size is the footprint that must fit without touching a wall. Returns None when no tile passes
+        every filter, so callers decide which filter to drop rather than getting a spawn inside the player.
+        """
+        if region is None and near is not None:
+            region = self.open_tiles.region_at(near.centerx // TILE_SIZE, near.centery // TILE_SIZE) or None
+
+        # A few O(1) picks from the region index cover almost every call
+        for _ in range(attempts):
+            tile = self.open_tiles.random_tile(self.rng, region)
+            if tile is None:
+                break
+            if self.is_spawn_tile(tile[0], tile[1], near, min_distance, outside_rect, size):
+                return tile[0] * TILE_SIZE, tile[1] * TILE_SIZE
+
+        # Crowded or tight filters: narrow the region down in one vectorized pass instead of retrying forever
+        candidates = self.open_tiles.region_tiles(region)
+        tile_xs = candidates % self.tiles_x
+        tile_ys = candidates // self.tiles_x
+        mask = (tile_xs >= 1) & (tile_xs <= self.tiles_x - 2) & (tile_ys >= 1) & (tile_ys <= self.tiles_y - 2)
+        if near is not None and min_distance:
+            centre_xs = tile_xs * TILE_SIZE + TILE_SIZE // 2 - near.centerx
+            centre_ys = tile_ys * TILE_SIZE + TILE_SIZE // 2 - near.centery
+            mask &= centre_xs * centre_xs + centre_ys * centre_ys >= min_distance * min_distance
+        if outside_rect is not None:
+            mask &= ((tile_xs * TILE_SIZE + size <= outside_rect.left) | (tile_xs * TILE_SIZE >= outside_rect.right) |
+                     (tile_ys * TILE_SIZE + size <= outside_rect.top) | (tile_ys * TILE_SIZE >= outside_rect.bottom))
+        filtered = candidates[mask]
+        if len(filtered):
+            # Footprints checked for every remaining tile in one batch, so None really means nowhere fits
+            xs = filtered % self.tiles_x * TILE_SIZE
+            ys = filtered // self.tiles_x * TILE_SIZE
+            fits = filtered[~self.collision_grid.collides_rects(xs, ys, size, size)]
+            if len(fits):
+                index = int(fits[self.rng.integers(len(fits))])
+                return index % self.tiles_x * TILE_SIZE, index // self.tiles_x * TILE_SIZE
+        return None
+
+    def is_spawn_tile(self, x, y, near, min_distance, outside_rect, size):
+        """Check a candidate spawn tile against the spawn filters."""
+        if not (1 <= x <= self.tiles_x - 2 and 1 <= y <= self.tiles_y - 2):
+            return False
+        spawn_rect = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, size, size)
+        if near is not None and min_distance:
+            dx = spawn_rect.x + TILE_SIZE // 2 - near.centerx
+            dy = spawn_rect.y + TILE_SIZE // 2 - near.centery
+            if dx * dx + dy * dy < min_distance * min_distance:
+                return False
+        if outside_rect is not None and spawn_rect.colliderect(outside_rect):
+            return False
+        return not self.collision_grid.collides_rect(spawn_rect)
 
     def draw(self, screen, camera_offset):
-        for row_index, row in enumerate(self.layout):
-            for col_index, tile in enumerate(row):
-                screen_x = col_index * TILE_SIZE - camera_offset[0]
-                screen_y = row_index * TILE_SIZE - camera_offset[1]
-
-                if tile == "1":
-                    wall_tile = self.wall_tile_map[row_index][col_index]  # Get the pre-selected wall tile
-                    screen.blit(wall_tile, (screen_x, screen_y))
-                elif tile == "0":
-                    ground_tile = self.ground_tile_map[row_index][col_index]
-                    screen.blit(ground_tile, (screen_x, screen_y))
-                '''
-                # Render the tile's value (0 or 1) on top of the tile
-                text_surface = self.font.render(tile, True, (255, 255, 255))
-                text_rect = text_surface.get_rect(center=(screen_x + TILE_SIZE // 2, screen_y + TILE_SIZE // 2))
-                screen.blit(text_surface, text_rect)
-                '''
\ No newline at end of file
+        """Draw the visible part of the map from the pre-rendered chunks."""
+        self.chunk_cache.draw(screen, camera_offset)
@@ -0,0 +1,31 @@
+from render_queue import EFFECT_LAYER
+
+class EffectTimeline:
+    """Short sprite animations (slashes, teleport flashes, lightning bolts) played out over simulation time.
+
+    An effect is a list of frames shown frame_duration ms each at a fixed world position. Starting one
+    returns straight away; update() drops the finished ones and queue_sprites() hands every live
+    effect's current frame to the render queue, so any number can overlap without holding up the frame.
+    """
+    def __init__(self):
+        self.effects = []  # (frames, world x, world y, start time, frame duration), oldest first
+        self.now = 0  # Simulation time of the last update, which queue_sprites() picks frames for
+
+    def __len__(self):
+        return len(self.effects)
+
+    def add(self, frames, position, start_time, frame_duration=100):
+        """Play frames with their top-left at the world position, starting at start_time."""
+        self.effects.append((frames, position[0], position[1], start_time, frame_duration))
+
+    def clear(self):
+        self.effects.clear()
+
+    def update(self, now):
+        self.now = now
+        self.effects = [effect for effect in self.effects if now - effect[3] < len(effect[0]) * effect[4]]
+
+    def queue_sprites(self, queue):
+        now = self.now
+        for frames, x, y, start_time, frame_duration in self.effects:
+            queue.add(EFFECT_LAYER, frames[(now - start_time) // frame_duration], x, y)
@@ -1,46 +1,49 @@
 import pygame
-import random
-import sys
-import os
-from settings import TILE_SIZE
-from projectile import EnemyProjectile
-
-pygame.mixer.init()
-
-def resource_path(relative_path):
-    """ Get the absolute path to the resource, works for dev and for PyInstaller """
-    try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
+from animation import load_animation_bank
+from enemy_store import EnemyStore, StoreField, MELEE, RANGED, BOSS, ANIMATION_STATES
+from projectile import ENEMY_BOLT
+from sound_bank import sound_bank
 
 class Enemy:
-    def __init__(self, x, y):
+    """A thin view of one enemy's slot in an EnemyStore; the store moves and animates enemies in batches."""
+    kind = MELEE
+
+    # State kept in the store's arrays
+    x = StoreField('x')
+    y = StoreField('y')
+    size = StoreField('size')
+    health = StoreField('health')
+    speed = StoreField('speed')
+    melee_range = StoreField('melee_range')
+    melee_damage = StoreField('melee_damage')
+    attack_cooldown = StoreField('attack_cooldown')
+    last_attack_time = StoreField('last_attack_time')
+    attacking = StoreField('attacking')
+    attack_animation_start_time = StoreField('attack_animation_start_time')
+    attack_animation_duration = StoreField('attack_animation_duration')
+    facing_right = StoreField('facing_right')
+    walking = StoreField('walking')
+    is_flashing = StoreField('is_flashing')
+    flash_start_time = StoreField('flash_start_time')
+    flash_duration = StoreField('flash_duration')
+    animation_speed = StoreField('animation_speed')
+    last_animation_time = StoreField('last_animation_time')
+    current_idle_frame = StoreField('current_idle_frame')
+    current_walk_frame = StoreField('current_walk_frame')
+
+    def __init__(self, x, y, store=None):
+        # Join the shared store, or keep a private one-enemy store when used on its own
+        (store if store is not None else EnemyStore(1)).add(self, x, y)
         self.size = 40  # Example size, adjust as needed
-        self.original_idle_images = [pygame.transform.scale(pygame.image.load(resource_path('assets/goblinidle.png')).convert_alpha(), (self.size, self.size)),
-                                     pygame.transform.scale(pygame.image.load(resource_path('assets/goblinidle2.png')).convert_alpha(), (self.size, self.size))]
-        self.original_walk_images = [pygame.transform.scale(pygame.image.load(resource_path('assets/goblinwalk.png')).convert_alpha(), (self.size, self.size)),
-                                     pygame.transform.scale(pygame.image.load(resource_path('assets/goblinwalk2.png')).convert_alpha(), (self.size, self.size))]
-        self.original_attack_images = [pygame.transform.scale(pygame.image.load(resource_path('assets/goblinattack.png')).convert_alpha(), (self.size, self.size)),
-                                       pygame.transform.scale(pygame.image.load(resource_path('assets/goblinattack2.png')).convert_alpha(), (self.size, self.size))]
-        
-        # Set initial images
-        self.idle_images = self.original_idle_images[:]
-        self.walk_images = self.original_walk_images[:]
-        self.attack_images = self.original_attack_images[:]
-        
-        self.image = self.idle_images[0]
-        self.rect = self.image.get_rect(topleft=(x, y))
-        
-        self.melee_attack_sound = pygame.mixer.Sound(resource_path('assets/retro-click.mp3')) 
-        
+        self.set_animations(load_animation_bank('goblin', {
+            'idle': ['assets/goblinidle.png', 'assets/goblinidle2.png'],
+            'walk': ['assets/goblinwalk.png', 'assets/goblinwalk2.png'],
+            'attack': ['assets/goblinattack.png', 'assets/goblinattack2.png'],
+        }, 40))
+
         self.health = 50  # Example health value
         self.speed = 2  # Example speed value
-        self.is_flashing = False
         self.flash_duration = 100  # Duration of the flash effect in milliseconds
-        self.flash_start_time = 0  # Track when the flash started
         self.original_color = (255, 0, 0)  # Default color is red for melee enemies
         self.melee_range = 50  # Melee attack range
         self.melee_damage = 10  # Damage dealt by melee attack
@@ -48,357 +51,120 @@ class Enemy:
         self.last_attack_time = 0  # Track the last time the enemy attacked
 
         # Animation frame tracking
-        self.current_idle_frame = 0
-        self.current_walk_frame = 0
-        self.current_attack_frame = 0
         self.animation_speed = 300  # Time in milliseconds between frames
-        self.last_animation_time = pygame.time.get_ticks()
-        
+        self.last_animation_time = 0  # Simulation time of the last frame switch
+
         # Attack animation tracking
-        self.attacking = False
         self.attack_animation_duration = 500  # Time in milliseconds for the attack animation
-        self.attack_animation_start_time = 0
-        
+
         # Direction tracking
         self.facing_right = True  # Goblin starts facing right
 
-    def take_damage(self, amount):
+    def set_animations(self, animations):
+        """Use a shared animation bank (original, mirrored and flashing frames) for this enemy."""
+        self.animations = animations
+        self.store.idle_frames[self.slot] = animations.frame_count('idle')
+        self.store.walk_frames[self.slot] = animations.frame_count('walk')
+        self.store.attack_frames[self.slot] = animations.frame_count('attack')
+
+    @property
+    def rect(self):
+        """A fresh Rect for the enemy's position; assign a Rect back to move the enemy."""
+        return pygame.Rect(self.x, self.y, self.size, self.size)
+
+    @rect.setter
+    def rect(self, rect):
+        self.x = rect.x
+        self.y = rect.y
+
+    @property
+    def image(self):
+        """The current frame, looked up in the bank from the state the store picked."""
+        store, slot = self.store, self.slot
+        return self.animations.frame(ANIMATION_STATES[store.animation_state[slot]], store.animation_frame[slot],
+                                     not store.facing_right[slot], bool(store.is_flashing[slot]))
+
+    def take_damage(self, amount, now):
         """Reduce the enemy's health by a specified amount and trigger the flash effect."""
         self.health -= amount
-        self.start_flash()  # Trigger the flash effect
+        self.start_flash(now)  # Trigger the flash effect
         print(f"Enemy took {amount} damage, remaining health: {self.health}")
         if self.health <= 0:
             return True  # Return True if the enemy dies
         return False
 
-    def start_flash(self):
+    def start_flash(self, now):
         """Start the flash effect by changing the color to white."""
         self.is_flashing = True
-        self.flash_start_time = pygame.time.get_ticks()  # Record the time when the flash starts
-        
-    def update_flash(self):
-        """Update the flash effect and restore the original sprite after the flash duration."""
-        current_time = pygame.time.get_ticks()
-
-        if current_time - self.flash_start_time < self.flash_duration:
-            # Apply a flashing effect by adjusting the alpha value
-            flash_surface = self.image.copy()
-            flash_surface.fill((255, 255, 255, 128), special_flags=pygame.BLEND_RGBA_MULT)
-            self.image = flash_surface
-        else:
-            self.is_flashing = False
-            # Restore the normal image (no flashing)
-            self.restore_current_frame()
-    
-    def restore_current_frame(self):
-        """Restores the current frame of the enemy (idle, walk, or shoot) after flashing."""
-        if self.walking:
-            self.update_walk_animation()
-        else:
-            self.update_idle_animation()
-
-    def update(self, player, walls, camera_offset, enemies):
-        """Update enemy state, including movement, attacking, and flashing."""
-        self.move_towards_player(player.rect, walls, enemies)
-        self.melee_attack(player)
-
-        # Handle flashing state
-        if self.is_flashing:
-            self.update_flash()
-        else:
-            # Update animations based on movement and actions
-            if self.walking:
-                self.update_walk_animation()
-            else:
-                self.update_idle_animation()
-
-    def update_idle_animation(self):
-        """Update the idle animation by switching between the idle frames."""
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_animation_time >= self.animation_speed:
-            # Switch to the next frame
-            self.current_idle_frame = (self.current_idle_frame + 1) % len(self.idle_images)
-            self.image = self.idle_images[self.current_idle_frame]
-            self.last_animation_time = current_time
-
-        # Ensure correct facing direction
-        self.flip_animations_if_needed()
-
-    def update_walk_animation(self):
-        """Update the walk animation by switching between the walk frames."""
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_animation_time >= self.animation_speed:
-            # Switch to the next walk frame
-            self.current_walk_frame = (self.current_walk_frame + 1) % len(self.walk_images)
-            self.image = self.walk_images[self.current_walk_frame]
-            self.last_animation_time = current_time
-
-        # Ensure correct facing direction
-        self.flip_animations_if_needed()
-
-    def update_attack_animation(self):
-        """Update the attack animation by switching between the attack frames."""
-        current_time = pygame.time.get_ticks()
-
-        # Check if the animation duration has passed
-        if current_time - self.attack_animation_start_time >= self.attack_animation_duration:
-            # End attack animation and reset to idle or walk
-            self.attacking = False
-            return
-
-        # Switch to the next attack frame
-        frame_duration = self.attack_animation_duration // len(self.attack_images)
-        frame_index = (current_time - self.attack_animation_start_time) // frame_duration
-        self.image = self.attack_images[int(frame_index) % len(self.attack_images)]
-
-        # Ensure correct facing direction
-        self.flip_animations_if_needed()
-
-    def move_towards_player(self, player_rect, walls, enemies):
-        """Move the enemy towards the player without overlapping other enemies or the player."""
-        dx = player_rect.x - self.rect.x
-        dy = player_rect.y - self.rect.y
-
-        # Determine whether the goblin should face left or right
-        if dx > 0 and not self.facing_right:
-            self.facing_right = True
-            self.flip_animations_if_needed()
-        elif dx < 0 and self.facing_right:
-            self.facing_right = False
-            self.flip_animations_if_needed()
-
-        if abs(dx) > abs(dy):
-            new_pos = (self.rect.x + (self.speed if dx > 0 else -self.speed), self.rect.y)
-        else:
-            new_pos = (self.rect.x, self.rect.y + (self.speed if dy > 0 else -self.speed))
-
-        # Prevent overlapping with walls, other enemies, and the player
-        if not self.check_collision(new_pos, walls, enemies) and not self.check_collision_with_player(new_pos, player_rect):
-            self.rect.topleft = new_pos
-            self.walking = True  # Set walking state when moving
-        else:
-            self.walking = False  # Set to idle when not moving
+        self.flash_start_time = now  # Record the time when the flash starts
 
-    def flip_animations_if_needed(self):
-        """Flip all animations if the direction changes."""
-        if self.facing_right:
-            self.idle_images = self.original_idle_images[:]
-            self.walk_images = self.original_walk_images[:]
-            self.attack_images = self.original_attack_images[:]
-        else:
-            self.idle_images = [pygame.transform.flip(img, True, False) for img in self.original_idle_images]
-            self.walk_images = [pygame.transform.flip(img, True, False) for img in self.original_walk_images]
-            self.attack_images = [pygame.transform.flip(img, True, False) for img in self.original_attack_images]
-
-    def check_collision(self, new_pos, walls, enemies):
-        """Check for collision with walls and other enemies."""
-        future_rect = pygame.Rect(new_pos, (self.size, self.size))
-        
-        # Check collision with walls
-        for wall in walls:
-            if future_rect.colliderect(wall):
-                return True
-        
-        # Check collision with other enemies
-        for enemy in enemies:
-            if enemy != self and future_rect.colliderect(enemy.rect):
-                return True
-        
-        return False
-
-    def check_collision_with_player(self, new_pos, player_rect):
-        """Check for collision with the player's entire bounding box."""
-        future_rect = pygame.Rect(new_pos, (self.size, self.size))
-        return future_rect.colliderect(player_rect)
-
-    def melee_attack(self, player):
-        """Perform a melee attack on the player if within range and cooldown is over."""
-        current_time = pygame.time.get_ticks()
-        
-        # Use pygame.Vector2 for distance calculation
-        enemy_pos = pygame.math.Vector2(self.rect.center)
-        player_pos = pygame.math.Vector2(player.rect.center)
-        distance_to_player = enemy_pos.distance_to(player_pos)
-        
-        if distance_to_player <= self.melee_range and current_time - self.last_attack_time >= self.attack_cooldown:
-            self.attacking = True
-            self.attack_animation_start_time = pygame.time.get_ticks()  # Start the attack animation timer
-            self.melee_attack_sound.play()  # Play the melee attack sound
-            player.take_damage(self.melee_damage)  # Inflict damage to the player
-            self.last_attack_time = current_time  # Update last attack time
-            print(f"Enemy dealt {self.melee_damage} damage to the player!")
-
-    def draw(self, screen, camera_offset):
-        """Draw the enemy sprite."""
-        screen_x = self.rect.x - camera_offset[0]
-        screen_y = self.rect.y - camera_offset[1]
-        screen.blit(self.image, (screen_x, screen_y))
+    def attack(self, player, now, projectiles):
+        """Hit the player; the store calls this once the enemy is in range and off cooldown."""
+        self.attacking = True
+        self.attack_animation_start_time = now  # Start the attack animation timer
+        sound_bank.play('enemy attack', self.rect.center)  # Only heard when the enemy is on screen and close
+        player.take_damage(self.melee_damage)  # Inflict damage to the player
+        self.last_attack_time = now  # Update last attack time
+        print(f"Enemy dealt {self.melee_damage} damage to the player!")
 
     def is_dead(self):
         """Return True if the enemy's health is 0 or less."""
         return self.health <= 0
 
 class RangedEnemy(Enemy):
-    def __init__(self, x, y, screen_width, screen_height):
-        super().__init__(x, y)
-        
-        # Load animation images for idle, walking, and shooting
-        self.original_idle_images = [pygame.transform.scale(pygame.image.load(resource_path('assets/mageidle.png')).convert_alpha(), (self.size, self.size)),
-                                     pygame.transform.scale(pygame.image.load(resource_path('assets/mageidle2.png')).convert_alpha(), (self.size, self.size))]
-        self.original_walk_images = [pygame.transform.scale(pygame.image.load(resource_path('assets/magewalk.png')).convert_alpha(), (self.size, self.size)),
-                                     pygame.transform.scale(pygame.image.load(resource_path('assets/magewalk2.png')).convert_alpha(), (self.size, self.size))]
-        self.original_shoot_images = [pygame.transform.scale(pygame.image.load(resource_path('assets/magecast.png')).convert_alpha(), (self.size, self.size)),
-                                      pygame.transform.scale(pygame.image.load(resource_path('assets/magecast2.png')).convert_alpha(), (self.size, self.size))]
-        
-        # Initialize the current image sets
-        self.idle_images = self.original_idle_images[:]
-        self.walk_images = self.original_walk_images[:]
-        self.shoot_images = self.original_shoot_images[:]
-        
-        self.image = self.idle_images[0]
-        self.rect = self.image.get_rect(topleft=(x, y))
-        self.projectiles = []  # List to store enemy projectiles
-        
+    kind = RANGED
+
+    # Casting reuses the store's attack timers
+    shoot_cooldown = StoreField('attack_cooldown')
+    last_shot_time = StoreField('last_attack_time')
+    shooting = StoreField('attacking')
+    shoot_animation_start_time = StoreField('attack_animation_start_time')
+    shoot_animation_duration = StoreField('attack_animation_duration')
+
+    def __init__(self, x, y, screen_width, screen_height, store=None):
+        super().__init__(x, y, store)
+
+        # Animation frames for idle, walking, and shooting
+        self.set_animations(load_animation_bank('mage', {
+            'idle': ['assets/mageidle.png', 'assets/mageidle2.png'],
+            'walk': ['assets/magewalk.png', 'assets/magewalk2.png'],
+            'attack': ['assets/magecast.png', 'assets/magecast2.png'],
+        }, self.size))
+
         # Colors and shoot cooldown
         self.original_color = (255, 165, 0)  # Orange color for ranged enemies
         self.shoot_cooldown = 1500  # Cooldown between shots (milliseconds)
         self.last_shot_time = 0  # Track the last time the enemy shot
-        
-        # Direction tracking
-        self.facing_right = True  # Start facing right
-
-        # Animation frame tracking
-        self.current_idle_frame = 0
-        self.current_walk_frame = 0
-        self.current_shoot_frame = 0
-        self.animation_speed = 300  # Time in milliseconds between frames
-        self.last_animation_time = pygame.time.get_ticks()
 
         # Shooting animation tracking
-        self.shooting = False
         self.shoot_animation_duration = 500  # Time in milliseconds for the shoot animation
-        self.shoot_animation_start_time = 0
-        
+
         self.screen_width = screen_width
         self.screen_height = screen_height
 
-    def shoot(self, player):
-        """Shoot a projectile towards the player."""
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_shot_time >= self.shoot_cooldown:
-            # Create a new projectile aimed at the player
-            direction = pygame.math.Vector2(player.rect.centerx - self.rect.centerx, player.rect.centery - self.rect.centery)
-            direction = direction.normalize()  # Normalize the direction vector
-
-            # Initialize the projectile at the enemy's center
-            new_projectile = EnemyProjectile(self.rect.centerx, self.rect.centery, direction, self.screen_width, self.screen_height)
-            self.projectiles.append(new_projectile)
-            self.shooting = True  # Start the shoot animation
-            self.shoot_animation_start_time = current_time  # Record the start time of the shooting animation
-            self.last_shot_time = current_time
-
-    def update(self, player, walls, camera_offset, enemies):
-        """Update enemy logic, including shooting, flashing, and animations."""
-        self.move_towards_player(player.rect, walls, enemies)  # Handle movement
-        
-        # Handle shooting
-        self.shoot(player)
-
-        # Handle flashing state
-        if self.is_flashing:
-            self.update_flash()  # Apply flash effect
-        else:
-            # Update the animation based on whether the enemy is shooting or walking
-            if self.shooting:
-                self.update_shoot_animation()
-            elif self.walking:
-                self.update_walk_animation()
-            else:
-                self.update_idle_animation()
-
-    def update_flash(self):
-        """Update the flash effect and restore the original sprite after the flash duration."""
-        current_time = pygame.time.get_ticks()
-
-        if current_time - self.flash_start_time < self.flash_duration:
-            # Apply a flashing effect by adjusting the alpha value
-            flash_surface = self.image.copy()
-            flash_surface.fill((255, 255, 255, 128), special_flags=pygame.BLEND_RGBA_MULT)
-            self.image = flash_surface
-        else:
-            self.is_flashing = False
-            # Restore the normal image (no flashing)
-            self.restore_current_frame()
-
-    def restore_current_frame(self):
-        """Restores the current frame of the enemy (idle, walking, or shooting) after flashing."""
-        if self.shooting:
-            self.update_shoot_animation()
-        elif self.walking:
-            self.update_walk_animation()
-        else:
-            self.update_idle_animation()
-
-    def update_shoot_animation(self):
-        """Update the shoot animation by switching between the shooting frames."""
-        current_time = pygame.time.get_ticks()
-
-        # Check if the animation duration has passed
-        if current_time - self.shoot_animation_start_time >= self.shoot_animation_duration:
-            # End shoot animation and reset to idle or walk
-            self.shooting = False
-            return
-
-        # Switch to the next shoot frame
-        frame_duration = self.shoot_animation_duration // len(self.shoot_images)
-        frame_index = (current_time - self.shoot_animation_start_time) // frame_duration
-        self.image = self.shoot_images[int(frame_index) % len(self.shoot_images)]
-
-        # Ensure correct facing direction
-        self.flip_animations_if_needed()
-
-    def flip_animations_if_needed(self):
-        """Flip all animations if the direction changes."""
-        if self.facing_right:
-            self.idle_images = self.original_idle_images[:]
-            self.walk_images = self.original_walk_images[:]
-            self.shoot_images = self.original_shoot_images[:]
-        else:
-            self.idle_images = [pygame.transform.flip(img, True, False) for img in self.original_idle_images]
-            self.walk_images = [pygame.transform.flip(img, True, False) for img in self.original_walk_images]
-            self.shoot_images = [pygame.transform.flip(img, True, False) for img in self.original_shoot_images]
-
-    def draw(self, screen, camera_offset):
-        """Draw the ranged enemy and projectiles."""
-        # Draw the ranged enemy
-        screen_x = self.rect.x - camera_offset[0]
-        screen_y = self.rect.y - camera_offset[1]
-        screen.blit(self.image, (screen_x, screen_y))
-
-        # Draw projectiles
-        for projectile in self.projectiles:
-            projectile.draw(screen, camera_offset)
+    def attack(self, player, now, projectiles):
+        """Shoot a projectile towards the player; the store calls this whenever the cooldown has run out."""
+        # Fire a bolt from the enemy's center, aimed at the player
+        rect = self.rect
+        direction = pygame.math.Vector2(player.rect.centerx - rect.centerx, player.rect.centery - rect.centery)
+        projectiles.spawn(ENEMY_BOLT, rect.centerx, rect.centery, direction, self.screen_width, self.screen_height)
+        self.shooting = True  # Start the shoot animation
+        self.shoot_animation_start_time = now  # Record the start time of the shooting animation
+        self.last_shot_time = now
 
 class BossMeleeEnemy(Enemy):
-    def __init__(self, x, y):
-        super().__init__(x, y)
-        self.size = 80  # Boss size is 2x2 tiles (assuming each tile is 40x40)
+    kind = BOSS
 
-        # Load animation images for idle, walking, and melee attacking
-        self.original_idle_images = [pygame.transform.scale(pygame.image.load(resource_path('assets/bossidle.png')).convert_alpha(), (self.size, self.size)),
-                                     pygame.transform.scale(pygame.image.load(resource_path('assets/bossidle2.png')).convert_alpha(), (self.size, self.size))]
-        self.original_walk_images = [pygame.transform.scale(pygame.image.load(resource_path('assets/bosswalk.png')).convert_alpha(), (self.size, self.size)),
-                                     pygame.transform.scale(pygame.image.load(resource_path('assets/bosswalk2.png')).convert_alpha(), (self.size, self.size))]
-        self.original_attack_images = [pygame.transform.scale(pygame.image.load(resource_path('assets/bossattack.png')).convert_alpha(), (self.size, self.size)),
-                                       pygame.transform.scale(pygame.image.load(resource_path('assets/bossattack2.png')).convert_alpha(), (self.size, self.size))]
-
-        # Initialize the current image sets
-        self.idle_images = self.original_idle_images[:]
-        self.walk_images = self.original_walk_images[:]
-        self.attack_images = self.original_attack_images[:]
+    def __init__(self, x, y, store=None):
+        super().__init__(x, y, store)
+        self.size = 80  # Boss size is 2x2 tiles (assuming each tile is 40x40)
 
-        self.image = self.idle_images[0]  # Set initial image to idle
-        self.rect = pygame.Rect(x, y, self.size, self.size)
+        # Animation frames for idle, walking, and melee attacking
+        self.set_animations(load_animation_bank('boss', {
+            'idle': ['assets/bossidle.png', 'assets/bossidle2.png'],
+            'walk': ['assets/bosswalk.png', 'assets/bosswalk2.png'],
+            'attack': ['assets/bossattack.png', 'assets/bossattack2.png'],
+        }, self.size))
 
         # Boss attributes
         self.health = 200  # Higher health for the boss
@@ -407,166 +173,17 @@ class BossMeleeEnemy(Enemy):
         self.melee_range = 70  # Melee attack range
         self.attack_cooldown = 800  # Cooldown between attacks
 
-        # Animation frame tracking
-        self.current_idle_frame = 0
-        self.current_walk_frame = 0
-        self.current_attack_frame = 0
-        self.animation_speed = 300  # Time in milliseconds between frames
-        self.last_animation_time = pygame.time.get_ticks()
-
         # Attack animation tracking
-        self.attacking = False
         self.attack_animation_duration = 600  # Time in milliseconds for the attack animation
-        self.attack_animation_start_time = 0
-
-        # Direction tracking
-        self.facing_right = True  # Start facing right
-        
-        self.walking = False
-
-    def update(self, player, walls, camera_offset, enemies):
-        """Update boss logic."""
-        self.move_towards_player(player.rect, walls, enemies)  # Handle movement
-
-        # Handle flashing state
-        if self.is_flashing:
-            self.update_flash()  # Apply flash effect
-        else:
-            # Update the animation based on whether the boss is attacking or walking
-            if self.attacking:
-                self.update_attack_animation()
-            elif self.walking:
-                self.update_walk_animation()
-            else:
-                self.update_idle_animation()
-
-        # Handle melee attack logic
-        self.melee_attack(player)
-
-    def update_attack_animation(self):
-        """Update the attack animation by switching between the attack frames."""
-        current_time = pygame.time.get_ticks()
-
-        # Check if the animation duration has passed
-        if current_time - self.attack_animation_start_time >= self.attack_animation_duration:
-            # End attack animation and reset to idle or walk
-            self.attacking = False
-            return
-
-        # Switch to the next attack frame
-        frame_duration = self.attack_animation_duration // len(self.attack_images)
-        frame_index = (current_time - self.attack_animation_start_time) // frame_duration
-        self.image = self.attack_images[int(frame_index) % len(self.attack_images)]
-
-        # Ensure correct facing direction
-        self.flip_animations_if_needed()
-
-    def melee_attack(self, player):
-        """Perform a melee attack on the player, covering all adjacent tiles."""
-        current_time = pygame.time.get_ticks()
-
-        # Define the attack range: covering one tile left, one tile up, two tiles down, and two tiles right
-        boss_attack_range = pygame.Rect(
-            self.rect.x - TILE_SIZE,  # One tile to the left
-            self.rect.y - TILE_SIZE,  # One tile above
-            self.size + TILE_SIZE * 2,  # Cover two tiles to the right
-            self.size + TILE_SIZE * 2   # Cover two tiles below
-        )
-
-        # Check if the player is within this larger attack range and if the cooldown is over
-        if boss_attack_range.colliderect(player.rect) and current_time - self.last_attack_time >= self.attack_cooldown:
-            self.melee_attack_sound.play()  # Play the melee attack sound
-            # Perform attack
-            player.take_damage(self.melee_damage)
-            self.last_attack_time = current_time  # Update last attack time
-            print(f"Boss dealt {self.melee_damage} damage to the player!")
-
-            # Start attack animation
-            self.attacking = True
-            self.attack_animation_start_time = current_time
-
-    def update_walk_animation(self):
-        """Update the walk animation by switching between the walk frames."""
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_animation_time >= self.animation_speed:
-            # Switch to the next walk frame
-            self.current_walk_frame = (self.current_walk_frame + 1) % len(self.walk_images)
-            self.image = self.walk_images[self.current_walk_frame]
-            self.last_animation_time = current_time
-
-        # Ensure correct facing direction
-        self.flip_animations_if_needed()
-
-    def update_idle_animation(self):
-        """Update the idle animation by switching between the idle frames."""
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_animation_time >= self.animation_speed:
-            # Switch to the next idle frame
-            self.current_idle_frame = (self.current_idle_frame + 1) % len(self.idle_images)
-            self.image = self.idle_images[self.current_idle_frame]
-            self.last_animation_time = current_time
-
-        # Ensure correct facing direction
-        self.flip_animations_if_needed()
-
-    def flip_animations_if_needed(self):
-        """Flip all animations if the direction changes."""
-        if self.facing_right:
-            self.idle_images = self.original_idle_images[:]
-            self.walk_images = self.original_walk_images[:]
-            self.attack_images = self.original_attack_images[:]
-        else:
-            # Flip all images if the boss is facing left
-            self.idle_images = [pygame.transform.flip(img, True, False) for img in self.original_idle_images]
-            self.walk_images = [pygame.transform.flip(img, True, False) for img in self.original_walk_images]
-            self.attack_images = [pygame.transform.flip(img, True, False) for img in self.original_attack_images]
-
-    def move_towards_player(self, player_rect, walls, enemies, gap=5):
-        """Move the enemy towards the player without overlapping other enemies or the player, leaving a gap."""
-        dx = player_rect.centerx - self.rect.centerx
-        dy = player_rect.centery - self.rect.centery
-
-        # Update direction: Set facing_right to True if moving right, False if moving left
-        if dx > 0:
-            self.facing_right = True
-        else:
-            self.facing_right = False
-
-        if abs(dx) > abs(dy):
-            # Move horizontally
-            new_x = self.rect.x + (self.speed if dx > 0 else -self.speed)
-            new_pos = (new_x, self.rect.y)
-
-            # Ensure there is a gap between the boss and the player
-            if abs(player_rect.centerx - (self.rect.centerx + (self.speed if dx > 0 else -self.speed))) < self.size // 2 + gap:
-                new_pos = (self.rect.x, self.rect.y)  # Stop movement if within gap range
-        else:
-            # Move vertically
-            new_y = self.rect.y + (self.speed if dy > 0 else -self.speed)
-            new_pos = (self.rect.x, new_y)
-
-            # Ensure there is a gap between the boss and the player
-            if abs(player_rect.centery - (self.rect.centery + (self.speed if dy > 0 else -self.speed))) < self.size // 2 + gap:
-                new_pos = (self.rect.x, self.rect.y)  # Stop movement if within gap range
-
-        # Prevent overlapping with walls, other enemies, and the player
-        if not self.check_collision(new_pos, walls, enemies) and not self.check_collision_with_player(player_rect, gap):
-            self.rect.topleft = new_pos
-            self.walking = True
-        else:
-            self.walking = False
-
-    def draw(self, screen, camera_offset):
-        """Draw the boss."""
-        screen_x = self.rect.x - camera_offset[0]
-        screen_y = self.rect.y - camera_offset[1]
-        screen.blit(self.image, (screen_x, screen_y))
-
-    def check_collision_with_player(self, player_rect, gap=5):
-        """Check for collision with the player, leaving a small gap."""
-        # Make sure new_pos is properly defined as (x, y)
-        boss_rect = pygame.Rect(self.rect.x, self.rect.y, self.size, self.size)
-        expanded_player_rect = player_rect.inflate(gap * 2, gap * 2)  # Expand player's rect by the gap
 
-        # If the boss is close to the player but not touching
-        return boss_rect.colliderect(expanded_player_rect)
+    def attack(self, player, now, projectiles):
+        """Hit the player anywhere in the square one tile around the boss; called by the store when ready."""
+        sound_bank.play('enemy attack', self.rect.center)  # Only heard when the enemy is on screen and close
+        # Perform attack
+        player.take_damage(self.melee_damage)
+        self.last_attack_time = now  # Update last attack time
+        print(f"Boss dealt {self.melee_damage} damage to the player!")
+
+        # Start attack animation
+        self.attacking = True
+        self.attack_animation_start_time = now
@@ -0,0 +1,449 @@
+import pygame
+import numpy as np
+from settings import TILE_SIZE
+from profiler import profiler
+from render_queue import ENEMY_LAYER
+
+# Enemy kinds, each with its own movement and attack rules in the batch update
+MELEE = 0
+RANGED = 1
+BOSS = 2
+
+# Animation states, in the order the bank names them
+ANIMATION_STATES = ('idle', 'walk', 'attack')
+IDLE = 0
+WALK = 1
+ATTACK = 2
+
+BOSS_GAP = 5  # Pixels the boss keeps between itself and the player
+SMALL_BATCH = 24  # Up to this many enemies move in plain Python, which beats NumPy's per-call overhead
+
+# One array per field, indexed by slot; slots 0..count-1 are the live enemies
+FIELDS = (
+    ('x', np.int32), ('y', np.int32), ('size', np.int32), ('kind', np.uint8),
+    ('previous_x', np.int32), ('previous_y', np.int32),  # Position before the last step, for interpolated drawing
+    ('health', np.int32), ('speed', np.int32),
+    ('melee_range', np.int32), ('melee_damage', np.int32),
+    ('attack_cooldown', np.int64), ('last_attack_time', np.int64),
+    ('attacking', np.bool_), ('attack_animation_start_time', np.int64), ('attack_animation_duration', np.int64),
+    ('facing_right', np.bool_), ('walking', np.bool_),
+    ('is_flashing', np.bool_), ('flash_start_time', np.int64), ('flash_duration', np.int64),
+    ('animation_speed', np.int64), ('last_animation_time', np.int64),
+    ('current_idle_frame', np.int32), ('current_walk_frame', np.int32),
+    ('idle_frames', np.int32), ('walk_frames', np.int32), ('attack_frames', np.int32),
+    ('animation_state', np.uint8), ('animation_frame', np.int32),
+)
+
+def overlaps(ax, ay, a_size, bx, by, b_size):
+    """Element-wise colliderect for square rects given as arrays."""
+    return (ax < bx + b_size) & (bx < ax + a_size) & (ay < by + b_size) & (by < ay + a_size)
+
+def overlaps_rect(x, y, size, rect):
+    """Element-wise colliderect of square rects given as arrays against one pygame Rect."""
+    return (x < rect.right) & (rect.left < x + size) & (y < rect.bottom) & (rect.top < y + size)
+
+def neighbour_pairs(left, top, right, bottom, cell_size):
+    """Return index arrays (i, j) of boxes that share a uniform grid cell, possibly repeated.
+
+    cell_size must be at least the largest box, so every box covers at most 2x2 cells.
+    """
+    first_x, first_y = left // cell_size, top // cell_size
+    last_x, last_y = (right - 1) // cell_size, (bottom - 1) // cell_size
+    ids = np.arange(len(left))
+    entry_ids, entry_keys = [], []
+    for offset_x in (0, 1):
+        for offset_y in (0, 1):
+            covered = (first_x + offset_x <= last_x) & (first_y + offset_y <= last_y)
+            entry_ids.append(ids[covered])
+            entry_keys.append((first_x[covered] + offset_x).astype(np.int64) << 32 | (first_y[covered] + offset_y) & 0xFFFFFFFF)
+    entry_ids = np.concatenate(entry_ids)
+    entry_keys = np.concatenate(entry_keys)
+    order = np.argsort(entry_keys, kind='stable')
+    entry_ids, entry_keys = entry_ids[order], entry_keys[order]
+
+    # Entries of one cell are contiguous after sorting: pair each with the ones 1, 2, ... places later
+    pairs_i, pairs_j = [], []
+    offset = 1
+    while offset < len(entry_keys):
+        same = entry_keys[offset:] == entry_keys[:-offset]
+        if not same.any():
+            break
+        pairs_i.append(entry_ids[:-offset][same])
+        pairs_j.append(entry_ids[offset:][same])
+        offset += 1
+    if not pairs_i:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+class StoreField:
+    """Attribute of an enemy view that reads and writes its slot in one of the store's arrays."""
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, enemy, owner):
+        if enemy is None:
+            return self
+        return getattr(enemy.store, self.name)[enemy.slot].item()
+
+    def __set__(self, enemy, value):
+        getattr(enemy.store, self.name)[enemy.slot] = value
+
+class EnemyStore:
+    """Every live enemy's state in parallel NumPy arrays (structure of arrays), updated as one batch per tick.
+
+    Enemy objects are thin views holding a slot. The store also behaves like the list of enemies it
+    replaced: iterate it, take len(), slice it with [:] or remove() an enemy. Overlap queries read the
+    position arrays directly, so there is no separate broadphase to rebuild or keep in sync.
+    """
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.count = 0
+        self.views = []  # slot -> Enemy view, always count long
+        for name, dtype in FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.views[:])  # A snapshot, so enemies can be removed while iterating
+
+    def __getitem__(self, index):
+        return self.views[index]
+
+    def grow(self):
+        self.capacity *= 2
+        for name, dtype in FIELDS:
+            array = getattr(self, name)
+            grown = np.zeros(self.capacity, dtype=dtype)
+            grown[:self.count] = array[:self.count]
+            setattr(self, name, grown)
+
+    def add(self, enemy, x, y):
+        """Give an enemy view the next free slot, with every field zeroed apart from its position and kind."""
+        if self.count == self.capacity:
+            self.grow()
+        slot = self.count
+        for name, dtype in FIELDS:
+            getattr(self, name)[slot] = 0
+        self.x[slot] = self.previous_x[slot] = x
+        self.y[slot] = self.previous_y[slot] = y
+        self.kind[slot] = enemy.kind
+        self.views.append(enemy)
+        self.count += 1
+        enemy.store = self
+        enemy.slot = slot
+
+    def remove(self, enemy):
+        """Remove an enemy by moving the last one into its slot. The removed view keeps a private copy of its state."""
+        slot = enemy.slot
+        if enemy.store is not self or slot >= self.count or self.views[slot] is not enemy:
+            raise ValueError("enemy is not in this store")
+        detached = EnemyStore(1)
+        for name, dtype in FIELDS:
+            getattr(detached, name)[0] = getattr(self, name)[slot]
+        detached.views.append(enemy)
+        detached.count = 1
+
+        last = self.count - 1
+        if slot != last:
+            for name, dtype in FIELDS:
+                array = getattr(self, name)
+                array[slot] = array[last]
+            moved = self.views[last]
+            self.views[slot] = moved
+            moved.slot = slot
+        self.views.pop()
+        self.count -= 1
+        enemy.store = detached
+        enemy.slot = 0
+
+    def clear(self):
+        for enemy in self.views[:]:
+            self.remove(enemy)
+
+    def query(self, rect, exclude=None):
+        """Return every enemy whose rect overlaps rect, in slot order."""
+        count = self.count
+        hit = overlaps_rect(self.x[:count], self.y[:count], self.size[:count], rect)
+        views = self.views
+        return [views[slot] for slot in np.flatnonzero(hit).tolist() if views[slot] is not exclude]
+
+    def collides(self, rect, exclude=None):
+        """Return True if any enemy other than exclude overlaps rect."""
+        if exclude is None:
+            count = self.count
+            return bool(overlaps_rect(self.x[:count], self.y[:count], self.size[:count], rect).any())
+        return bool(self.query(rect, exclude))
+
+    def overlapping(self, x, y, size):
+        """Batched query for square rects given as arrays: index arrays (rect, enemy slot) of every overlap,
+        ordered by rect and then slot."""
+        count = self.count
+        if count == 0 or len(x) == 0:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        hit = overlaps(x[:, None], y[:, None], size[:, None], self.x[None, :count], self.y[None, :count], self.size[None, :count])
+        return np.nonzero(hit)
+
+    def queue_sprites(self, queue, alpha=1.0):
+        """Queue the on-screen enemies' current frames, alpha of the way from their previous positions to their current ones."""
+        count = self.count
+        previous_x, previous_y = self.previous_x[:count], self.previous_y[:count]
+        x = previous_x + (self.x[:count] - previous_x) * alpha
+        y = previous_y + (self.y[:count] - previous_y) * alpha
+        size = self.size[:count]
+        visible = queue.cull(x, y, size, size)
+        views = self.views
+        queue.add_many(ENEMY_LAYER, [views[slot].image for slot in visible.tolist()], x[visible], y[visible])
+
+    def update(self, player, collision_grid, pathfinder, now, projectiles=None):
+        """Move, attack and animate every enemy for one simulation step. Spells are fired into the projectiles pool."""
+        if self.count == 0:
+            return
+        count = self.count
+        self.previous_x[:count] = self.x[:count]
+        self.previous_y[:count] = self.y[:count]
+        with profiler.scope('enemy movement'):
+            self.move_towards_player(player.rect, collision_grid, pathfinder)
+        with profiler.scope('enemy attacks'):
+            self.attack(player, now, projectiles)
+        with profiler.scope('enemy animation'):
+            self.update_animation(now)
+
+    def move_towards_player(self, player_rect, collision_grid, pathfinder):
+        """Pick each enemy's first free move toward the player, for all enemies at once.
+
+        Goblins and mages step along the shared flow field (or straight at the player when it has no step),
+        never into walls, other enemies or the player. The boss follows the flow field while far away and
+        otherwise closes in while keeping BOSS_GAP pixels from the player.
+        """
+        count = self.count
+        if count <= SMALL_BATCH:
+            self.move_few_towards_player(player_rect, collision_grid, pathfinder)
+            return
+        x = self.x[:count].astype(np.int64)
+        y = self.y[:count].astype(np.int64)
+        size = self.size[:count].astype(np.int64)
+        speed = self.speed[:count].astype(np.int64)
+        boss = self.kind[:count] == BOSS
+
+        # Goblins and mages chase top-left to top-left, the boss centre to centre
+        half = size // 2
+        dx = np.where(boss, player_rect.centerx - (x + half), player_rect.x - x)
+        dy = np.where(boss, player_rect.centery - (y + half), player_rect.y - y)
+        facing_right = self.facing_right[:count]
+        facing_right[dx > 0] = True
+        facing_right[(dx < 0) | (boss & (dx == 0))] = False
+
+        # Waypoints from the shared flow field, one lookup per enemy size
+        waypoint_x = np.zeros(count, dtype=np.int64)
+        waypoint_y = np.zeros(count, dtype=np.int64)
+        has_waypoint = np.zeros(count, dtype=bool)
+        if pathfinder is not None:
+            for enemy_size in np.unique(size):
+                same_size = size == enemy_size
+                waypoint_x[same_size], waypoint_y[same_size], has_waypoint[same_size] = \
+                    pathfinder.next_positions(x[same_size], y[same_size], int(enemy_size))
+        has_waypoint &= ~boss | (np.maximum(np.abs(dx), np.abs(dy)) > size + TILE_SIZE)
+
+        # Candidate moves in order of preference: toward the waypoint on both axes, then sliding on either
+        # axis, then the direct chase (the boss's keeps its gap and may be to stand still)
+        step_x = np.clip(waypoint_x - x, -speed, speed)
+        step_y = np.clip(waypoint_y - y, -speed, speed)
+        diagonal = has_waypoint & (step_x != 0) & (step_y != 0)
+        horizontal = np.abs(dx) > np.abs(dy)
+        chase_x = np.where(dx > 0, speed, -speed)
+        chase_y = np.where(dy > 0, speed, -speed)
+        chase_step_x = np.where(horizontal, chase_x, 0)
+        chase_step_y = np.where(horizontal, 0, chase_y)
+        too_close = np.where(horizontal,
+                             np.abs(player_rect.centerx - (x + half + chase_x)),
+                             np.abs(player_rect.centery - (y + half + chase_y))) < half + BOSS_GAP
+        hold = boss & too_close
+        candidates = [
+            (x + step_x, y + step_y, has_waypoint),
+            (x + step_x, y, diagonal),
+            (x, y + step_y, diagonal),
+            (np.where(hold, x, x + chase_step_x), np.where(hold, y, y + chase_step_y), boss | ~has_waypoint),
+        ]
+
+        # Anything within one step of an enemy could block it this tick
+        reach = size + 2 * speed
+        pairs_i, pairs_j = neighbour_pairs(x - speed, y - speed, x - speed + reach, y - speed + reach, int(reach.max()))
+
+        # The boss's direct chase is refused while it already touches the gap around the player
+        boss_blocked = boss & overlaps_rect(x, y, size, player_rect.inflate(BOSS_GAP * 2, BOSS_GAP * 2))
+
+        new_x = x.copy()
+        new_y = y.copy()
+        moved = np.zeros(count, dtype=bool)
+        for index, (candidate_x, candidate_y, valid) in enumerate(candidates):
+            open_move = valid & ~moved
+            if not open_move.any():
+                continue
+            blocked = collision_grid.collides_rects(candidate_x, candidate_y, size, size)
+            hits = overlaps(candidate_x[pairs_i], candidate_y[pairs_i], size[pairs_i], x[pairs_j], y[pairs_j], size[pairs_j])
+            blocked[pairs_i[hits]] = True
+            hits = overlaps(candidate_x[pairs_j], candidate_y[pairs_j], size[pairs_j], x[pairs_i], y[pairs_i], size[pairs_i])
+            blocked[pairs_j[hits]] = True
+            player_hit = overlaps_rect(candidate_x, candidate_y, size, player_rect)
+            if index < 3:
+                blocked |= player_hit & ~boss  # The boss may brush the player while pathing
+            else:
+                blocked |= np.where(boss, boss_blocked, player_hit)
+            accepted = open_move & ~blocked
+            new_x[accepted] = candidate_x[accepted]
+            new_y[accepted] = candidate_y[accepted]
+            moved |= accepted
+
+        # Every move was checked against the others' old spots; where two moves land on each other, the later enemy waits
+        if len(pairs_i):
+            both = moved[pairs_i] & moved[pairs_j]
+            clash = both & overlaps(new_x[pairs_i], new_y[pairs_i], size[pairs_i], new_x[pairs_j], new_y[pairs_j], size[pairs_j])
+            waiting = np.maximum(pairs_i[clash], pairs_j[clash])
+            new_x[waiting] = x[waiting]
+            new_y[waiting] = y[waiting]
+            moved[waiting] = False
+
+        self.x[:count] = new_x
+        self.y[:count] = new_y
+        self.walking[:count] = moved
+
+    def move_few_towards_player(self, player_rect, collision_grid, pathfinder):
+        """move_towards_player one enemy at a time in plain Python, for the first rounds' handful of enemies.
+
+        Same rules and the same moves, without NumPy's per-call overhead, which dominates at this size.
+        """
+        count = self.count
+        xs = self.x[:count].tolist()
+        ys = self.y[:count].tolist()
+        sizes = self.size[:count].tolist()
+        speeds = self.speed[:count].tolist()
+        bosses = (self.kind[:count] == BOSS).tolist()
+        facing_right = self.facing_right
+        gap_rect = player_rect.inflate(BOSS_GAP * 2, BOSS_GAP * 2)
+        left, top, right, bottom = player_rect.left, player_rect.top, player_rect.right, player_rect.bottom
+
+        new_x = xs[:]
+        new_y = ys[:]
+        moved = [False] * count
+        for index in range(count):
+            x, y, size, speed, boss = xs[index], ys[index], sizes[index], speeds[index], bosses[index]
+            half = size // 2
+            if boss:
+                dx, dy = player_rect.centerx - (x + half), player_rect.centery - (y + half)
+            else:
+                dx, dy = left - x, top - y
+            if dx > 0:
+                facing_right[index] = True
+            elif dx < 0 or boss and dx == 0:
+                facing_right[index] = False
+
+            waypoint = pathfinder.field_for(size).next_step(x // TILE_SIZE, y // TILE_SIZE) if pathfinder is not None else None
+            has_waypoint = waypoint is not None and (not boss or max(abs(dx), abs(dy)) > size + TILE_SIZE)
+            step_x = step_y = 0
+            if has_waypoint:
+                step_x = min(max(waypoint[0] * TILE_SIZE - x, -speed), speed)
+                step_y = min(max(waypoint[1] * TILE_SIZE - y, -speed), speed)
+            diagonal = has_waypoint and step_x != 0 and step_y != 0
+            horizontal = abs(dx) > abs(dy)
+            chase_x = speed if dx > 0 else -speed
+            chase_y = speed if dy > 0 else -speed
+            if horizontal:
+                too_close = abs(player_rect.centerx - (x + half + chase_x)) < half + BOSS_GAP
+                chase = (x + chase_x, y)
+            else:
+                too_close = abs(player_rect.centery - (y + half + chase_y)) < half + BOSS_GAP
+                chase = (x, y + chase_y)
+            if boss and too_close:
+                chase = (x, y)
+            candidates = (
+                (x + step_x, y + step_y, has_waypoint),
+                (x + step_x, y, diagonal),
+                (x, y + step_y, diagonal),
+                (chase[0], chase[1], boss or not has_waypoint),
+            )
+            boss_blocked = boss and x < gap_rect.right and gap_rect.left < x + size and y < gap_rect.bottom and gap_rect.top < y + size
+
+            for candidate_index, (candidate_x, candidate_y, valid) in enumerate(candidates):
+                if not valid:
+                    continue
+                player_hit = candidate_x < right and left < candidate_x + size and candidate_y < bottom and top < candidate_y + size
+                if candidate_index < 3:
+                    blocked = player_hit and not boss  # The boss may brush the player while pathing
+                else:
+                    blocked = boss_blocked if boss else player_hit
+                if blocked or collision_grid.collides_rect(pygame.Rect(candidate_x, candidate_y, size, size)):
+                    continue
+                if any(other != index and candidate_x < xs[other] + sizes[other] and xs[other] < candidate_x + size and
+                       candidate_y < ys[other] + sizes[other] and ys[other] < candidate_y + size for other in range(count)):
+                    continue
+                new_x[index], new_y[index] = candidate_x, candidate_y
+                moved[index] = True
+                break
+
+        # Every move was checked against the others' old spots; where two moves land on each other, the later enemy waits
+        waiting = set()
+        for first in range(count):
+            if not moved[first]:
+                continue
+            for second in range(first + 1, count):
+                if (moved[second] and new_x[first] < new_x[second] + sizes[second] and new_x[second] < new_x[first] + sizes[first] and
+                        new_y[first] < new_y[second] + sizes[second] and new_y[second] < new_y[first] + sizes[first]):
+                    waiting.add(second)
+        for index in waiting:
+            new_x[index], new_y[index] = xs[index], ys[index]
+            moved[index] = False
+
+        self.x[:count] = new_x
+        self.y[:count] = new_y
+        self.walking[:count] = moved
+
+    def attack(self, player, now, projectiles):
+        """Start melee hits and spell casts for every enemy in range whose cooldown has run out."""
+        count = self.count
+        x = self.x[:count]
+        y = self.y[:count]
+        size = self.size[:count]
+        kind = self.kind[:count]
+        ready = now - self.last_attack_time[:count] >= self.attack_cooldown[:count]
+        player_rect = player.rect
+
+        # Goblins reach from centre to centre, the boss hits a square one tile larger on every side,
+        # mages cast whenever they are ready (and have a pool to cast into)
+        centre_distance = np.hypot(player_rect.centerx - (x + size // 2), player_rect.centery - (y + size // 2))
+        in_melee_range = centre_distance <= self.melee_range[:count]
+        in_boss_range = overlaps_rect(x - TILE_SIZE, y - TILE_SIZE, size + TILE_SIZE * 2, player_rect)
+        in_range = np.select([kind == MELEE, kind == BOSS], [in_melee_range, in_boss_range], projectiles is not None)
+
+        for slot in np.flatnonzero(ready & in_range).tolist():
+            self.views[slot].attack(player, now, projectiles)
+
+    def update_animation(self, now):
+        """Advance flash, attack and idle/walk animation timers and pick every enemy's frame."""
+        count = self.count
+        flashing = self.is_flashing[:count]
+        flashing &= now - self.flash_start_time[:count] < self.flash_duration[:count]
+
+        # A flashing enemy holds its frame; otherwise attack frames play out, then idle or walk frames
+        attacking = self.attacking[:count]
+        animating = ~flashing
+        attack_over = animating & attacking & (now - self.attack_animation_start_time[:count] >= self.attack_animation_duration[:count])
+        attacking &= ~attack_over
+        shows_attack = attacking & (self.kind[:count] != MELEE)  # Goblins never show their attack frames
+
+        walking = self.walking[:count]
+        advance = animating & ~shows_attack & (now - self.last_animation_time[:count] >= self.animation_speed[:count])
+        walk_frame = self.current_walk_frame[:count]
+        idle_frame = self.current_idle_frame[:count]
+        walk_frame[:] = np.where(advance & walking, (walk_frame + 1) % self.walk_frames[:count], walk_frame)
+        idle_frame[:] = np.where(advance & ~walking, (idle_frame + 1) % self.idle_frames[:count], idle_frame)
+        self.last_animation_time[:count][advance] = now
+
+        attack_frames = self.attack_frames[:count]
+        frame_duration = np.maximum(1, self.attack_animation_duration[:count] // attack_frames)
+        attack_frame = (now - self.attack_animation_start_time[:count]) // frame_duration % attack_frames
+        state = np.where(shows_attack, ATTACK, np.where(walking, WALK, IDLE))
+        frame = np.where(shows_attack, attack_frame, np.where(walking, walk_frame, idle_frame))
+        self.animation_state[:count][animating] = state[animating]
+        self.animation_frame[:count][animating] = frame[animating]
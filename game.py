@@ -0,0 +1,288 @@
+import pygame
+import random
+import zlib
+from settings import TILE_SIZE
+from player import Player
+from projectile import ProjectilePool, preload_images
+from enemy import RangedEnemy, Enemy, BossMeleeEnemy
+from enemy_store import EnemyStore
+from dungeon import Dungeon
+from pathfinding import Pathfinder
+from hit_stage import HitStage
+from effects import EffectTimeline
+from hud import Hud
+from sound_bank import sound_bank
+from render_queue import RenderQueue
+from profiler import profiler
+
+# Attacks the player can trigger, by their keybinding name in the inventory
+ACTIONS = ("Melee Attack", "Ranged Attack", "Fireball", "Teleport", "Lightning Strike")
+
+class Game:
+    """The dungeon, player, enemies and projectiles, advanced one fixed simulation step at a time.
+
+    main.py feeds it input and draws it; headless.py only steps it, so nothing here needs a window
+    or speakers.
+    """
+    def __init__(self, screen_width, screen_height, dungeon_width_in_tiles=100, dungeon_height_in_tiles=100, seed=None, deferred=False):
+        """With deferred=True the expensive parts are left for the caller to run from build_stages()."""
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.dungeon_width_in_tiles = dungeon_width_in_tiles
+        self.dungeon_height_in_tiles = dungeon_height_in_tiles
+        # Every random choice (map, spawn counts, spawn positions) comes from this seed, so it can be recorded
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # Round-related variables
+        self.current_round = 1
+        self.enemies_per_round = 5  # Start with 5 enemies in round 1
+        self.enemies = EnemyStore()  # Enemy state in arrays, populated at the start of each round and updated as one batch
+        self.enemies_defeated = 0  # Keep track of how many enemies have been defeated
+
+        self.projectiles = ProjectilePool()  # Player and enemy projectiles share one pool
+        self.hits = HitStage()  # Collects attack shapes and resolves every hit once per step
+        self.effects = EffectTimeline()  # Slash, teleport and lightning animations, drawn with the frame
+        self.hud = Hud(screen_width)  # Bars and counters, redrawn only when their values change
+        self.render_queue = RenderQueue()  # Every sprite of a frame, culled and drawn a layer at a time
+
+        self.lightning_in_progress = False
+        self.lightning_move_cooldown = 35  # Cooldown in milliseconds (adjust as needed)
+        self.last_lightning_move_time = 0
+
+        if not deferred:
+            for name, stage in self.build_stages():
+                stage()
+
+    def build_stages(self):
+        """The slow parts of setting up a game, as (name, function) pairs to run in order."""
+        return [
+            ('dungeon', self.build_dungeon),
+            ('projectile sprites', preload_images),  # Decode projectile frames now rather than on the first shot
+            ('player', self.build_player),
+            ('enemies', self.build_enemies),
+        ]
+
+    def build_dungeon(self):
+        self.dungeon = Dungeon(self.dungeon_width_in_tiles, self.dungeon_height_in_tiles, seed=self.seed)
+
+    def build_player(self):
+        # Start in the largest connected region so the player isn't boxed into a sealed pocket
+        start = self.dungeon.get_random_open_position(region=self.dungeon.open_tiles.largest_region())
+        self.player_start_x, self.player_start_y = start or (TILE_SIZE, TILE_SIZE)  # An all-wall map; the spawn area is cleared below
+        self.player = Player(self.player_start_x, self.player_start_y)
+
+        self.dungeon.clear_spawn_area(self.player_start_x // TILE_SIZE, self.player_start_y // TILE_SIZE)
+        self.pathfinder = Pathfinder(self.dungeon.collision_grid)  # Flow fields shared by every chasing enemy
+
+    def build_enemies(self):
+        self.spawn_enemies()
+        self.camera_offset = self.camera_for(*self.player.rect.topleft)
+
+    def spawn_enemies(self):
+        """Spawn enemies based on the current round."""
+        # Increase difficulty each round by adding more enemies
+        num_ranged = self.rng.randint(1, self.current_round // 2 + 1)
+        num_melee = self.rng.randint(2, self.current_round + 2)
+        num_boss = 1 + self.current_round // 3  # Add a boss enemy every 3 rounds
+
+        enemies = self.enemies
+        enemies.clear()
+        view = pygame.Rect(self.camera_for(*self.player.rect.topleft), (self.screen_width, self.screen_height))
+        for _ in range(num_ranged):
+            RangedEnemy(*self.spawn_position(40, view), self.screen_width, self.screen_height, store=enemies)
+        for _ in range(num_melee):
+            Enemy(*self.spawn_position(40, view), store=enemies)
+        for _ in range(num_boss):
+            BossMeleeEnemy(*self.spawn_position(80, view), store=enemies)
+
+    def spawn_position(self, size, view=None):
+        """A spot for an enemy of a size in the player's region, off the view rect and away from the player.
+
+        The filters are dropped one at a time when nothing passes them (the view first, as on a map not much
+        bigger than the screen); the footprint always has to fit, so an enemy never lands half inside a wall.
+        """
+        dungeon = self.dungeon
+        near = self.player.rect
+        min_distance = TILE_SIZE * 5
+        position = None
+        if view is not None:
+            position = dungeon.get_random_open_position(near=near, min_distance=min_distance, outside_rect=view, size=size)
+        if position is None:
+            position = dungeon.get_random_open_position(near=near, min_distance=min_distance, size=size)
+        if position is None:
+            position = dungeon.get_random_open_position(size=size)
+        if position is None:
+            raise ValueError(f"no open space in the dungeon fits a {size}px enemy")
+        return position
+
+    def check_for_next_round(self):
+        """Check if all enemies are defeated and advance to the next round."""
+        if not self.enemies:
+            self.current_round += 1  # Move to the next round
+            self.enemies_defeated = 0
+            self.spawn_enemies()
+
+    def restart(self, inventory, current_time):
+        """Put the player back at the start of round 1."""
+        self.player.reset(self.player_start_x, self.player_start_y, inventory, current_time)  # Pass inventory to reset
+        self.current_round = 1
+        self.enemies_defeated = 0
+        self.spawn_enemies()
+        self.projectiles.clear()  # Clear all projectiles
+        self.hits.clear()
+        self.effects.clear()
+        self.lightning_in_progress = False
+
+    def purchase(self, inventory, index):
+        """Select an inventory entry (an unlock or an upgrade) for the player."""
+        inventory.selected_attack_index = index
+        inventory.select(self.player)
+
+    def camera_for(self, player_x, player_y):
+        """Top-left of the view centred on a player position, clamped to the dungeon."""
+        camera_offset_x = int(player_x) + self.player.size // 2 - self.screen_width // 2
+        camera_offset_y = int(player_y) + self.player.size // 2 - self.screen_height // 2
+
+        camera_offset_x = max(0, min(camera_offset_x, self.dungeon.tiles_x * TILE_SIZE - self.screen_width))
+        camera_offset_y = max(0, min(camera_offset_y, self.dungeon.tiles_y * TILE_SIZE - self.screen_height))
+        return (camera_offset_x, camera_offset_y)
+
+    def perform(self, action, current_time):
+        """Trigger one of ACTIONS; ignored while the lightning strike is being aimed."""
+        if self.lightning_in_progress:
+            return
+        player = self.player
+        map_width = self.dungeon_width_in_tiles * TILE_SIZE
+        map_height = self.dungeon_height_in_tiles * TILE_SIZE
+        if action == "Melee Attack":
+            player.melee_attack(self.hits, self.effects, current_time)
+        elif action == "Ranged Attack":
+            player.ranged_attack(self.projectiles, map_width, map_height, current_time)
+        elif action == "Fireball":
+            if player.fireball_unlocked:
+                player.fireball_attack(self.projectiles, map_width, map_height, current_time)
+        elif action == "Teleport":
+            dungeon = self.dungeon
+            if player.teleport_attack_unlocked:
+                player.teleport_attack(self.effects, dungeon.collision_grid, dungeon.tiles_x, dungeon.tiles_y, dungeon, self.screen_width, self.screen_height, self.hits, self.projectiles, self.enemies, current_time)
+            else:
+                player.teleport(self.effects, dungeon.collision_grid, dungeon.tiles_x, dungeon.tiles_y, dungeon, self.screen_width, self.screen_height, self.enemies, self.projectiles, current_time)
+        elif action == "Lightning Strike":
+            if player.lightning_unlocked:
+                if player.mana >= 30:  # Ensure player has enough mana (adjust mana cost as needed)
+                    player.start_lightning_strike(map_width, map_height, current_time)
+                    self.lightning_in_progress = True
+                    self.last_lightning_move_time = current_time  # Reset cooldown
+                else:
+                    print("Not enough mana for lightning strike!")  # Notify player of insufficient mana
+        else:
+            raise ValueError(f"unknown action {action!r}")
+
+    def aim_lightning(self, keys, current_time):
+        """While a lightning strike is being placed, move its target with the arrow keys and confirm with Enter."""
+        if not self.lightning_in_progress:
+            return
+        if current_time - self.last_lightning_move_time >= self.lightning_move_cooldown:
+            player = self.player
+            if keys[pygame.K_LEFT]:
+                player.move_lightning_strike_target("left")
+                self.last_lightning_move_time = current_time
+            if keys[pygame.K_RIGHT]:
+                player.move_lightning_strike_target("right")
+                self.last_lightning_move_time = current_time
+            if keys[pygame.K_UP]:
+                player.move_lightning_strike_target("up")
+                self.last_lightning_move_time = current_time
+            if keys[pygame.K_DOWN]:
+                player.move_lightning_strike_target("down")
+                self.last_lightning_move_time = current_time
+            if keys[pygame.K_RETURN]:  # Confirm lightning strike
+                player.confirm_lightning_strike(self.hits, self.effects, current_time)
+                self.lightning_in_progress = False
+
+    def step(self, step_input, current_time):
+        """Run one simulation step from a StepInput: its attacks, lightning aiming, then the world update."""
+        for action in step_input.actions:
+            self.perform(action, current_time)
+        self.aim_lightning(step_input.keys, current_time)
+        self.simulate(step_input.keys, current_time)
+
+    def replay_step(self, step_input, current_time, inventory):
+        """Run a recorded step, first redoing the restart and purchases that happened while paused before it."""
+        if step_input.restart:
+            self.restart(inventory, current_time)
+        for index in step_input.purchases:
+            self.purchase(inventory, index)
+        self.step(step_input, current_time)
+
+    def state_digest(self):
+        """Checksum of the player, round, enemies and projectiles, to check a replay ends where the recording did."""
+        player = self.player
+        count = self.enemies.count
+        digest = zlib.crc32(repr((player.rect.topleft, player.health, player.mana, player.xp, player.level,
+                                  self.current_round, len(self.projectiles))).encode())
+        for array in (self.enemies.x, self.enemies.y, self.enemies.health):
+            digest = zlib.crc32(array[:count].tobytes(), digest)
+        return digest
+
+    def simulate(self, keys, current_time):
+        """Advance the game by one fixed step with the arrow keys held in keys."""
+        player = self.player
+        dungeon = self.dungeon
+        enemies = self.enemies
+        projectiles = self.projectiles
+
+        self.check_for_next_round()
+
+        with profiler.scope('player'):
+            player.previous_position = player.rect.topleft
+            if not self.lightning_in_progress:
+                player.handle_movement(keys, dungeon.collision_grid, dungeon.tiles_x, dungeon.tiles_y, enemies)  # Pass enemies to prevent overlap
+                player.update_aim_direction(keys)
+            self.camera_offset = self.camera_for(*player.rect.topleft)
+            sound_bank.listen(player.rect.center, pygame.Rect(self.camera_offset, (self.screen_width, self.screen_height)))
+
+        # Move every projectile in one batch; the pool frees those that hit walls or leave their bounds
+        with profiler.scope('projectiles'):
+            projectiles.update(dungeon.collision_grid, self.camera_offset, current_time)
+
+        # Every hit this step (projectiles, slashes, lightning, teleport blasts, enemy bolts) in one batch
+        with profiler.scope('hits'):
+            self.hits.resolve(player, enemies, projectiles, current_time)
+
+        # Update all enemies (ranged enemies cast into the projectile pool)
+        with profiler.scope('pathfinding'):
+            self.pathfinder.update(player.rect)
+        with profiler.scope('enemies'):
+            enemies.update(player, dungeon.collision_grid, self.pathfinder, current_time, projectiles)  # Move, attack and animate every enemy in one batch
+        player.update(current_time)
+        self.effects.update(current_time)  # Retire animations that have played out
+
+    def draw(self, screen, alpha=1.0):
+        """Draw the world alpha of the way between the last two simulation steps."""
+        player = self.player
+        view_offset = self.camera_for(*player.interpolated_position(alpha))
+
+        screen.fill((0, 0, 0))
+
+        with profiler.scope('draw dungeon'):
+            self.dungeon.draw(screen, view_offset)
+
+        # Projectiles, enemies, effects and the player, culled to the view and drawn back to front
+        queue = self.render_queue
+        queue.begin(pygame.Rect(view_offset, (self.screen_width, self.screen_height)))
+        with profiler.scope('queue sprites'):
+            self.projectiles.queue_sprites(queue, alpha)
+            self.enemies.queue_sprites(queue, alpha)
+            self.effects.queue_sprites(queue)
+            player.queue_sprite(queue, alpha)
+        with profiler.scope('draw sprites'):
+            queue.flush(screen)
+        player.draw_indicators(screen, view_offset)
+
+        # Health, mana, XP and level at the top left, round number at the top right
+        with profiler.scope('draw hud'):
+            self.hud.draw(screen, player, self.current_round)
@@ -0,0 +1,44 @@
+import pygame
+from settings import FPS, MAX_FPS, MAX_CATCH_UP_STEPS
+
+class GameClock:
+    """Fixed-step simulation clock.
+
+    The wall clock is read once per frame; the elapsed time fills an accumulator that is spent in
+    whole simulation steps of 1/FPS seconds. Everything in the simulation uses `now`, the simulation
+    time in milliseconds, so gameplay runs at the same speed however fast frames are drawn.
+    """
+    def __init__(self, rate=FPS, max_fps=MAX_FPS, max_steps=MAX_CATCH_UP_STEPS):
+        self.clock = pygame.time.Clock()
+        self.rate = rate
+        self.step_length = 1000 / rate  # Milliseconds per simulation step
+        self.max_fps = max_fps
+        self.max_steps = max_steps
+        self.accumulator = 0.0  # Wall time not yet simulated
+        self.steps = 0  # Simulation steps run so far
+        self.now = 0  # Simulation time in milliseconds
+
+    def tick(self):
+        """Wait for the frame cap, then return how many simulation steps are due this frame."""
+        self.accumulator += self.clock.tick(self.max_fps)  # The one clock read per frame
+        due = int(self.accumulator // self.step_length)
+        if due > self.max_steps:
+            # Too far behind (a long stall): drop the backlog instead of spiralling into ever longer frames
+            self.accumulator -= (due - self.max_steps) * self.step_length
+            due = self.max_steps
+        return due
+
+    def advance(self):
+        """Account for one simulation step that has just run."""
+        self.accumulator -= self.step_length
+        self.steps += 1
+        self.now = self.steps * 1000 // self.rate
+
+    def hold(self):
+        """Discard the time of a frame where the simulation is paused (menus, game over)."""
+        self.accumulator = 0.0
+
+    @property
+    def alpha(self):
+        """How far the frame lies between the last simulation step and the next, for interpolated drawing."""
+        return min(1.0, self.accumulator / self.step_length)
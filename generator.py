@@ -0,0 +1,156 @@
+import itertools
+import numpy as np
+
+# Tile values stored in the layout array
+FLOOR = 0
+WALL = 1
+
+TERRAIN_TYPES = ('structures', 'caves', 'walk')
+
+# Predefined wall shapes as (x, y) offsets
+SHAPES = [
+    # Long horizontal wall
+    [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0)],
+
+    # Long vertical wall
+    [(0, 0), (0, 1), (0, 2), (0, 3), (0, 4)],
+
+    # L-shape
+    [(0, 0), (1, 0), (2, 0), (0, 1), (0, 2)],
+
+    # U-shape
+    [(0, 0), (1, 0), (2, 0), (0, 1), (2, 1), (0, 2), (2, 2)],
+
+    # Helix shape
+    [(0, 0), (1, 0), (2, 0), (2, 1), (1, 1), (1, 2), (2, 2)]
+]
+
+# Every order the DFS blobs can try their four neighbours in
+DIRECTION_ORDERS = list(itertools.permutations(((0, 1), (1, 0), (0, -1), (-1, 0))))
+
+# The original 100x100 map had 15-20 shapes and 8-12 DFS blobs, counts scale with the map area
+BASE_AREA = 100 * 100
+
+def generate_layout(width, height, terrain='structures', seed=None):
+    """Generate a (height, width) uint8 array of FLOOR/WALL tiles for the given terrain type.
+
+    seed can be an int, None, or an existing numpy Generator to draw from.
+    """
+    rng = np.random.default_rng(seed)
+    if terrain == 'structures':
+        tiles = np.zeros((height, width), dtype=np.uint8)
+        stamp_shapes(tiles, rng)
+        grow_blobs(tiles, rng)
+    elif terrain == 'caves':
+        tiles = cellular_caves(width, height, rng)
+    elif terrain == 'walk':
+        tiles = random_walk_caves(width, height, rng)
+    else:
+        raise ValueError(f"Unknown terrain type: {terrain}")
+    return tiles
+
+def scaled_count(tiles, low, high, rng):
+    """Scale a per-100x100 structure count range to the size of the map."""
+    scale = tiles.size / BASE_AREA
+    return max(1, int(round(rng.integers(low, high + 1) * scale)))
+
+def stamp_shapes(tiles, rng):
+    """Stamp random predefined shapes onto the map in one vectorized write."""
+    height, width = tiles.shape
+    count = scaled_count(tiles, 15, 20, rng)
+
+    # Offsets of every shape packed into flat arrays, with each shape's slice into them
+    shape_lengths = np.array([len(shape) for shape in SHAPES])
+    shape_starts = np.concatenate(([0], np.cumsum(shape_lengths)[:-1]))
+    offsets = np.array([offset for shape in SHAPES for offset in shape], dtype=np.int64)
+    shape_widths = np.array([max(x for x, y in shape) + 1 for shape in SHAPES])
+    shape_heights = np.array([max(y for x, y in shape) + 1 for shape in SHAPES])
+
+    chosen = rng.integers(0, len(SHAPES), count)
+    max_x = np.maximum(width - shape_widths[chosen], 1)
+    max_y = np.maximum(height - shape_heights[chosen], 1)
+    origin_x = (rng.random(count) * max_x).astype(np.int64)
+    origin_y = (rng.random(count) * max_y).astype(np.int64)
+
+    # Expand every placed shape into its individual cells
+    lengths = shape_lengths[chosen]
+    owner = np.repeat(np.arange(count), lengths)
+    cell = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    cell_offsets = offsets[shape_starts[chosen][owner] + cell]
+    xs = np.clip(origin_x[owner] + cell_offsets[:, 0], 0, width - 1)
+    ys = np.clip(origin_y[owner] + cell_offsets[:, 1], 0, height - 1)
+    tiles[ys, xs] = WALL
+
+def grow_blobs(tiles, rng, depth_limit=10):
+    """Grow random wall blobs with the original depth-limited DFS, one blob per seed tile.
+
+    From the seed the walk keeps stepping onto a random open 4-neighbour, walling it, while it is
+    fewer than depth_limit steps from the seed, and backtracks when it can't. The walk is plain Python
+    over a bytearray; blobs are small (at most 2 * depth_limit * (depth_limit + 1) + 1 tiles) and the
+    random direction orders are drawn up front, one batch per blob.
+    """
+    height, width = tiles.shape
+    count = scaled_count(tiles, 8, 12, rng)
+    seeds_x = rng.integers(1, max(width - 1, 2), count).tolist()
+    seeds_y = rng.integers(1, max(height - 1, 2), count).tolist()
+    # Each tile is pushed and popped at most once, and only steps under the depth limit shuffle the directions
+    visits = 2 * (2 * depth_limit * (depth_limit + 1) + 1)
+    cells = bytearray(tiles.tobytes())
+
+    for seed_x, seed_y in zip(seeds_x, seeds_y):
+        if not (seed_x < width and seed_y < height):
+            continue  # Maps too small to hold a seed away from the edge
+        orders = iter(rng.integers(0, len(DIRECTION_ORDERS), visits).tolist())
+        cells[seed_y * width + seed_x] = WALL
+        stack = [(seed_x, seed_y, 0)]
+        while stack:
+            x, y, depth = stack[-1]
+            if depth < depth_limit:
+                for dx, dy in DIRECTION_ORDERS[next(orders)]:
+                    next_x, next_y = x + dx, y + dy
+                    if 0 <= next_x < width and 0 <= next_y < height and cells[next_y * width + next_x] == FLOOR:
+                        cells[next_y * width + next_x] = WALL
+                        stack.append((next_x, next_y, depth + 1))
+                        break
+                else:
+                    stack.pop()  # Backtrack, every neighbour is taken
+            else:
+                stack.pop()
+    tiles[:] = np.frombuffer(cells, dtype=np.uint8).reshape(height, width)
+
+def neighbour_walls(walls):
+    """Count the walls in the 8 neighbours of every tile, treating the map edge as wall."""
+    padded = np.pad(walls, 1, constant_values=1).astype(np.uint8)
+    height, width = walls.shape
+    counts = np.zeros(walls.shape, dtype=np.uint8)
+    for dy in (0, 1, 2):
+        for dx in (0, 1, 2):
+            if dx == 1 and dy == 1:
+                continue
+            counts += padded[dy:dy + height, dx:dx + width]
+    return counts
+
+def cellular_caves(width, height, rng, fill=0.45, iterations=5):
+    """Cave terrain from a random fill smoothed by a cellular automata majority rule."""
+    walls = rng.random((height, width), dtype=np.float32) < fill
+    for _ in range(iterations):
+        counts = neighbour_walls(walls)
+        # A tile becomes wall with 5+ wall neighbours and stays wall with 4
+        walls = (counts >= 5) | (walls & (counts == 4))
+    return walls.astype(np.uint8)
+
+def random_walk_caves(width, height, rng, walkers_per_tile=1 / 150, steps=400):
+    """Tunnel terrain carved out of solid rock by many random walkers moving in lockstep."""
+    tiles = np.full((height, width), WALL, dtype=np.uint8)
+    count = max(1, int(width * height * walkers_per_tile))
+    xs = rng.integers(0, width, count)
+    ys = rng.integers(0, height, count)
+    directions = np.array([(0, 1), (1, 0), (0, -1), (-1, 0)])
+
+    tiles[ys, xs] = FLOOR
+    for _ in range(steps):
+        step = directions[rng.integers(0, 4, count)]
+        xs = np.clip(xs + step[:, 0], 0, width - 1)
+        ys = np.clip(ys + step[:, 1], 0, height - 1)
+        tiles[ys, xs] = FLOOR
+    return tiles
@@ -0,0 +1,128 @@
+import sys
+import time
+import random
+import pygame
+from game import Game, ACTIONS
+from game_clock import GameClock
+from inventory import Inventory
+from profiler import profiler
+from recording import HeldKeys, StepInput, InputRecorder, InputLog
+
+ARROW_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN)
+
+class RandomInput:
+    """Wanders in a random direction, changing every so often, and presses random attack keys."""
+    def __init__(self, rng, turn_every=30, action_chance=0.05):
+        self.rng = rng
+        self.turn_every = turn_every  # Steps between changes of direction
+        self.action_chance = action_chance  # Chance of pressing an attack key on any step
+        self.held = HeldKeys()
+
+    def __call__(self, step):
+        if step % self.turn_every == 0:
+            self.held = HeldKeys(key for key in ARROW_KEYS if self.rng.random() < 0.4)
+        actions = [self.rng.choice(ACTIONS)] if self.rng.random() < self.action_chance else []
+        return self.held, actions
+
+def run(steps=36000, seed=None, script=None, max_rounds=None, screen_size=(1280, 720), record_path=None):
+    """Step a game with no window, audio or frame cap and return a summary of how it went.
+
+    script(step) returns (held keys, list of ACTIONS to perform this step); it defaults to RandomInput.
+    The run stops after steps simulation steps, when the player dies or once max_rounds is reached.
+    With record_path the session is saved as an input recording that replay() can re-run.
+
+    Expect roughly 25-40x real time (about 0.4-0.6 ms a step), not thousands: what is left per step is
+    the simulation itself, mostly NumPy call overhead in enemy, projectile and hit updates plus flow-field
+    searches. Effect and sound bookkeeping together cost under 1% of a step, so skipping them buys nothing.
+    """
+    start = time.perf_counter()
+    game = Game(*screen_size, seed=seed)
+    setup_seconds = time.perf_counter() - start
+    if script is None:
+        script = RandomInput(random.Random(game.seed))
+    recorder = InputRecorder(game.seed, screen_size, (game.dungeon_width_in_tiles, game.dungeon_height_in_tiles)) if record_path else None
+    clock = GameClock()  # Only advanced, never ticked, so simulation time runs as fast as the CPU allows
+    player = game.player
+
+    start = time.perf_counter()
+    step = 0
+    while step < steps and not player.is_dead:
+        if max_rounds is not None and game.current_round > max_rounds:
+            break
+        keys, actions = script(step)
+        step_input = StepInput(keys, actions)
+        game.step(step_input, clock.now)
+        if recorder is not None:
+            recorder.record(step_input, ACTIONS)
+        clock.advance()
+        step += 1
+    seconds = time.perf_counter() - start
+    if recorder is not None:
+        recorder.save(record_path, game.state_digest())
+
+    return summarize(game, clock, step, seconds, setup_seconds)
+
+def replay(path, step_timings=None):
+    """Re-run a recorded session headless and return its summary, including whether it ended in the recorded state.
+
+    If step_timings is a dict, the milliseconds of every profiler scope are appended to it per step.
+    """
+    log = InputLog.load(path)
+    start = time.perf_counter()
+    game = Game(*log.screen_size, *log.dungeon_size, seed=log.seed)
+    setup_seconds = time.perf_counter() - start
+    inventory = Inventory(*log.screen_size)  # Purchases go through the same inventory code as in the game
+    clock = GameClock()
+    if step_timings is not None and not profiler.enabled:
+        profiler.toggle()
+
+    start = time.perf_counter()
+    step = 0
+    for step_input in log.inputs(ACTIONS):
+        step_start = time.perf_counter()
+        game.replay_step(step_input, clock.now, inventory)
+        clock.advance()
+        step += 1
+        if step_timings is not None:
+            step_timings.setdefault('step', []).append((time.perf_counter() - step_start) * 1000)
+            for name, milliseconds in profiler.phase_ms.items():
+                step_timings.setdefault(name, []).append(milliseconds)
+            profiler.phase_ms = {}
+    seconds = time.perf_counter() - start
+    if step_timings is not None:
+        profiler.toggle()
+
+    summary = summarize(game, clock, step, seconds, setup_seconds)
+    summary['digest_matches'] = step == log.steps and game.state_digest() == log.digest
+    return summary
+
+def summarize(game, clock, step, seconds, setup_seconds):
+    player = game.player
+    return {
+        'steps': step,
+        'simulated_seconds': clock.now / 1000,
+        'wall_seconds': seconds,
+        'setup_seconds': setup_seconds,
+        'speedup': clock.now / 1000 / seconds if seconds else float('inf'),
+        'round': game.current_round,
+        'player_dead': player.is_dead,
+        'level': player.level,
+        'xp': player.xp,
+        'health': player.health,
+    }
+
+if __name__ == "__main__":
+    # python headless.py [steps] [seed] [record.drec]   play random input, optionally saving the session
+    # python headless.py replay session.drec            re-run a recording made here or in the game
+    if len(sys.argv) > 2 and sys.argv[1] == 'replay':
+        summary = replay(sys.argv[2])
+    else:
+        steps = int(sys.argv[1]) if len(sys.argv) > 1 else 36000
+        seed = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        summary = run(steps, seed, record_path=sys.argv[3] if len(sys.argv) > 3 else None)
+    print(f"{summary['steps']} steps ({summary['simulated_seconds']:.0f} s of play) in {summary['wall_seconds']:.2f} s, "
+          f"{summary['speedup']:.0f}x real time (setup {summary['setup_seconds']:.2f} s)")
+    print(f"round {summary['round']}, level {summary['level']}, {summary['xp']} xp, "
+          f"{summary['health']} health{', dead' if summary['player_dead'] else ''}")
+    if 'digest_matches' in summary:
+        print("replay matches the recording" if summary['digest_matches'] else "replay DIVERGED from the recording")
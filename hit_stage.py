@@ -0,0 +1,117 @@
+import pygame
+import numpy as np
+from settings import TILE_SIZE
+from projectile import PLAYER_KINDS, FIREBALL, ENEMY_BOLT
+from enemy_store import BOSS, overlaps_rect
+
+class HitStage:
+    """The one place hits are found and applied each tick.
+
+    Attacks register their shapes (slash rects, lightning and teleport circles) as they happen;
+    resolve() tests those shapes and every live projectile against the enemy store's position arrays,
+    builds a single contact list and then applies damage, knockback, XP and removals in one batch.
+    """
+    def __init__(self):
+        self.shapes = []  # (bounding rect, circle centre or None, radius, damage, xp, boss_xp, knockback)
+        # (target, damage, xp, boss_xp, knockback origin or None, knockback distance, energy shot slot or None);
+        # an energy shot's target is the list of enemies it overlaps, in slot order
+        self.contacts = []
+
+    def add_rect(self, rect, damage, xp=50, boss_xp=50):
+        """Hit every enemy overlapping rect."""
+        self.shapes.append((pygame.Rect(rect), None, 0, damage, xp, boss_xp, 0))
+
+    def add_circle(self, center, radius, damage, xp=50, boss_xp=50, knockback=0):
+        """Hit every enemy whose centre lies within radius of center, optionally pushing it away."""
+        bounds = pygame.Rect(0, 0, radius * 2, radius * 2)
+        bounds.center = center
+        self.shapes.append((bounds, pygame.Vector2(center), radius, damage, xp, boss_xp, knockback))
+
+    def clear(self):
+        self.shapes.clear()
+        self.contacts.clear()
+
+    def resolve(self, player, enemies, projectiles, now):
+        """Find this tick's contacts, then apply them all."""
+        self.find_contacts(player, enemies, projectiles)
+        self.apply_contacts(player, enemies, projectiles, now)
+        self.shapes.clear()
+
+    def find_contacts(self, player, enemies, projectiles):
+        contacts = self.contacts
+        contacts.clear()
+        views = enemies.views
+
+        # Player projectiles against enemies, every pair found in one batch
+        slots = projectiles.live_slots(PLAYER_KINDS)
+        shots, targets = enemies.overlapping(projectiles.x[slots].astype(np.int64), projectiles.y[slots].astype(np.int64),
+                                             projectiles.size[slots].astype(np.int64))
+        hit_shots, first_target = np.unique(shots, return_index=True)  # Pairs come grouped by shot
+        first_target = first_target.tolist()
+        for shot, first, end in zip(hit_shots.tolist(), first_target, first_target[1:] + [len(shots)]):
+            slot = int(slots[shot])
+            damage = int(projectiles.damage[slot])
+            if projectiles.kind[slot] == FIREBALL:
+                # Fireballs burn through every enemy they touch, each only once
+                enemies_hit = projectiles.enemies_hit[slot]
+                for target in targets[first:end].tolist():
+                    enemy = views[target]
+                    if enemy not in enemies_hit:
+                        enemies_hit.add(enemy)
+                        contacts.append((enemy, damage, 50, 50, None, 0, None))
+            else:
+                # An energy shot stops at the first enemy still alive when it lands, picked in apply_contacts
+                contacts.append(([views[target] for target in targets[first:end].tolist()], damage, 50, 150, None, 0, slot))
+
+        # Slashes, lightning and teleport blasts against enemies
+        for bounds, center, radius, damage, xp, boss_xp, knockback in self.shapes:
+            for enemy in enemies.query(bounds):
+                if center is not None and center.distance_to(enemy.rect.center) > radius:
+                    continue
+                contacts.append((enemy, damage, xp, boss_xp, center if knockback else None, knockback, None))
+
+        # Enemy bolts against the player, tested for every bolt at once
+        slots = projectiles.live_slots((ENEMY_BOLT,))
+        if len(slots):
+            hit = overlaps_rect(projectiles.x[slots], projectiles.y[slots], projectiles.size[slots], player.rect)
+            for slot in slots[hit].tolist():
+                contacts.append((player, int(projectiles.damage[slot]), 0, 0, None, 0, None))
+                projectiles.release(slot)
+
+    def apply_contacts(self, player, enemies, projectiles, now):
+        for target, damage, xp, boss_xp, origin, knockback, shot in self.contacts:
+            if shot is not None:
+                target = next((enemy for enemy in target if enemy.health > 0), None)
+                if target is None:
+                    continue  # Everything it touched was killed earlier this tick, so it flies on
+                projectiles.release(shot)
+            if target is player:
+                player.take_damage(damage)
+                continue
+            if target.health <= 0:
+                continue  # Already killed by an earlier contact this tick
+            died = target.take_damage(damage, now)
+            if origin is not None:
+                self.knock_back(target, origin, knockback, enemies)
+            if died:
+                enemies.remove(target)
+                player.gain_xp(boss_xp if target.kind == BOSS else xp)
+
+    def knock_back(self, enemy, origin, distance, enemies):
+        """Push an enemy away from origin, nudging it off any enemy it lands on."""
+        enemy_rect = enemy.rect  # A copy, written back once resolved
+        offset = pygame.Vector2(enemy_rect.center) - origin
+        if offset.length() == 0:
+            return  # Standing exactly on the origin, no direction to push in
+        offset.scale_to_length(distance)
+        enemy_rect.x += offset.x
+        enemy_rect.y += offset.y
+
+        for other_enemy in enemies.query(enemy_rect, exclude=enemy):
+            if enemy_rect.colliderect(other_enemy.rect):
+                overlap_vector = pygame.Vector2(enemy_rect.center) - pygame.Vector2(other_enemy.rect.center)
+                if overlap_vector.length() > 0:  # Avoid division by zero
+                    overlap_vector.normalize_ip()
+                    enemy_rect.x += overlap_vector.x * TILE_SIZE
+                    enemy_rect.y += overlap_vector.y * TILE_SIZE
+        enemy.rect = enemy_rect
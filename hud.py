@@ -0,0 +1,80 @@
+import pygame
+
+class TextCache:
+    """Fonts opened once per size and rendered strings kept for reuse.
+
+    SysFont searches the system fonts every time it is called and render() rasterises the string
+    again, so everything that draws text asks here instead. Rendered surfaces are keyed by
+    (size, text, colour); the cache is emptied when it grows past max_entries, which only
+    happens when a lot of different strings have been shown.
+    """
+    def __init__(self, max_entries=512):
+        self.fonts = {}  # size -> Font
+        self.surfaces = {}  # (size, text, color) -> Surface
+        self.max_entries = max_entries
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.SysFont(None, size)
+            self.fonts[size] = font
+        return font
+
+    def render(self, text, size, color):
+        """Return text rendered antialiased in color; the Surface is shared, so don't draw on it."""
+        key = (size, text, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            if len(self.surfaces) >= self.max_entries:
+                self.surfaces.clear()
+            surface = self.font(size).render(text, True, color)
+            self.surfaces[key] = surface
+        return surface
+
+# Process-wide text cache shared by every module
+text_cache = TextCache()
+
+class Hud:
+    """Health and mana bars, XP, level and round counter, composed into surfaces that only change with the values.
+
+    draw() compares the values shown against the last frame's and rebuilds the panel only on a
+    change, so a frame normally costs a single blits call.
+    """
+    def __init__(self, screen_width):
+        self.screen_width = screen_width
+        self.values = None  # What the panel currently shows
+        self.panel = None  # Bars, XP and level, drawn at the top left
+        self.round_text = None  # Round counter, drawn at the top right
+
+    def draw(self, screen, player, current_round):
+        values = (player.health, player.max_health, player.mana, player.max_mana,
+                  player.xp, player.xp_for_next_level, player.level, current_round)
+        if values != self.values:
+            self.values = values
+            self.panel = self.build_panel(player)
+            self.round_text = text_cache.render(f"Round: {current_round}", 48, (0, 0, 0))
+        screen.blits(((self.panel, (0, 0)), (self.round_text, (self.screen_width - 200, 10))), False)
+
+    def build_panel(self, player):
+        base_bar_width = 200
+        bar_height = 20
+
+        health_bar_width = int(base_bar_width * (player.max_health / 100))
+        mana_bar_width = int(base_bar_width * (player.max_mana / 100))
+        xp_surface = text_cache.render(f"XP: {player.xp} / {player.xp_for_next_level}", 24, (0, 0, 0))
+        level_surface = text_cache.render(f"Level: {player.level}", 24, (0, 0, 0))
+
+        # Bars grow with max health and mana; past the screen edge they would be clipped anyway
+        width = min(self.screen_width, 12 + max(health_bar_width, mana_bar_width, xp_surface.get_width(), level_surface.get_width()))
+        height = 100 + level_surface.get_height()
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+
+        pygame.draw.rect(panel, (255, 0, 0), (10, 10, int(health_bar_width * (player.health / player.max_health)), bar_height))
+        pygame.draw.rect(panel, (255, 255, 255), (10, 10, health_bar_width, bar_height), 2)
+
+        pygame.draw.rect(panel, (0, 0, 255), (10, 40, int(mana_bar_width * (player.mana / player.max_mana)), bar_height))
+        pygame.draw.rect(panel, (255, 255, 255), (10, 40, mana_bar_width, bar_height), 2)
+
+        panel.blit(xp_surface, (10, 70))
+        panel.blit(level_surface, (10, 100))
+        return panel
@@ -1,4 +1,5 @@
 import pygame
+from hud import text_cache
 
 class Inventory:
     def __init__(self, screen_width, screen_height):
@@ -8,7 +9,6 @@ class Inventory:
         self.inventory_height = int(screen_height * 0.6)
         self.inventory_x = (screen_width - self.inventory_width) // 2
         self.inventory_y = (screen_height - self.inventory_height) // 2
-        self.font = pygame.font.SysFont(None, 24)
         self.is_open = False
         self.unlocked_attacks = {
             "Projectile Attack": True,
@@ -41,45 +41,45 @@ class Inventory:
         inventory_background = pygame.Surface((self.inventory_width, self.inventory_height))
         inventory_background.fill((50, 50, 50))
         
-        text_surface = self.font.render("Inventory Screen", True, (255, 255, 255))
+        text_surface = text_cache.render("Inventory Screen", 24, (255, 255, 255))
         text_rect = text_surface.get_rect(center=(self.inventory_width // 2, 30))
         screen.blit(inventory_background, (self.inventory_x, self.inventory_y))
         screen.blit(text_surface, (self.inventory_x + text_rect.x, self.inventory_y + text_rect.y))
 
-        points_surface = self.font.render(f"Points: {player.points}", True, (255, 255, 255))
+        points_surface = text_cache.render(f"Points: {player.points}", 24, (255, 255, 255))
         points_rect = points_surface.get_rect(center=(self.inventory_width // 2, 60))
         screen.blit(points_surface, (self.inventory_x + points_rect.x, self.inventory_y + points_rect.y))
 
         # Draw attacks
         for idx, (attack, unlocked) in enumerate(self.unlocked_attacks.items()):
             attack_text = f"{attack} - {'Unlocked' if unlocked else f'Cost: {self.attack_costs[attack]}'}"
-            attack_surface = self.font.render(attack_text, True, (0, 255, 0) if unlocked else (255, 0, 0))
+            attack_surface = text_cache.render(attack_text, 24, (0, 255, 0) if unlocked else (255, 0, 0))
             attack_rect = attack_surface.get_rect(left=self.inventory_x + 40, top=self.inventory_y + 100 + idx * 40)
             screen.blit(attack_surface, attack_rect)
 
             if idx == self.selected_attack_index:
-                arrow_surface = self.font.render("->", True, (255, 255, 255))
+                arrow_surface = text_cache.render("->", 24, (255, 255, 255))
                 arrow_rect = arrow_surface.get_rect(right=self.inventory_x + 30, top=self.inventory_y + 100 + idx * 40)
                 screen.blit(arrow_surface, arrow_rect)
         
         # Draw the health and mana upgrade options at the bottom
         health_upgrade_text = f"Increase Max Health - Cost: {self.attack_costs['Increase Max Health']}"
-        health_upgrade_surface = self.font.render(health_upgrade_text, True, (255, 255, 0))
+        health_upgrade_surface = text_cache.render(health_upgrade_text, 24, (255, 255, 0))
         health_upgrade_rect = health_upgrade_surface.get_rect(left=self.inventory_x + 40, top=self.inventory_y + 100 + len(self.unlocked_attacks) * 40)
         screen.blit(health_upgrade_surface, health_upgrade_rect)
 
         if self.selected_attack_index == len(self.unlocked_attacks):
-            arrow_surface = self.font.render("->", True, (255, 255, 255))
+            arrow_surface = text_cache.render("->", 24, (255, 255, 255))
             arrow_rect = arrow_surface.get_rect(right=self.inventory_x + 30, top=health_upgrade_rect.top)
             screen.blit(arrow_surface, arrow_rect)
 
         mana_upgrade_text = f"Increase Max Mana - Cost: {self.attack_costs['Increase Max Mana']}"
-        mana_upgrade_surface = self.font.render(mana_upgrade_text, True, (255, 255, 0))
+        mana_upgrade_surface = text_cache.render(mana_upgrade_text, 24, (255, 255, 0))
         mana_upgrade_rect = mana_upgrade_surface.get_rect(left=self.inventory_x + 40, top=self.inventory_y + 100 + (len(self.unlocked_attacks) + 1) * 40)
         screen.blit(mana_upgrade_surface, mana_upgrade_rect)
 
         if self.selected_attack_index == len(self.unlocked_attacks) + 1:
-            arrow_surface = self.font.render("->", True, (255, 255, 255))
+            arrow_surface = text_cache.render("->", 24, (255, 255, 255))
             arrow_rect = arrow_surface.get_rect(right=self.inventory_x + 30, top=mana_upgrade_rect.top)
             screen.blit(arrow_surface, arrow_rect)
 
@@ -87,12 +87,12 @@ class Inventory:
         keybinding_start_y = mana_upgrade_rect.bottom + 40
         for idx, (action, key) in enumerate(self.keybindings.items()):
             key_text = f"{action}: {pygame.key.name(key)}"
-            key_surface = self.font.render(key_text, True, (255, 255, 255))
+            key_surface = text_cache.render(key_text, 24, (255, 255, 255))
             key_rect = key_surface.get_rect(left=self.inventory_x + 40, top=keybinding_start_y + idx * 40)
             screen.blit(key_surface, key_rect)
 
             if self.selected_attack_index == len(self.unlocked_attacks) + 2 + idx:
-                arrow_surface = self.font.render("->", True, (255, 255, 255))
+                arrow_surface = text_cache.render("->", 24, (255, 255, 255))
                 arrow_rect = arrow_surface.get_rect(right=self.inventory_x + 30, top=keybinding_start_y + idx * 40)
                 screen.blit(arrow_surface, arrow_rect)
 
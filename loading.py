@@ -0,0 +1,67 @@
+import time
+from collections import deque
+
+class Loader:
+    """Startup work queued as named tasks and run a slice at a time between frames.
+
+    main.py opens the window first, then calls step() once per frame, so the start screen and
+    its progress bar keep drawing while audio, sprites and the dungeon load. Every task is timed,
+    as are any steps wrapped in timed(), and report() breaks startup down by where the time went.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.tasks = deque()  # (name, function) still to run, in order
+        self.total = 0
+        self.timings = []  # (name, milliseconds) in the order they ran
+        self.first_frame_ms = None
+        self.ready_ms = None
+
+    def add(self, name, function):
+        self.tasks.append((name, function))
+        self.total += 1
+
+    @property
+    def done(self):
+        return not self.tasks
+
+    @property
+    def progress(self):
+        """Fraction of the queued tasks finished, from 0 to 1."""
+        return 1.0 if not self.total else 1 - len(self.tasks) / self.total
+
+    def timed(self, name, function, *args):
+        """Run function now and record how long it took under name."""
+        start = time.perf_counter()
+        result = function(*args)
+        self.timings.append((name, (time.perf_counter() - start) * 1000))
+        return result
+
+    def step(self, budget_ms=12):
+        """Run queued tasks until budget_ms has been spent (always at least one); True once all are done."""
+        deadline = time.perf_counter() + budget_ms / 1000
+        while self.tasks:
+            name, function = self.tasks.popleft()
+            self.timed(name, function)
+            if time.perf_counter() >= deadline:
+                break
+        if not self.tasks and self.ready_ms is None:
+            self.ready_ms = self.elapsed_ms()
+        return not self.tasks
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def first_frame(self):
+        """Note the moment the first frame reached the screen."""
+        if self.first_frame_ms is None:
+            self.first_frame_ms = self.elapsed_ms()
+
+    def report(self):
+        lines = [f"Startup: first frame after {self.first_frame_ms or 0:.0f} ms, ready after {self.ready_ms or 0:.0f} ms"]
+        for name, milliseconds in sorted(self.timings, key=lambda timing: -timing[1]):
+            lines.append(f"  {name:>20}: {milliseconds:7.1f} ms")
+        if self.ready_ms is not None:
+            # Whatever the tasks didn't account for went on drawing frames and waiting for events
+            other = self.ready_ms - sum(milliseconds for name, milliseconds in self.timings)
+            lines.append(f"  {'frames and events':>20}: {other:7.1f} ms")
+        return "\n".join(lines)
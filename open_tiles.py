@@ -0,0 +1,196 @@
+import numpy as np
+
+def label_regions(walkable):
+    """Label 4-connected walkable regions 1..n (0 for walls) by joining horizontal runs row to row."""
+    height, width = walkable.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = walkable
+    edges = np.diff(padded, axis=1)
+    run_rows, run_starts = np.nonzero(edges == 1)
+    run_ends = np.nonzero(edges == -1)[1]  # Exclusive, paired with the starts in row-major order
+    run_count = len(run_rows)
+    labels = np.zeros(height * width, dtype=np.int32)
+    if run_count == 0:
+        return labels.reshape(height, width), 0
+
+    # Union-find over runs: runs in neighbouring rows that overlap belong to the same region
+    parent = list(range(run_count))
+
+    def find(run):
+        while parent[run] != run:
+            parent[run] = parent[parent[run]]
+            run = parent[run]
+        return run
+
+    row_first = np.searchsorted(run_rows, np.arange(height + 1)).tolist()
+    starts = run_starts.tolist()
+    ends = run_ends.tolist()
+    for row in range(1, height):
+        above, above_end = row_first[row - 1], row_first[row]
+        below, below_end = row_first[row], row_first[row + 1]
+        while above < above_end and below < below_end:
+            if starts[above] < ends[below] and starts[below] < ends[above]:
+                root_above, root_below = find(above), find(below)
+                if root_above != root_below:
+                    parent[root_below] = root_above
+            if ends[above] < ends[below]:
+                above += 1
+            else:
+                below += 1
+
+    roots = np.array([find(run) for run in range(run_count)])
+    unique_roots, run_labels = np.unique(roots, return_inverse=True)
+    run_labels = run_labels.astype(np.int32) + 1
+
+    # Paint each run with its label: +label at the run start, -label just past its end, then a running sum
+    marks = np.zeros(height * width + 1, dtype=np.int32)
+    np.add.at(marks, run_rows * width + run_starts, run_labels)
+    np.add.at(marks, run_rows * width + run_ends, -run_labels)
+    labels = np.cumsum(marks[:-1], dtype=np.int32)
+    return labels.reshape(height, width), len(unique_roots)
+
+class OpenTileIndex:
+    """Walkable tiles grouped by connected region, for O(1) random picks that stay correct after edits."""
+    def __init__(self, store):
+        self.store = store  # The dungeon's tile store, edited in place
+        self.tiles_y, self.tiles_x = store.tiles_y, store.tiles_x
+        self.stale = True  # Labelled on the first query, so a memory-mapped map isn't read in full up front
+
+    def rebuild(self):
+        """Flood-fill every region and rebuild the per-region tile lists."""
+        labels, region_count = label_regions(self.store.walkable())
+        self.labels = labels.reshape(-1)  # Flat tile index -> region label, 0 for walls
+        self.positions = np.zeros(self.labels.size, dtype=np.int32)  # Flat tile index -> slot in its region list
+        self.regions = {}  # label -> [tile buffer, tile count]
+        self.next_label = region_count + 1
+        self.stale = False
+
+        open_tiles = np.flatnonzero(self.labels)
+        order = np.argsort(self.labels[open_tiles], kind='stable')
+        open_tiles = open_tiles[order].astype(np.int32)
+        counts = np.bincount(self.labels[open_tiles], minlength=region_count + 1)
+        offset = 0
+        for label in range(1, region_count + 1):
+            count = int(counts[label])
+            region_tiles = open_tiles[offset:offset + count].copy()
+            self.positions[region_tiles] = np.arange(count, dtype=np.int32)
+            self.regions[label] = [region_tiles, count]
+            offset += count
+
+    def refresh(self):
+        """Re-label if a closed tile may have split a region."""
+        if self.stale:
+            self.rebuild()
+
+    def append(self, label, index):
+        region = self.regions[label]
+        tiles, count = region
+        if count == len(tiles):
+            tiles = np.concatenate((tiles, np.zeros(max(count, 16), dtype=np.int32)))
+            region[0] = tiles
+        tiles[count] = index
+        self.positions[index] = count
+        self.labels[index] = label
+        region[1] = count + 1
+
+    def set_open(self, tile_x, tile_y, is_open):
+        """Keep the index in sync after a single tile changes."""
+        if self.stale:
+            return  # The next query re-labels from the store, which already has the change
+        index = tile_y * self.tiles_x + tile_x
+        label = int(self.labels[index])
+        if is_open and not label:
+            self.open_tile(tile_x, tile_y, index)
+        elif not is_open and label:
+            self.close_tile(tile_x, tile_y, index, label)
+
+    def neighbour_labels(self, tile_x, tile_y):
+        labels = set()
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            nx, ny = tile_x + dx, tile_y + dy
+            if 0 <= nx < self.tiles_x and 0 <= ny < self.tiles_y:
+                label = int(self.labels[ny * self.tiles_x + nx])
+                if label:
+                    labels.add(label)
+        return labels
+
+    def open_tile(self, tile_x, tile_y, index):
+        """A new walkable tile joins its neighbours' region, merging them if it connects several."""
+        labels = self.neighbour_labels(tile_x, tile_y)
+        if not labels:
+            label = self.next_label
+            self.next_label += 1
+            self.regions[label] = [np.zeros(16, dtype=np.int32), 0]
+        else:
+            # Relabel the smaller regions into the largest so merging costs the size of the small ones
+            label = max(labels, key=lambda region: self.regions[region][1])
+            for other in labels - {label}:
+                other_tiles, other_count = self.regions.pop(other)
+                for merged_index in other_tiles[:other_count].tolist():
+                    self.append(label, merged_index)
+        self.append(label, index)
+
+    def close_tile(self, tile_x, tile_y, index, label):
+        """Remove a tile from its region with a swap-remove."""
+        region = self.regions[label]
+        tiles, count = region
+        slot = self.positions[index]
+        last = tiles[count - 1]
+        tiles[slot] = last
+        self.positions[last] = slot
+        region[1] = count - 1
+        self.labels[index] = 0
+        if region[1] == 0:
+            del self.regions[label]
+        elif self.open_neighbour_count(tile_x, tile_y) > 1:
+            self.stale = True  # The region may have split, re-label before the next query
+
+    def open_neighbour_count(self, tile_x, tile_y):
+        count = 0
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            nx, ny = tile_x + dx, tile_y + dy
+            if 0 <= nx < self.tiles_x and 0 <= ny < self.tiles_y and self.labels[ny * self.tiles_x + nx]:
+                count += 1
+        return count
+
+    def region_at(self, tile_x, tile_y):
+        """Return the region label of a tile, or 0 for walls and positions off the map."""
+        self.refresh()
+        if 0 <= tile_x < self.tiles_x and 0 <= tile_y < self.tiles_y:
+            return int(self.labels[tile_y * self.tiles_x + tile_x])
+        return 0
+
+    def region_size(self, label):
+        self.refresh()
+        region = self.regions.get(label)
+        return region[1] if region else 0
+
+    def largest_region(self):
+        self.refresh()
+        if not self.regions:
+            return 0
+        return max(self.regions, key=lambda label: self.regions[label][1])
+
+    def region_tiles(self, label=None):
+        """Return the flat indices of every open tile in a region (or the whole map)."""
+        self.refresh()
+        if label is None:
+            return np.flatnonzero(self.labels)
+        region = self.regions.get(label)
+        return region[0][:region[1]] if region else np.zeros(0, dtype=np.int32)
+
+    def random_tile(self, rng, label=None):
+        """Pick a uniformly random open tile from a region (or the whole map) in O(1)."""
+        self.refresh()
+        if label is None:
+            if not self.regions:
+                return None
+            # Choose a region weighted by its size, so every open tile is equally likely
+            labels = list(self.regions)
+            sizes = np.array([self.regions[region][1] for region in labels], dtype=np.float64)
+            label = labels[rng.choice(len(labels), p=sizes / sizes.sum())]
+        region = self.regions.get(label)
+        if not region:
+            return None
+        index = int(region[0][rng.integers(region[1])])
+        return index % self.tiles_x, index // self.tiles_x
@@ -0,0 +1,253 @@
+import math
+import numpy as np
+from settings import TILE_SIZE
+
+# 8-way neighbours as (dx, dy); diagonals are only allowed when both adjacent sides are open (no corner cutting)
+NEIGHBOURS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+UNREACHED = 255
+NEIGHBOUR_DX = np.array([dx for dx, dy in NEIGHBOURS])
+NEIGHBOUR_DY = np.array([dy for dx, dy in NEIGHBOURS])
+
+RINGS_PER_STEP = 12  # Distance rings a running search covers per simulation step
+RETARGET_DISTANCE = 1  # A field keeps leading to its target until the player is more than this many tiles from it
+
+class FlowField:
+    """BFS field over the tile grid pointing every reachable tile one step closer to the target tile.
+
+    The search isn't redone while the target only moves to a neighbouring tile (see needs_search), and
+    when it is, it isn't done in one go: it grows one distance ring at a time, RINGS_PER_STEP rings per
+    simulation step, so the player crossing tiles costs a few short steps instead of one long one. While
+    it runs, tiles it has reached already point toward the new target and the rest keep the previous
+    field's directions, which lead to where the player was a few steps ago. Both kinds only ever point at
+    a tile closer to their own target, so mixing them can't send an enemy in circles. When the walls
+    change the search is redone in full at once.
+    """
+    def __init__(self, collision_grid, footprint=1, max_distance=48):
+        self.grid = collision_grid
+        self.footprint = footprint  # Width/height in tiles of the agents steering by this field
+        self.max_distance = max_distance  # Only tiles within this many steps of the target are searched
+        self.tiles_x = collision_grid.tiles_x
+        self.tiles_y = collision_grid.tiles_y
+        self.target = None  # Tile the finished or running search leads to
+        self.grid_version = None
+        self.last_step = None  # Simulation step the running search was last advanced on
+        # Direction codes for the searched window around the target, UNREACHED outside the search
+        self.window = (0, 0, 0, 0)  # first_x, first_y, width, height
+        self.directions = np.zeros(0, dtype=np.uint8)
+        self.searching = False
+        self.ring = 0  # Distance of the last ring the running search finished
+        self.allowed = None  # allowed[code][y, x]: the tile can be entered from its neighbour at (x - dx, y - dy)
+        self.frontier = None  # Last finished ring, padded by one tile on every side
+        self.distance = None  # Steps from the target of every reached tile, -1 elsewhere, padded the same way
+        self.unreached = None  # Open tiles the running search hasn't reached yet
+        self.pending = None  # The running search's direction codes, published when it finishes
+
+    def passable_window(self, first_x, first_y, last_x, last_y):
+        """Mark the tiles of a window whose footprint x footprint block is free of walls."""
+        size = self.footprint
+        # Blocks reaching past the map edge count as blocked, as if the map were ringed by walls
+        walls = np.ones((last_y - first_y + size - 1, last_x - first_x + size - 1), dtype=np.int32)
+        inside = self.grid.solid_mask(first_x, first_y, min(self.tiles_x, last_x + size - 1), min(self.tiles_y, last_y + size - 1))
+        walls[:inside.shape[0], :inside.shape[1]] = inside
+        # Summed-area table gives the wall count of every block in one pass
+        sums = np.zeros((walls.shape[0] + 1, walls.shape[1] + 1), dtype=np.int32)
+        sums[1:, 1:] = walls.cumsum(0).cumsum(1)
+        block = sums[size:, size:] - sums[:-size, size:] - sums[size:, :-size] + sums[:-size, :-size]
+        return block == 0
+
+    def update(self, target_x, target_y, step=None):
+        """Keep the field leading to the target tile, advancing a running search by one step's worth of rings.
+
+        step numbers the caller's simulation step, so asking again within the same step doesn't advance the
+        search twice; without it every call advances.
+        """
+        target_x = min(max(target_x, 0), self.tiles_x - 1)
+        target_y = min(max(target_y, 0), self.tiles_y - 1)
+        if self.grid_version != self.grid.version:
+            self.grid_version = self.grid.version
+            self.last_step = step
+            self.search(target_x, target_y)
+            return
+        if step is not None and step == self.last_step:
+            return
+        self.last_step = step
+        if not self.searching and self.needs_search(target_x, target_y):
+            self.start_search(target_x, target_y)
+        if self.searching:
+            self.advance(RINGS_PER_STEP)
+
+    def needs_search(self, target_x, target_y):
+        """A field leading to a tile next to the target still brings enemies within a tile of it, and from
+        there they chase the player directly, so it is only searched again once the target moves further."""
+        if self.target is None:
+            return True
+        return max(abs(target_x - self.target[0]), abs(target_y - self.target[1])) > RETARGET_DISTANCE
+
+    def search(self, target_x, target_y):
+        """Search out from the target to the full distance right away."""
+        self.start_search(target_x, target_y)
+        self.advance(self.max_distance)
+
+    def start_search(self, target_x, target_y):
+        """Set up a wavefront BFS out from the target; advance() grows it a ring at a time."""
+        # Only the window the search can reach is touched, so cost doesn't grow with map size
+        first_x = max(0, target_x - self.max_distance)
+        first_y = max(0, target_y - self.max_distance)
+        last_x = min(self.tiles_x, target_x + self.max_distance + 1)
+        last_y = min(self.tiles_y, target_y + self.max_distance + 1)
+        width, height = last_x - first_x, last_y - first_y
+        local_x, local_y = target_x - first_x, target_y - first_y
+        passable = self.passable_window(first_x, first_y, last_x, last_y)
+        passable[local_y, local_x] = True  # The player may stand where this footprint can't fit
+
+        # Neighbour lookups are slices of a padded copy, so no step allocates a shifted array
+        padded = np.zeros((height + 2, width + 2), dtype=bool)
+        padded[1:-1, 1:-1] = passable
+        self.allowed = []
+        for dx, dy in NEIGHBOURS:
+            mask = passable & padded[1 - dy:1 - dy + height, 1 - dx:1 - dx + width]
+            if dx and dy:
+                mask &= padded[1 - dy:1 - dy + height, 1:1 + width] & padded[1:1 + height, 1 - dx:1 - dx + width]
+            self.allowed.append(mask)
+
+        self.frontier = np.zeros((height + 2, width + 2), dtype=bool)
+        self.frontier[local_y + 1, local_x + 1] = True
+        self.distance = np.full((height + 2, width + 2), -1, dtype=np.int32)  # Padded like the frontier
+        self.distance[local_y + 1, local_x + 1] = 0
+        self.unreached = passable
+        self.unreached[local_y, local_x] = False
+        self.pending = np.full((height, width), UNREACHED, dtype=np.uint8)
+
+        # Until the search finishes, tiles it hasn't reached keep the previous field's directions
+        directions = np.full((height, width), UNREACHED, dtype=np.uint8)
+        old_x, old_y, old_width, old_height = self.window
+        overlap_x, overlap_y = max(first_x, old_x), max(first_y, old_y)
+        overlap_right, overlap_bottom = min(last_x, old_x + old_width), min(last_y, old_y + old_height)
+        if overlap_x < overlap_right and overlap_y < overlap_bottom:
+            old = self.directions.reshape(old_height, old_width)
+            directions[overlap_y - first_y:overlap_bottom - first_y, overlap_x - first_x:overlap_right - first_x] = \
+                old[overlap_y - old_y:overlap_bottom - old_y, overlap_x - old_x:overlap_right - old_x]
+        directions[local_y, local_x] = UNREACHED
+        self.window = (first_x, first_y, width, height)
+        self.directions = directions.reshape(-1)
+        self.target = (target_x, target_y)
+        self.ring = 0
+        self.searching = True
+
+    def advance(self, rings):
+        """Grow the running search by up to rings distance rings, one vectorized step per ring, then point
+        the tiles it reached at their neighbour one step closer."""
+        first_x, first_y, width, height = self.window
+        local_x, local_y = self.target[0] - first_x, self.target[1] - first_y
+        frontier, distance, allowed = self.frontier, self.distance, self.allowed
+        start_ring = self.ring
+        finished = False
+        for _ in range(rings):
+            ring = self.ring + 1
+            # Ring n lies within n tiles of the target, so only that box is looked at
+            top, bottom = max(0, local_y - ring), min(height, local_y + ring + 1)
+            left, right = max(0, local_x - ring), min(width, local_x + ring + 1)
+            grown = np.zeros((bottom - top, right - left), dtype=bool)
+            step = np.empty(grown.shape, dtype=bool)
+            for (dx, dy), mask in zip(NEIGHBOURS, allowed):
+                np.logical_and(frontier[top + 1 - dy:bottom + 1 - dy, left + 1 - dx:right + 1 - dx], mask[top:bottom, left:right], out=step)
+                grown |= step
+            unreached = self.unreached[top:bottom, left:right]
+            grown &= unreached
+            if not grown.any():
+                finished = True
+                break
+            unreached ^= grown  # Only unreached tiles grew, so this clears them
+            np.copyto(distance[top + 1:bottom + 1, left + 1:right + 1], ring, where=grown)
+            frontier[top + 1:bottom + 1, left + 1:right + 1] = grown  # The box holds the whole last ring, so this also clears it
+            self.ring = ring
+            if ring == self.max_distance:
+                finished = True
+                break
+
+        if self.ring > start_ring:
+            # Each newly reached tile points back at its first neighbour, in NEIGHBOURS order, one ring closer
+            top, bottom = max(0, local_y - self.ring), min(height, local_y + self.ring + 1)
+            left, right = max(0, local_x - self.ring), min(width, local_x + self.ring + 1)
+            reached = distance[top + 1:bottom + 1, left + 1:right + 1]
+            undecided = reached > start_ring
+            newly_reached = undecided.copy()
+            closer_distance = reached - 1
+            pending = self.pending[top:bottom, left:right]
+            closer = np.empty(reached.shape, dtype=bool)
+            for code, ((dx, dy), mask) in enumerate(zip(NEIGHBOURS, allowed)):
+                np.equal(distance[top + 1 - dy:bottom + 1 - dy, left + 1 - dx:right + 1 - dx], closer_distance, out=closer)
+                closer &= mask[top:bottom, left:right]
+                closer &= undecided
+                np.copyto(pending, code, where=closer)
+                undecided ^= closer
+            np.copyto(self.directions.reshape(height, width)[top:bottom, left:right], pending, where=newly_reached)
+        if finished:
+            self.finish_search()
+
+    def finish_search(self):
+        self.directions = self.pending.reshape(-1)
+        self.searching = False
+        self.allowed = self.frontier = self.distance = self.unreached = self.pending = None
+
+    def next_step(self, tile_x, tile_y):
+        """Return the tile one step closer to the target, or None if the tile was not reached."""
+        first_x, first_y, width, height = self.window
+        local_x = tile_x - first_x
+        local_y = tile_y - first_y
+        if not (0 <= local_x < width and 0 <= local_y < height):
+            return None
+        code = int(self.directions[local_y * width + local_x])
+        if code == UNREACHED:
+            return None
+        dx, dy = NEIGHBOURS[code]
+        return tile_x - dx, tile_y - dy
+
+    def next_steps(self, tile_x, tile_y):
+        """Batched next_step for arrays of tiles: returns (step_x, step_y, reached) arrays."""
+        first_x, first_y, width, height = self.window
+        local_x = tile_x - first_x
+        local_y = tile_y - first_y
+        inside = (local_x >= 0) & (local_x < width) & (local_y >= 0) & (local_y < height)
+        codes = np.full(tile_x.shape, UNREACHED, dtype=np.uint8)
+        codes[inside] = self.directions[local_y[inside] * width + local_x[inside]]
+        reached = codes != UNREACHED
+        codes = np.where(reached, codes, 0)
+        return tile_x - NEIGHBOUR_DX[codes], tile_y - NEIGHBOUR_DY[codes], reached
+
+class Pathfinder:
+    """Shared flow fields toward the player, one per enemy footprint size."""
+    def __init__(self, collision_grid, max_distance=48):
+        self.grid = collision_grid
+        self.max_distance = max_distance
+        self.fields = {}  # footprint in tiles -> FlowField
+        self.player_tile = (0, 0)
+        self.step = 0  # Counts update() calls, so each field advances its search once per simulation step
+
+    def update(self, player_rect):
+        """Track the player's tile; each field catches up with it the first time it is used in a step."""
+        self.player_tile = (player_rect.x // TILE_SIZE, player_rect.y // TILE_SIZE)
+        self.step += 1
+
+    def field_for(self, size):
+        footprint = max(1, math.ceil(size / TILE_SIZE))
+        field = self.fields.get(footprint)
+        if field is None:
+            field = FlowField(self.grid, footprint, self.max_distance)
+            self.fields[footprint] = field
+        field.update(*self.player_tile, self.step)
+        return field
+
+    def next_position(self, rect, size):
+        """Return the pixel top-left an enemy should head for next, or None to chase the player directly."""
+        field = self.field_for(size)
+        step = field.next_step(rect.x // TILE_SIZE, rect.y // TILE_SIZE)
+        if step is None:
+            return None
+        return step[0] * TILE_SIZE, step[1] * TILE_SIZE
+
+    def next_positions(self, x, y, size):
+        """Batched next_position for enemies of one size: returns (waypoint_x, waypoint_y, has_waypoint) arrays."""
+        field = self.field_for(size)
+        step_x, step_y, reached = field.next_steps(x // TILE_SIZE, y // TILE_SIZE)
+        return step_x * TILE_SIZE, step_y * TILE_SIZE, reached
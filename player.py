@@ -1,58 +1,48 @@
 import pygame
-import sys
-import os
 from settings import PLAYER_SIZE, TILE_SIZE
-from projectile import Projectile, MeleeAttack, Fireball, LightningStrike
-
-pygame.mixer.init()
-
-def resource_path(relative_path):
-    """ Get the absolute path to the resource, works for dev and for PyInstaller """
-    try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
+from assets import load_image
+from sound_bank import sound_bank
+from animation import load_animation_bank
+from projectile import MeleeAttack, LightningStrike, ENERGY, FIREBALL, PROJECTILE_KINDS
+from render_queue import PLAYER_LAYER
 
 class Player:
     def __init__(self, x, y):
         self.size = PLAYER_SIZE
         self.rect = pygame.Rect(x, y, self.size, self.size)
-        self.melee_attack_sound = pygame.mixer.Sound(resource_path('assets/sword.mp3'))
-        self.spell_attack_sound = pygame.mixer.Sound(resource_path('assets/basicspell.mp3'))
-        self.teleport_sound = pygame.mixer.Sound(resource_path('assets/teleport.mp3'))
-        self.fireball_sound = pygame.mixer.Sound(resource_path('assets/fireball.mp3'))
-        self.lightning_sound = pygame.mixer.Sound(resource_path('assets/thunder.mp3'))
         
         # Animation state
         self.animation_state = 'idle'
         self.current_frame = 0
         self.frame_switch_time = 200  # Switch every 200 ms
-        self.last_frame_switch = pygame.time.get_ticks()
-
-        # Load animations (assuming you have two frames for each)
-        self.animations = {
-            'idle': [
-                pygame.transform.scale(pygame.image.load(resource_path('assets/playeridle.png')).convert_alpha(), (self.size, self.size)),
-                pygame.transform.scale(pygame.image.load(resource_path('assets/playeridle2.png')).convert_alpha(), (self.size, self.size))
-            ],
-            'walk': [
-                pygame.transform.scale(pygame.image.load(resource_path('assets/playerwalk.png')).convert_alpha(), (self.size, self.size)),
-                pygame.transform.scale(pygame.image.load(resource_path('assets/playerwalk2.png')).convert_alpha(), (self.size, self.size))
-            ],
-            'attack': [
-                pygame.transform.scale(pygame.image.load(resource_path('assets/playerattack.png')).convert_alpha(), (self.size, self.size)),
-                pygame.transform.scale(pygame.image.load(resource_path('assets/playerattack2.png')).convert_alpha(), (self.size, self.size))
-            ],
-            'cast': [
-                pygame.transform.scale(pygame.image.load(resource_path('assets/playercast.png')).convert_alpha(), (self.size, self.size)),
-                pygame.transform.scale(pygame.image.load(resource_path('assets/playercast2.png')).convert_alpha(), (self.size, self.size))
-            ]
-        }
-        
+        self.last_frame_switch = 0  # Simulation time of the last frame switch
+
+        # Load animations (assuming you have two frames for each); mirrored frames are built once in the bank
+        self.animations = load_animation_bank('player', {
+            'idle': ['assets/playeridle.png', 'assets/playeridle2.png'],
+            'walk': ['assets/playerwalk.png', 'assets/playerwalk2.png'],
+            'attack': ['assets/playerattack.png', 'assets/playerattack2.png'],
+            'cast': ['assets/playercast.png', 'assets/playercast2.png'],
+        }, self.size)
+
         # Set the initial image
-        self.image = self.animations['idle'][0]
+        self.is_flipped = False
+        self.image = self.animations.frame('idle', 0)
+
+        # Spell effect frames, loaded up front so casting never hits the disk
+        self.teleport_images = [
+            #pygame.transform.scale(pygame.image.load('assets/teleport.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)),
+            load_image('assets/teleport2.png', (TILE_SIZE, TILE_SIZE)),
+            load_image('assets/teleport3.png', (TILE_SIZE, TILE_SIZE))
+        ]
+
+        self.lightning_images = [
+            load_image('assets/lightning.png', (TILE_SIZE * 4, TILE_SIZE * 4)),
+            load_image('assets/lightning2.png', (TILE_SIZE * 4, TILE_SIZE * 4)),
+            load_image('assets/lightning3.png', (TILE_SIZE * 4, TILE_SIZE * 4)),
+            load_image('assets/lightning4.png', (TILE_SIZE * 4, TILE_SIZE * 4))
+        ]
+
         
         self.is_moving = False
         self.is_attacking = False
@@ -72,22 +62,20 @@ class Player:
         self.cast_duration = 300  # 300 ms for cast animation
         
         self.attack_cooldown = 500  # Cooldown for attacks
-        self.last_attack_time = pygame.time.get_ticks()
+        self.last_attack_time = 0  # Simulation starts at 0, so the first attack waits one cooldown
+        self.last_cast_time = 0
         self.teleport_cooldown = 2000  # Cooldown for teleporting (in milliseconds)
-        self.last_teleport_time = pygame.time.get_ticks()  # Time of last teleport
+        self.last_teleport_time = 0  # Time of last teleport
+        self.previous_position = self.rect.topleft  # Position before the last simulation step, for interpolation
         self.aim_direction = pygame.math.Vector2(1, 0)
-        self.font = pygame.font.SysFont(None, 24)
         self.fireball_unlocked = False
         self.is_placing_lightning = False
         self.lightning_strike = None
         self.lightning_unlocked = False
         self.teleport_attack_unlocked = False
-        self.melee_attack_instance = None
     
-    def update_animation(self):
+    def update_animation(self, current_time):
         """Update the animation frame based on the current action."""
-        current_time = pygame.time.get_ticks()
-
         # Check if it's time to switch the frame
         if current_time - self.last_frame_switch >= self.frame_switch_time:
             self.current_frame = (self.current_frame + 1) % 2  # Toggle between frame 0 and 1
@@ -109,20 +97,16 @@ class Player:
         else:
             self.animation_state = 'idle'
 
-        # Update the image to the correct frame
-        self.image = self.animations[self.animation_state][self.current_frame]
-        
         # Flip the image if the player is moving or aiming left
         if self.aim_direction.x < 0:
             self.is_flipped = True
         elif self.aim_direction.x > 0:
             self.is_flipped = False
 
-        # Apply flipping if needed
-        if self.is_flipped:
-            self.image = pygame.transform.flip(self.image, True, False)
+        # Pick the correct frame, already mirrored when flipped
+        self.image = self.animations.frame(self.animation_state, self.current_frame, self.is_flipped)
 
-    def handle_movement(self, keys, walls, dungeon_width, dungeon_height, enemies):
+    def handle_movement(self, keys, collision_grid, dungeon_width, dungeon_height, enemies):
         movement_speed = 3
         direction = pygame.math.Vector2(0, 0)
         self.is_moving = False
@@ -151,11 +135,10 @@ class Player:
             new_y = self.rect.y  # Prevent vertical movement off the map
 
         # Check collisions with walls and enemies
-        if not self.check_collision((new_x, new_y), walls, enemies):
+        if not self.check_collision((new_x, new_y), collision_grid, enemies):
             self.rect.topleft = (new_x, new_y)
 
-    def teleport(self, screen, camera_offset, walls, dungeon_width, dungeon_height, dungeon, screen_width, screen_height, enemies, projectiles):
-        current_time = pygame.time.get_ticks()
+    def teleport(self, effects, collision_grid, dungeon_width, dungeon_height, dungeon, screen_width, screen_height, enemies, projectiles, current_time):
         if current_time - self.last_teleport_time < self.teleport_cooldown:
             return  # Teleport is on cooldown
 
@@ -174,18 +157,18 @@ class Player:
         self.rect.topleft = (teleport_x, teleport_y)
 
         # Check for collisions at the new position
-        if self.check_collision(self.rect.topleft, walls, enemies):
+        if self.check_collision(self.rect.topleft, collision_grid, enemies):
             self.rect.topleft = original_position
             return  # Collision detected, abort teleport
-        self.play_teleport_animation(screen, camera_offset, original_position)
+        self.previous_position = self.rect.topleft  # Jump straight there rather than sliding
+        effects.add(self.teleport_images, original_position, current_time)  # Flash where the player left from
         # Update the last teleport time
         self.last_teleport_time = current_time
-        self.teleport_sound.play()
+        sound_bank.play('teleport')
         #print("Teleport successful")
 
-    def teleport_attack(self, screen, camera_offset, walls, dungeon_width, dungeon_height, dungeon, screen_width, screen_height, enemies, projectiles):
+    def teleport_attack(self, effects, collision_grid, dungeon_width, dungeon_height, dungeon, screen_width, screen_height, hits, projectiles, enemies, current_time):
         """Teleport attack method which moves the player and damages enemies."""
-        current_time = pygame.time.get_ticks()
 
         if current_time - self.last_teleport_time >= self.teleport_cooldown:
             teleport_distance = TILE_SIZE * 3  # 3 tiles teleport distance
@@ -203,70 +186,19 @@ class Player:
             self.rect.topleft = (teleport_x, teleport_y)
 
             # Check for collisions at the new position
-            if self.check_collision(self.rect.topleft, walls, enemies):
+            if self.check_collision(self.rect.topleft, collision_grid, enemies):
                 self.rect.topleft = original_position
                 return  # Collision detected, abort teleport
 
-            # List to track enemies to remove
-            enemies_to_remove = []
-
-            # Now, apply damage and knockback to nearby enemies
-            for enemy in enemies:
-                enemy_position = pygame.Vector2(enemy.rect.center)
-                player_position = pygame.Vector2(self.rect.center)
-
-                distance = player_position.distance_to(enemy_position)
-
-                if distance <= TILE_SIZE * 3:  # Adjust damage range
-                    enemy.take_damage(25)  # Example damage value
-
-                    # Apply knockback to the enemy
-                    knockback_vector = (enemy_position - player_position).normalize() * TILE_SIZE
-                    enemy.rect.x += knockback_vector.x
-                    enemy.rect.y += knockback_vector.y
-
-                    # Check for collisions with other enemies after knockback
-                    for other_enemy in enemies:
-                        if other_enemy != enemy and enemy.rect.colliderect(other_enemy.rect):
-                            # If there is a collision, adjust the position to avoid overlap
-                            overlap_vector = pygame.Vector2(enemy.rect.center) - pygame.Vector2(other_enemy.rect.center)
-                            if overlap_vector.length() > 0:  # Avoid division by zero
-                                overlap_vector.normalize_ip()
-                                enemy.rect.x += overlap_vector.x * TILE_SIZE
-                                enemy.rect.y += overlap_vector.y * TILE_SIZE
-
-                    # If enemy's health is <= 0, mark it for removal and grant XP
-                    if enemy.health <= 0:
-                        enemies_to_remove.append(enemy)
-                        self.gain_xp(50)  # Grant XP for killing the enemy
-
-            # Remove the dead enemies from the main enemy list
-            for enemy in enemies_to_remove:
-                enemies.remove(enemy)
+            # Damage and knock back every enemy within three tiles; the hit stage applies it this tick
+            hits.add_circle(self.rect.center, TILE_SIZE * 3, 25, knockback=TILE_SIZE)
+            self.previous_position = self.rect.topleft  # Jump straight there rather than sliding
 
             self.last_teleport_time = current_time  # Update the last teleport time
-            self.play_teleport_animation(screen, camera_offset, original_position)
-            self.teleport_sound.play()  # Play the teleport sound
+            effects.add(self.teleport_images, original_position, current_time)  # Flash where the player left from
+            sound_bank.play('teleport')  # Play the teleport sound
             print("Teleport attack successful")
     
-    def play_teleport_animation(self, screen, camera_offset, original_position):
-        """Play the teleport animation at the given position."""
-        teleport_images = [
-            #pygame.transform.scale(pygame.image.load('assets/teleport.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)),
-            pygame.transform.scale(pygame.image.load(resource_path('assets/teleport2.png')).convert_alpha(), (TILE_SIZE, TILE_SIZE)),
-            pygame.transform.scale(pygame.image.load(resource_path('assets/teleport3.png')).convert_alpha(), (TILE_SIZE, TILE_SIZE))
-        ]
-
-        # Calculate the position for the animation (center it on the original position)
-        screen_x = original_position[0] - camera_offset[0]
-        screen_y = original_position[1] - camera_offset[1]
-
-        # Loop through each frame and display it with a slight delay
-        for image in teleport_images:
-            screen.blit(image, (screen_x, screen_y))
-            pygame.display.flip()  # Update the display
-            pygame.time.delay(100)  # Delay for 100 milliseconds per frame
-
     def update_aim_direction(self, keys):
         direction = pygame.math.Vector2(0, 0)
         if keys[pygame.K_LEFT]:
@@ -282,58 +214,31 @@ class Player:
             direction.normalize_ip()
             self.aim_direction = direction
 
-    def check_collision(self, new_pos, walls, enemies):
+    def check_collision(self, new_pos, collision_grid, enemies):
         """Check for collisions with walls or enemies at the new position."""
         future_rect = pygame.Rect(new_pos, (self.size, self.size))
 
-        # Check collision with walls
-        for wall in walls:
-            if future_rect.colliderect(wall):
-                return True
-
-        # Check collision with enemies
-        for enemy in enemies:
-            if future_rect.colliderect(enemy.rect):
-                return True
-
-        return False
-
-    def draw(self, screen, camera_offset):
-        self.update_animation()
-        screen_x = self.rect.x - camera_offset[0]
-        screen_y = self.rect.y - camera_offset[1]
-        screen.blit(self.image, (screen_x, screen_y))
-        if self.melee_attack_instance:
-            self.melee_attack_instance.draw(screen, camera_offset)
-        self.draw_health_and_mana(screen)
-        self.draw_xp_text(screen)
-        self.draw_level_text(screen)
-        self.draw_aim_arrow(screen, camera_offset)
-        if self.is_placing_lightning:
-            self.lightning_strike.draw(screen, camera_offset)
-
-    def draw_health_and_mana(self, screen):
-        base_bar_width = 200
-        bar_height = 20
+        # Check collision with walls (only the tiles under the rect)
+        if collision_grid.collides_rect(future_rect):
+            return True
 
-        health_bar_width = int(base_bar_width * (self.max_health / 100))
-        mana_bar_width = int(base_bar_width * (self.max_mana / 100))
+        # Check collision with enemies, straight from the store's position arrays
+        return enemies.collides(future_rect)
 
-        pygame.draw.rect(screen, (255, 0, 0), (10, 10, int(health_bar_width * (self.health / self.max_health)), bar_height))
-        pygame.draw.rect(screen, (255, 255, 255), (10, 10, health_bar_width, bar_height), 2)
+    def interpolated_position(self, alpha):
+        """Where to draw the player, alpha of the way from the previous simulation step to the current one."""
+        previous_x, previous_y = self.previous_position
+        return (previous_x + (self.rect.x - previous_x) * alpha,
+                previous_y + (self.rect.y - previous_y) * alpha)
 
-        pygame.draw.rect(screen, (0, 0, 255), (10, 40, int(mana_bar_width * (self.mana / self.max_mana)), bar_height))
-        pygame.draw.rect(screen, (255, 255, 255), (10, 40, mana_bar_width, bar_height), 2)
+    def queue_sprite(self, queue, alpha=1.0):
+        queue.add(PLAYER_LAYER, self.image, *self.interpolated_position(alpha))
 
-    def draw_xp_text(self, screen):
-        xp_text = f"XP: {self.xp} / {self.xp_for_next_level}"
-        xp_surface = self.font.render(xp_text, True, (0, 0, 0))
-        screen.blit(xp_surface, (10, 70))
-
-    def draw_level_text(self, screen):
-        level_text = f"Level: {self.level}"
-        level_surface = self.font.render(level_text, True, (0, 0, 0))
-        screen.blit(level_surface, (10, 100))
+    def draw_indicators(self, screen, camera_offset):
+        """The aim arrow and, while one is being placed, the lightning target; drawn over every sprite."""
+        self.draw_aim_arrow(screen, camera_offset)
+        if self.is_placing_lightning:
+            self.lightning_strike.draw(screen, camera_offset)
 
     def draw_aim_arrow(self, screen, camera_offset):
         arrow_length = 30
@@ -355,82 +260,63 @@ class Player:
             ]
             pygame.draw.polygon(screen, (0, 0, 0), [end_pos] + arrowhead_points)
 
-    def melee_attack(self, enemies):
+    def melee_attack(self, hits, effects, current_time):
         """Initiate a melee attack."""
-        current_time = pygame.time.get_ticks()
         if current_time - self.last_attack_time >= self.attack_cooldown:
             self.is_attacking = True
             self.last_attack_time = current_time
-            # Create the melee attack instance
-            self.melee_attack_instance = MeleeAttack(self.rect, self.aim_direction)
-            self.melee_attack_sound.play()  # Play the melee attack sound
-            kills = self.melee_attack_instance.check_collision(enemies)
-            if kills > 0:
-                self.gain_xp(50 * kills)
+            # The slash hits this tick and stays on screen for its duration
+            melee_attack = MeleeAttack(self.rect, self.aim_direction)
+            sound_bank.play('sword')  # Play the melee attack sound
+            hits.add_rect(melee_attack.rect, melee_attack.damage)
+            effects.add((melee_attack.slash_image,), melee_attack.rect.topleft, current_time, melee_attack.slash_duration)
         else:
             self.is_attacking = False  # Reset after the attack
 
-    def update(self):
-        """Update player and active melee attack."""
-        # Update the active melee attack if it exists
-        if self.melee_attack_instance:
-            self.melee_attack_instance.update()
-            if not self.melee_attack_instance.is_active:
-                self.melee_attack_instance = None 
+    def update(self, current_time):
+        """Advance the player's animation by one simulation step."""
+        self.update_animation(current_time)
                 
-    def ranged_attack(self, projectiles, screen_width, screen_height):
+    def ranged_attack(self, projectiles, screen_width, screen_height, current_time):
         """Perform a basic ranged attack."""
-        current_time = pygame.time.get_ticks()
         if current_time - self.last_attack_time >= self.attack_cooldown and self.mana >= 10:
             self.is_casting = True
             self.last_cast_time = current_time  # Track when the cast started
-            projectile = Projectile(
-                self.rect.centerx, 
-                self.rect.centery, 
-                self.aim_direction, 
-                screen_width, 
-                screen_height
-            )
-            projectiles.append(projectile)
+            projectiles.spawn(ENERGY, self.rect.centerx, self.rect.centery, self.aim_direction, screen_width, screen_height)
             self.use_mana(10)
             self.last_attack_time = current_time
-            self.spell_attack_sound.play()  # Play the melee attack sound
+            sound_bank.play('spell')  # Play the spell sound
         else:
             self.is_casting = False  # Reset casting after cooldown
     
-    def fireball_attack(self, projectiles, screen_width, screen_height):
+    def fireball_attack(self, projectiles, screen_width, screen_height, current_time):
         """Cast a fireball."""
-        current_time = pygame.time.get_ticks()
         fireball_mana_cost = 20  # Adjust mana cost for the fireball
 
         if current_time - self.last_attack_time >= self.attack_cooldown and self.mana >= fireball_mana_cost:
             self.is_casting = True
             self.last_cast_time = current_time  # Track when the cast started
-            fireball = Fireball(
-                self.rect.centerx, 
-                self.rect.centery, 
-                self.aim_direction, 
-                screen_width, 
-                screen_height
-            )
-            projectiles.append(fireball)
+            # Start the fireball directly in front of the player
+            fireball_size = PROJECTILE_KINDS[FIREBALL][1]
+            offset = self.aim_direction * (PLAYER_SIZE // 2 + fireball_size // 2)
+            projectiles.spawn(FIREBALL, self.rect.centerx + offset.x, self.rect.centery + offset.y, self.aim_direction, screen_width, screen_height)
             self.use_mana(fireball_mana_cost)
             self.last_attack_time = current_time
-            self.fireball_sound.play()  # Play the fireball sound
+            sound_bank.play('fireball')  # Play the fireball sound
         else:
             self.is_casting = False  # Reset casting after cooldown
     
     def unlock_fireball(self):
         self.fireball_unlocked = True
         
-    def start_lightning_strike(self, screen_width, screen_height):
+    def start_lightning_strike(self, screen_width, screen_height, current_time):
         """Initialize lightning strike mode and freeze player movement."""
         lightning_strike_mana_cost = 30  # Set the mana cost for lightning strike
 
         # Check if player has enough mana
         if self.mana >= lightning_strike_mana_cost:
             self.is_casting = True
-            self.last_cast_time = pygame.time.get_ticks()  # Track casting time
+            self.last_cast_time = current_time  # Track casting time
             self.is_placing_lightning = True
             self.lightning_strike = LightningStrike(self.rect.centerx, self.rect.centery, screen_width, screen_height)
             self.use_mana(lightning_strike_mana_cost)
@@ -438,37 +324,18 @@ class Player:
             print("Not enough mana to use Lightning Strike!")
             self.is_casting = False
 
-    def confirm_lightning_strike(self, enemies, screen, camera_offset): 
+    def confirm_lightning_strike(self, hits, effects, current_time):
         """Confirm the lightning strike, damage enemies, and exit lightning mode."""
         if self.lightning_strike:
             # Play the animation where the circle is
-            self.lightning_sound.play()
-            self.play_lightning_animation(screen, camera_offset)
-            struck_enemies = self.lightning_strike.check_enemies_in_range(enemies, self)
-            print(f"Lightning Strike hit {struck_enemies} enemies!")
+            sound_bank.play('thunder')
+            target = self.lightning_strike.target_position
+            effects.add(self.lightning_images, (target.x - TILE_SIZE * 2, target.y - TILE_SIZE * 2), current_time)  # Centred on the target
+            hits.add_circle(self.lightning_strike.target_position, self.lightning_strike.strike_radius, 200)
         self.is_placing_lightning = False
         self.lightning_strike = None
         self.is_casting = False
     
-    def play_lightning_animation(self, screen, camera_offset):
-        """Play the 4-part lightning strike animation in quick succession."""
-        lightning_images = [
-            pygame.transform.scale(pygame.image.load(resource_path('assets/lightning.png')).convert_alpha(), (TILE_SIZE * 4, TILE_SIZE * 4)),
-            pygame.transform.scale(pygame.image.load(resource_path('assets/lightning2.png')).convert_alpha(), (TILE_SIZE * 4, TILE_SIZE * 4)),
-            pygame.transform.scale(pygame.image.load(resource_path('assets/lightning3.png')).convert_alpha(), (TILE_SIZE * 4, TILE_SIZE * 4)),
-            pygame.transform.scale(pygame.image.load(resource_path('assets/lightning4.png')).convert_alpha(), (TILE_SIZE * 4, TILE_SIZE * 4))
-        ]
-
-        # Calculate the position where the animation should play (center it on the lightning strike target)
-        screen_x = self.lightning_strike.target_position.x - camera_offset[0] - (TILE_SIZE * 2)  # Centering the image
-        screen_y = self.lightning_strike.target_position.y - camera_offset[1] - (TILE_SIZE * 2)  # Centering the image
-
-        # Loop through each frame and display it with a slight delay
-        for image in lightning_images:
-            screen.blit(image, (screen_x, screen_y))
-            pygame.display.flip()  # Update the display
-            pygame.time.delay(100)
-
     def move_lightning_strike_target(self, direction):
         """Move the lightning strike targeting circle if in lightning strike mode."""
         if self.is_placing_lightning and self.lightning_strike:
@@ -521,9 +388,10 @@ class Player:
         print("Player died!")
         self.is_dead = True  # Set player to dead state
 
-    def reset(self, x, y, inventory):
+    def reset(self, x, y, inventory, current_time):
         """Reset player to initial state when restarting the game."""
         self.rect.topleft = (x, y)
+        self.previous_position = self.rect.topleft
         self.max_health = 100
         self.health = self.max_health
         self.max_mana = 50
@@ -537,8 +405,8 @@ class Player:
         self.lightning_unlocked = False
         self.teleport_attack_unlocked = False
         self.is_placing_lightning = False
-        self.last_attack_time = pygame.time.get_ticks()
-        self.last_teleport_time = pygame.time.get_ticks()
+        self.last_attack_time = current_time
+        self.last_teleport_time = current_time
         print("Game restarted! Player state reset.")
         # Refresh inventory to reflect reset state
         inventory.update_inventory(self)
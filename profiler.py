@@ -0,0 +1,121 @@
+import json
+import time
+from collections import deque
+import pygame
+
+class NullScope:
+    """What scope() hands out while profiling is off: entering and leaving it does nothing."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NULL_SCOPE = NullScope()
+
+class Scope:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+class Profiler:
+    """Named timing scopes around the frame's phases, kept for the last few seconds.
+
+    Wrap a phase in `with profiler.scope('name'):`. While disabled that costs one method call and
+    records nothing. The overlay shows recent frame times and per-phase milliseconds, and
+    export_chrome_trace() writes the kept history as Chrome trace events (chrome://tracing, Perfetto).
+    """
+    def __init__(self, history_seconds=10, graph_frames=240):
+        self.enabled = False
+        self.history_ns = history_seconds * 1_000_000_000
+        self.events = deque()  # (name, start ns, duration ns), oldest first
+        self.frame_times = deque(maxlen=graph_frames)  # Milliseconds per frame, for the graph
+        self.phase_ms = {}  # name -> milliseconds spent this frame
+        self.phase_averages = {}  # name -> smoothed milliseconds per frame, for the overlay
+        self.frame_start = None
+        self.font = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frame_start = None
+        if not self.enabled:
+            self.events.clear()
+            self.frame_times.clear()
+            self.phase_averages.clear()
+
+    def scope(self, name):
+        if not self.enabled:
+            return NULL_SCOPE
+        return Scope(self, name)
+
+    def record(self, name, start, end):
+        self.events.append((name, start, end - start))
+        self.phase_ms[name] = self.phase_ms.get(name, 0.0) + (end - start) / 1_000_000
+
+    def end_frame(self):
+        """Close the current frame: update the graph and averages and forget events older than the history."""
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        if self.frame_start is not None:
+            self.record('frame', self.frame_start, now)
+            self.frame_times.append((now - self.frame_start) / 1_000_000)
+        self.frame_start = now
+
+        # Smooth per-phase times so the overlay is readable; phases that stopped running fade out
+        averages = self.phase_averages
+        for name in averages.keys() | self.phase_ms.keys():
+            averages[name] = averages.get(name, 0.0) * 0.9 + self.phase_ms.get(name, 0.0) * 0.1
+        self.phase_ms = {}
+
+        events = self.events
+        while events and events[0][1] < now - self.history_ns:
+            events.popleft()
+
+    def export_chrome_trace(self, path):
+        """Write the kept history as Chrome trace-event JSON and return the number of events written."""
+        trace_events = [{'name': name, 'ph': 'X', 'ts': start / 1000, 'dur': duration / 1000, 'pid': 1, 'tid': 1}
+                        for name, start, duration in self.events]
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, file)
+        return len(trace_events)
+
+    def draw_overlay(self, screen, x=10, y=140, width=240, height=80):
+        """Draw the frame-time graph and the per-phase milliseconds."""
+        if not self.enabled:
+            return
+        if self.font is None:
+            self.font = pygame.font.SysFont(None, 20)
+
+        panel = pygame.Rect(x, y, width, height)
+        pygame.draw.rect(screen, (0, 0, 0), panel)
+        # Guides at 60 and 30 frames per second, with the graph scaled so 50 ms fills the panel
+        scale = height / 50
+        for budget, color in ((1000 / 60, (0, 160, 0)), (1000 / 30, (160, 160, 0))):
+            guide_y = panel.bottom - budget * scale
+            pygame.draw.line(screen, color, (panel.left, guide_y), (panel.right, guide_y))
+        frame_times = self.frame_times
+        if len(frame_times) > 1:
+            step = width / (frame_times.maxlen - 1)
+            points = [(panel.left + index * step, panel.bottom - min(height, frame_time * scale))
+                      for index, frame_time in enumerate(frame_times)]
+            pygame.draw.lines(screen, (255, 255, 255), False, points)
+
+        text_y = panel.bottom + 4
+        for name, milliseconds in sorted(self.phase_averages.items(), key=lambda item: -item[1]):
+            surface = self.font.render(f"{name}: {milliseconds:.2f} ms", True, (255, 255, 255), (0, 0, 0))
+            screen.blit(surface, (x, text_y))
+            text_y += surface.get_height()
+
+# Process-wide profiler shared by every module
+profiler = Profiler()
@@ -1,167 +1,164 @@
 import pygame
 import math
-import sys
-import os
+import numpy as np
 from settings import PLAYER_SIZE, TILE_SIZE
-
-def resource_path(relative_path):
-    """ Get the absolute path to the resource, works for dev and for PyInstaller """
-    try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
-
-class Projectile:
-    def __init__(self, x, y, direction, screen_width, screen_height, speed=5, size=None, damage=25):
-        self.size = size or TILE_SIZE  # Default size based on tile size
-
-        # Load both projectile images for animation
-        self.projectile_images = [
-            pygame.transform.scale(pygame.image.load(resource_path('assets/energy.png')).convert_alpha(), (self.size, self.size)),
-            pygame.transform.scale(pygame.image.load(resource_path('assets/energy2.png')).convert_alpha(), (self.size, self.size))
-        ]
-
-        self.rect = self.projectile_images[0].get_rect(center=(x, y))
-        self.direction = direction.normalize()  # Ensure the direction vector is normalized
-        self.speed = speed
-        self.screen_width = screen_width  # Store screen width for boundary checks
-        self.screen_height = screen_height  # Store screen height for boundary checks
-        self.damage = damage  # Damage dealt by the projectile
-
-        # Animation variables
-        self.animation_timer = 0
-        self.animation_interval = 200  # Switch image every 200 milliseconds
-        self.current_image_index = 0
-        self.image = self.rotate_image_by_direction(self.projectile_images[self.current_image_index], self.direction)  # Initialize with rotated image
-
-    def rotate_image_by_direction(self, image, direction):
-        """Rotate the image based on the direction of movement."""
-        # Calculate the angle of rotation in degrees
-        angle = math.degrees(math.atan2(-direction.y, direction.x))  # Negative y because Pygame's y-axis is inverted
-        adjusted_angle = angle - 225  # Adjust by 225 degrees to account for the initial bottom-left orientation
-        rotated_image = pygame.transform.rotate(image, adjusted_angle)
-        return rotated_image
-
-    def update_animation(self):
-        """Switch between projectile images to create an animation."""
-        current_time = pygame.time.get_ticks()
-        if current_time - self.animation_timer > self.animation_interval:
-            self.animation_timer = current_time
-            self.current_image_index = (self.current_image_index + 1) % len(self.projectile_images)  # Toggle between the two images
-
-        # Rotate the current image based on the direction of the projectile
-        self.image = self.rotate_image_by_direction(self.projectile_images[self.current_image_index], self.direction)
-
-    def move(self, walls):
-        """Move the projectile and check for collisions with walls."""
-        self.rect.x += self.direction.x * self.speed
-        self.rect.y += self.direction.y * self.speed
-
-        # Update the projectile animation
-        self.update_animation()
-
-        # Check for collision with walls
-        for wall in walls:
-            if self.rect.colliderect(wall):
-                return False  # Collision, projectile should be removed
-
-        return True  # No collision, projectile continues moving
-
-    def is_off_screen(self, camera_offset):
-        """Check if the projectile is off the screen, considering the camera offset."""
-        screen_x = self.rect.x - camera_offset[0]
-        screen_y = self.rect.y - camera_offset[1]
-        return not (0 <= screen_x <= self.screen_width and 0 <= screen_y <= self.screen_height)
-
-    def draw(self, screen, camera_offset):
-        """Draw the projectile, taking the camera offset into account."""
-        screen_x = self.rect.x - camera_offset[0]
-        screen_y = self.rect.y - camera_offset[1]
-        screen.blit(self.image, (screen_x, screen_y))  # Use the rotated image
-    
-class Fireball(Projectile):
-    def __init__(self, x, y, direction, screen_width, screen_height, speed=7, size=None):
-        if size is None:
-            size = PLAYER_SIZE * 1.5  # Default size for the fireball
-        self.size = size
-
-        # Calculate the fireball's initial position directly in front of the player
-        offset_x = direction.x * (PLAYER_SIZE // 2 + self.size // 2)
-        offset_y = direction.y * (PLAYER_SIZE // 2 + self.size // 2)
-
-        # Initialize the fireball's position
-        fireball_x = x + offset_x
-        fireball_y = y + offset_y
-
-        super().__init__(fireball_x, fireball_y, direction, screen_width, screen_height, speed, self.size)
-
-         # Load both fireball images for animation
-        self.fireball_images = [
-            pygame.transform.scale(pygame.image.load(resource_path('assets/fireball.png')).convert_alpha(), (self.size, self.size)),
-            pygame.transform.scale(pygame.image.load(resource_path('assets/fireball2.png')).convert_alpha(), (self.size, self.size))
-        ]
-        
-        self.damage = 100  # Fireball deals more damage
-        self.mana_cost = 30  # Fireball has a higher mana cost
-
-        # Track enemies that have already been hit
-        self.enemies_hit = set()  # This set will track enemies that have been hit to avoid multiple hits
-        
-        # Animation variables
-        self.animation_timer = 0
-        self.animation_interval = 200  # Switch image every 200 milliseconds
-        self.current_image_index = 0
-        
-        # Rotate the initial fireball image based on direction
-        self.image = self.rotate_image_by_direction(self.fireball_images[self.current_image_index], direction)
-        
-    def rotate_image_by_direction(self, image, direction):
-        """Rotate the image based on the direction of movement."""
-        # Calculate the angle of rotation in degrees
-        angle = math.degrees(math.atan2(-direction.y, direction.x))  # Negative y because Pygame's y-axis is inverted
-        adjusted_angle = angle - 225
-        rotated_image = pygame.transform.rotate(image, adjusted_angle)
-        return rotated_image
-    
-    def update_animation(self):
-        """Switch between fireball images to create an animation."""
-        current_time = pygame.time.get_ticks()
-        if current_time - self.animation_timer > self.animation_interval:
-            self.animation_timer = current_time
-            self.current_image_index = (self.current_image_index + 1) % len(self.fireball_images)  # Toggle between the two images
-            # Rotate the new image based on direction
-            self.image = self.rotate_image_by_direction(self.fireball_images[self.current_image_index], self.direction)
-
-    def check_collision(self, walls):
-        """Check if the fireball collides with any walls."""
-        for wall in walls:
-            if self.rect.colliderect(wall):
-                return True
-        return False
-
-    def move(self, walls, enemies, player):
-        """Move the fireball and check for collisions with walls and enemies."""
-        self.rect.x += self.direction.x * self.speed
-        self.rect.y += self.direction.y * self.speed
-        
-        self.update_animation()
-
-        # Check for collision with walls
-        if self.check_collision(walls):
-            return False  # Return False to indicate the fireball should be removed if it hits a wall
-
-        # Check for collision with enemies and deal damage
-        for enemy in enemies:
-            if self.rect.colliderect(enemy.rect) and enemy not in self.enemies_hit:
-                enemy.take_damage(self.damage)  # Inflict damage
-                self.enemies_hit.add(enemy)  # Mark the enemy as hit
-                if enemy.health <= 0:  # Ensure the enemy is removed if health is 0 or less
-                    enemies.remove(enemy)
-                    player.gain_xp(50)  # Grant XP for killing the enemy
-
-        return True  # Fireball keeps moving until it hits a wall or goes off-screen
+from assets import load_image, rotate_image
+from render_queue import PROJECTILE_LAYER
+from collision_grid import STOPS_PROJECTILES
+
+# Projectile kinds sharing one pool
+ENERGY = 0
+FIREBALL = 1
+ENEMY_BOLT = 2
+
+# kind -> (animation frames, size, speed, damage)
+PROJECTILE_KINDS = {
+    ENERGY: (('assets/energy.png', 'assets/energy2.png'), TILE_SIZE, 5, 25),
+    FIREBALL: (('assets/fireball.png', 'assets/fireball2.png'), int(PLAYER_SIZE * 1.5), 7, 100),
+    ENEMY_BOLT: (('assets/red.png', 'assets/red2.png'), int(TILE_SIZE // 1.2), 5, 15),
+}
+PLAYER_KINDS = (ENERGY, FIREBALL)
+ANIMATION_INTERVAL = 200  # Switch frame every 200 milliseconds
+
+def preload_images():
+    """Load every projectile and slash frame into the asset cache so the first shot doesn't hit the disk."""
+    for paths, size, speed, damage in PROJECTILE_KINDS.values():
+        for path in paths:
+            load_image(path, (size, size))
+    load_image('assets/slash.png', (50, 50))
+
+def rotate_image_by_direction(image, direction):
+    """Rotate the image based on the direction of movement."""
+    # Calculate the angle of rotation in degrees
+    angle = math.degrees(math.atan2(-direction.y, direction.x))  # Negative y because Pygame's y-axis is inverted
+    adjusted_angle = angle - 225  # Adjust by 225 degrees to account for the initial bottom-left orientation
+    return rotate_image(image, adjusted_angle)  # Shared, pre-rotated copy from the cache
+
+class ProjectilePool:
+    """Every live projectile in preallocated arrays, moved and culled in one batched pass per tick.
+
+    Slots are recycled through a free list, so firing reuses an old slot instead of building an object.
+    A projectile is removed when it hits a wall or leaves its bounds (fireballs only stop at walls).
+    """
+    def __init__(self, capacity=128):
+        self.capacity = 0
+        self.free = []  # Stack of unused slots
+        self.images = []  # slot -> pre-rotated animation frames
+        self.enemies_hit = {}  # fireball slot -> enemies it already burned, so each is hit once
+        self.x = self.y = self.dx = self.dy = self.previous_x = self.previous_y = np.zeros(0)
+        self.size = self.damage = self.bound_width = self.bound_height = self.frame = np.zeros(0, dtype=np.int32)
+        self.kind = np.zeros(0, dtype=np.uint8)
+        self.animation_timer = np.zeros(0, dtype=np.int64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.grow(capacity)
+
+    def grow(self, capacity):
+        """Enlarge every array to capacity slots, keeping live projectiles where they are."""
+        old = self.capacity
+        for name in ('x', 'y', 'dx', 'dy', 'previous_x', 'previous_y', 'size', 'damage', 'bound_width', 'bound_height', 'frame', 'kind', 'animation_timer', 'alive'):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:old] = array
+            setattr(self, name, grown)
+        self.images.extend([None] * (capacity - old))
+        self.free.extend(range(capacity - 1, old - 1, -1))  # Lowest slots are handed out first
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    def spawn(self, kind, x, y, direction, bound_width, bound_height):
+        """Fire a projectile of a kind centred on (x, y) and return its slot."""
+        if not self.free:
+            self.grow(self.capacity * 2)
+        slot = self.free.pop()
+        paths, size, speed, damage = PROJECTILE_KINDS[kind]
+        direction = direction.normalize()  # Ensure the direction vector is normalized
+        self.x[slot] = round(x) - size // 2
+        self.y[slot] = round(y) - size // 2
+        self.previous_x[slot] = self.x[slot]
+        self.previous_y[slot] = self.y[slot]
+        self.dx[slot] = direction.x * speed
+        self.dy[slot] = direction.y * speed
+        self.size[slot] = size
+        self.damage[slot] = damage
+        self.bound_width[slot] = bound_width  # Size of the area (relative to the camera) the projectile may leave
+        self.bound_height[slot] = bound_height
+        self.kind[slot] = kind
+        self.frame[slot] = 0
+        self.animation_timer[slot] = 0
+        self.alive[slot] = True
+        # Direction never changes after spawning, so every frame is rotated once up front
+        self.images[slot] = [rotate_image_by_direction(load_image(path, (size, size)), direction) for path in paths]
+        if kind == FIREBALL:
+            self.enemies_hit[slot] = set()
+        return slot
+
+    def release(self, slot):
+        """Return a slot to the free list."""
+        if self.alive[slot]:
+            self.alive[slot] = False
+            self.dx[slot] = self.dy[slot] = 0
+            self.images[slot] = None
+            self.enemies_hit.pop(slot, None)
+            self.free.append(slot)
+
+    def clear(self):
+        for slot in np.flatnonzero(self.alive).tolist():
+            self.release(slot)
+
+    def live_slots(self, kinds=None):
+        """Return the slots of live projectiles, optionally only those of the given kinds."""
+        live = self.alive
+        if kinds is not None:
+            # A comparison per kind; np.isin's setup costs more than that for the two or three kinds asked for
+            of_kind = self.kind == kinds[0]
+            for kind in kinds[1:]:
+                of_kind |= self.kind == kind
+            live = live & of_kind
+        return np.flatnonzero(live)
+
+    def rect(self, slot):
+        size = int(self.size[slot])
+        return pygame.Rect(int(self.x[slot]), int(self.y[slot]), size, size)
+
+    def update(self, collision_grid, camera_offset, now):
+        """Move and animate every projectile by one simulation step, then free the ones in walls or out of bounds."""
+        live = self.alive
+        self.previous_x[live] = self.x[live]
+        self.previous_y[live] = self.y[live]
+        # Positions snap to whole pixels every step, as they did when projectiles moved a Rect
+        self.x[live] = np.round(self.x[live] + self.dx[live])
+        self.y[live] = np.round(self.y[live] + self.dy[live])
+
+        due = live & (now - self.animation_timer > ANIMATION_INTERVAL)
+        self.animation_timer[due] = now
+        self.frame[due] = (self.frame[due] + 1) % 2
+
+        slots = np.flatnonzero(live)
+        x = self.x[slots].astype(np.int64)
+        y = self.y[slots].astype(np.int64)
+        size = self.size[slots]
+        in_wall = collision_grid.collides_rects(x, y, size, size, STOPS_PROJECTILES)
+        screen_x = x - camera_offset[0]
+        screen_y = y - camera_offset[1]
+        off_screen = ((screen_x < 0) | (screen_x > self.bound_width[slots]) |
+                      (screen_y < 0) | (screen_y > self.bound_height[slots]))
+        off_screen &= self.kind[slots] != FIREBALL  # Fireballs keep going until they hit a wall
+        for slot in slots[in_wall | off_screen].tolist():
+            self.release(slot)
+
+    def queue_sprites(self, queue, alpha=1.0):
+        """Queue every live, on-screen projectile, alpha of the way between the last two steps."""
+        slots = np.flatnonzero(self.alive)
+        previous_x, previous_y = self.previous_x[slots], self.previous_y[slots]
+        x = previous_x + (self.x[slots] - previous_x) * alpha
+        y = previous_y + (self.y[slots] - previous_y) * alpha
+        size = self.size[slots] * 1.5  # Rotated frames grow by up to the square root of two
+        visible = queue.cull(x, y, size, size)
+        images = self.images
+        frame = self.frame
+        queue.add_many(PROJECTILE_LAYER, [images[slot][frame[slot]] for slot in slots[visible].tolist()], x[visible], y[visible])
 
 class LightningStrike:
     def __init__(self, player_x, player_y, map_width, map_height, strike_radius=TILE_SIZE * 2):
@@ -188,32 +185,12 @@ class LightningStrike:
         screen_y = self.target_position.y - camera_offset[1]
         pygame.draw.circle(screen, self.color, (int(screen_x), int(screen_y)), self.strike_radius, 3)
 
-    def check_enemies_in_range(self, enemies, player):
-        """Damage enemies within the lightning strike circle, reward player XP, and remove dead enemies."""
-        struck_enemies = 0
-        enemies_to_remove = []  # Track enemies that should be removed
-        for enemy in enemies:
-            enemy_distance = self.target_position.distance_to(enemy.rect.center)
-            if enemy_distance <= self.strike_radius:
-                if enemy.take_damage(200): 
-                    print(f"Enemy took 200 damage, remaining health: {enemy.health}")
-                if enemy.health <= 0:  # Enemy is dead, mark for removal and reward XP
-                    enemies_to_remove.append(enemy)
-                    player.gain_xp(50)  # Reward 50 XP for each kill
-                    struck_enemies += 1
-
-        # Remove dead enemies from the list
-        for enemy in enemies_to_remove:
-            enemies.remove(enemy)
-        return struck_enemies
-
 class MeleeAttack:
     def __init__(self, player_rect, aim_direction, attack_range=50, damage=50):
         attack_offset_x = aim_direction.x * (player_rect.width // 2 + attack_range // 2)
         attack_offset_y = aim_direction.y * (player_rect.height // 2 + attack_range // 2)
 
-        slash_image = pygame.image.load(resource_path('assets/slash.png')).convert_alpha()
-        self.slash_image = pygame.transform.scale(slash_image, (attack_range, attack_range))
+        self.slash_image = load_image('assets/slash.png', (attack_range, attack_range))
         self.slash_image = self.rotate_slash_by_direction(self.slash_image, aim_direction)
 
         # Create a rectangle that represents the melee hitbox directly in front of the player
@@ -224,104 +201,11 @@ class MeleeAttack:
             attack_range
         )
         self.damage = damage
-        self.is_active = True
-        self.slash_duration = 200  # Slash lasts for 200 milliseconds
-        self.start_time = pygame.time.get_ticks()
+        self.slash_duration = 200  # Slash stays on screen for 200 milliseconds
 
     def rotate_slash_by_direction(self, image, direction):
         """Rotate the slash image based on the player's aim direction."""
         angle = math.degrees(math.atan2(-direction.y, direction.x))  # Calculate the angle
         adjusted_angle = angle - 45
-        rotated_image = pygame.transform.rotate(image, adjusted_angle)
-        return rotated_image
-
-    def update(self):
-        """Update the melee attack and check if it should still be active."""
-        current_time = pygame.time.get_ticks()
-        if current_time - self.start_time > self.slash_duration:
-            self.is_active = False  # Deactivate the slash effect after the duration ends
-
-    def draw(self, screen, camera_offset):
-        """Draw the slash effect if it's still active."""
-        if self.is_active and self.slash_image:
-            screen_x = self.rect.x - camera_offset[0]
-            screen_y = self.rect.y - camera_offset[1]
-            screen.blit(self.slash_image, (screen_x, screen_y))
-
-    def check_collision(self, enemies):
-        """Check if the melee attack hits any enemies and apply damage."""
-        kills = 0
-        for enemy in enemies[:]:
-            if self.rect.colliderect(enemy.rect):
-                if enemy.take_damage(self.damage):
-                    enemies.remove(enemy)
-                    kills += 1
-        return kills
-
-class EnemyProjectile(Projectile):
-    def __init__(self, x, y, direction, screen_width, screen_height, speed=5, size=None):
-        self.size = size or TILE_SIZE // 1.2  # Default size based on tile size
-
-        # Load both projectile images for animation
-        self.projectile_images = [
-            pygame.transform.scale(pygame.image.load(resource_path('assets/red.png')).convert_alpha(), (self.size, self.size)),
-            pygame.transform.scale(pygame.image.load(resource_path('assets/red2.png')).convert_alpha(), (self.size, self.size))
-        ]
-
-        self.rect = self.projectile_images[0].get_rect(center=(x, y))
-        self.direction = direction.normalize()  # Ensure the direction vector is normalized
-        self.speed = speed
-        self.screen_width = screen_width  # Store screen width for boundary checks
-        self.screen_height = screen_height  # Store screen height for boundary checks
-        self.damage = 15  # Set enemy projectile damage to 15
-
-        # Animation variables
-        self.animation_timer = 0
-        self.animation_interval = 200  # Switch image every 200 milliseconds
-        self.current_image_index = 0
-        self.image = self.rotate_image_by_direction(self.projectile_images[self.current_image_index], self.direction)  # Initialize with rotated image
-
-    def rotate_image_by_direction(self, image, direction):
-        """Rotate the image based on the direction of movement, accounting for the initial bottom-left orientation."""
-        # Calculate the angle of rotation in degrees
-        angle = math.degrees(math.atan2(-direction.y, direction.x))  # Negative y because Pygame's y-axis is inverted
-        adjusted_angle = angle - 225  # Adjust by 225 degrees to account for the initial bottom-left orientation
-        rotated_image = pygame.transform.rotate(image, adjusted_angle)
+        rotated_image = rotate_image(image, adjusted_angle)  # Shared, pre-rotated copy from the cache
         return rotated_image
-
-    def update_animation(self):
-        """Switch between projectile images to create an animation."""
-        current_time = pygame.time.get_ticks()
-        if current_time - self.animation_timer > self.animation_interval:
-            self.animation_timer = current_time
-            self.current_image_index = (self.current_image_index + 1) % len(self.projectile_images)  # Toggle between the two images
-
-        # Rotate the current image based on the direction of the projectile
-        self.image = self.rotate_image_by_direction(self.projectile_images[self.current_image_index], self.direction)
-
-    def move(self, walls):
-        """Move the projectile and check for collisions with walls."""
-        self.rect.x += self.direction.x * self.speed
-        self.rect.y += self.direction.y * self.speed
-
-        # Update the projectile animation
-        self.update_animation()
-
-        # Check for collision with walls
-        for wall in walls:
-            if self.rect.colliderect(wall):
-                return False  # Collision, projectile should be removed
-
-        return True  # No collision, projectile continues moving
-
-    def is_off_screen(self, camera_offset):
-        """Check if the projectile is off the screen, considering the camera offset."""
-        screen_x = self.rect.x - camera_offset[0]
-        screen_y = self.rect.y - camera_offset[1]
-        return not (0 <= screen_x <= self.screen_width and 0 <= screen_y <= self.screen_height)
-
-    def draw(self, screen, camera_offset):
-        """Draw the projectile, taking the camera offset into account."""
-        screen_x = self.rect.x - camera_offset[0]
-        screen_y = self.rect.y - camera_offset[1]
-        screen.blit(self.image, (screen_x, screen_y))  # Use the rotated image
\ No newline at end of file
@@ -0,0 +1,121 @@
+import struct
+import zlib
+import pygame
+
+# Held keys the simulation reads, one bit each
+KEY_BITS = {pygame.K_LEFT: 0x01, pygame.K_RIGHT: 0x02, pygame.K_UP: 0x04, pygame.K_DOWN: 0x08, pygame.K_RETURN: 0x10}
+RESTART_BIT = 0x20  # The game was restarted before this step
+PURCHASES_BIT = 0x40  # Inventory purchases made before this step follow the actions
+ACTIONS_BIT = 0x80  # Actions were performed this step; a count and their indexes, in press order, follow the flags
+
+# Recording header: magic, version, seed, screen size, dungeon size, step count, final state digest
+HEADER = struct.Struct('<4sBQHHHHII')
+MAGIC = b'DREC'
+VERSION = 2  # Version 1 stored actions as a bitmask, losing their order and repeats
+
+class HeldKeys:
+    """Stands in for pygame.key.get_pressed(): indexing by a key constant says whether it is held."""
+    def __init__(self, keys=()):
+        self.keys = set(keys)
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+    @classmethod
+    def from_mask(cls, mask):
+        return cls(key for key, bit in KEY_BITS.items() if mask & bit)
+
+    @classmethod
+    def from_pressed(cls, pressed):
+        """Snapshot the keys the simulation cares about from pygame.key.get_pressed()."""
+        return cls(key for key in KEY_BITS if pressed[key])
+
+    def mask(self):
+        mask = 0
+        for key in self.keys:
+            mask |= KEY_BITS.get(key, 0)
+        return mask
+
+class StepInput:
+    """Everything the player did that one simulation step consumes."""
+    def __init__(self, keys=None, actions=(), purchases=(), restart=False):
+        self.keys = keys if keys is not None else HeldKeys()
+        self.actions = list(actions)  # ACTIONS names, performed at the start of the step
+        self.purchases = list(purchases)  # Inventory indexes selected while the game was paused
+        self.restart = restart
+
+class InputRecorder:
+    """Appends every simulation step's input to a compact binary log.
+
+    A step is one byte of held keys and flags, then, only when there are any, its actions (a count and
+    their ACTIONS indexes in the order they were pressed) and its inventory purchases. The whole body
+    is zlib-compressed when saved, so an hour of play is a few kilobytes.
+    """
+    def __init__(self, seed, screen_size, dungeon_size):
+        self.seed = seed
+        self.screen_size = screen_size
+        self.dungeon_size = dungeon_size
+        self.body = bytearray()
+        self.steps = 0
+
+    def record(self, step_input, actions):
+        flags = step_input.keys.mask()
+        if step_input.restart:
+            flags |= RESTART_BIT
+        if step_input.purchases:
+            flags |= PURCHASES_BIT
+        if step_input.actions:
+            flags |= ACTIONS_BIT
+        self.body.append(flags)
+        if step_input.actions:
+            # Order matters: attacks share a cooldown and a lightning strike ignores whatever follows it
+            self.body += bytes((len(step_input.actions), *(actions.index(action) for action in step_input.actions)))
+        if step_input.purchases:
+            self.body += bytes((len(step_input.purchases), *step_input.purchases))
+        self.steps += 1
+
+    def save(self, path, digest=0):
+        """Write the log; digest is Game.state_digest() after the last step, checked on replay."""
+        header = HEADER.pack(MAGIC, VERSION, self.seed, *self.screen_size, *self.dungeon_size, self.steps, digest)
+        with open(path, 'wb') as file:
+            file.write(header)
+            file.write(zlib.compress(bytes(self.body), 9))
+
+class InputLog:
+    """A saved recording: the seed and sizes to rebuild the Game with, and the steps to feed it."""
+    def __init__(self, seed, screen_size, dungeon_size, steps, digest, body):
+        self.seed = seed
+        self.screen_size = screen_size
+        self.dungeon_size = dungeon_size
+        self.steps = steps
+        self.digest = digest
+        self.body = body
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            data = file.read()
+        magic, version, seed, screen_width, screen_height, dungeon_width, dungeon_height, steps, digest = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} input recording")
+        body = zlib.decompress(data[HEADER.size:])
+        return cls(seed, (screen_width, screen_height), (dungeon_width, dungeon_height), steps, digest, body)
+
+    def inputs(self, actions):
+        """Yield a StepInput for every recorded step, in order."""
+        body = self.body
+        position = 0
+        while position < len(body):
+            flags = body[position]
+            position += 1
+            step_actions = []
+            if flags & ACTIONS_BIT:
+                count = body[position]
+                step_actions = [actions[index] for index in body[position + 1:position + 1 + count]]
+                position += 1 + count
+            purchases = ()
+            if flags & PURCHASES_BIT:
+                count = body[position]
+                purchases = body[position + 1:position + 1 + count]
+                position += 1 + count
+            yield StepInput(HeldKeys.from_mask(flags), step_actions, purchases, bool(flags & RESTART_BIT))
@@ -0,0 +1,52 @@
+import numpy as np
+import pygame
+
+# Sprite layers, drawn back to front
+PROJECTILE_LAYER = 0
+ENEMY_LAYER = 1
+PLAYER_LAYER = 2
+EFFECT_LAYER = 3  # Slashes and flashes go over the player, as they always have
+LAYER_COUNT = 4
+
+class RenderQueue:
+    """Every sprite of a frame, culled to the camera view and drawn one blits call per layer.
+
+    Batched producers hand cull() their world positions and sizes as arrays and get back the
+    indices on screen, then queue just those with add_many(); one-off sprites use add(). Positions
+    go in as world coordinates and come out relative to the view. flush() draws the layers in order.
+    """
+    def __init__(self):
+        self.layers = [[] for _ in range(LAYER_COUNT)]  # (surface, screen position) per layer
+        self.view = pygame.Rect(0, 0, 0, 0)  # World rect on screen this frame
+
+    def __len__(self):
+        return sum(len(items) for items in self.layers)
+
+    def begin(self, view):
+        """Start a frame looking at the world rect view."""
+        self.view = pygame.Rect(view)
+
+    def cull(self, x, y, width, height):
+        """Indices of the boxes (world coordinate arrays) that overlap the view."""
+        view = self.view
+        on_screen = (x < view.right) & (x + width > view.left) & (y < view.bottom) & (y + height > view.top)
+        return np.flatnonzero(on_screen)
+
+    def add_many(self, layer, surfaces, x, y):
+        """Queue surfaces at the world positions in arrays x and y, already culled."""
+        screen_x = (x - self.view.x).tolist()
+        screen_y = (y - self.view.y).tolist()
+        self.layers[layer].extend(zip(surfaces, zip(screen_x, screen_y)))
+
+    def add(self, layer, surface, x, y):
+        """Queue one surface at a world position, unless it lies entirely off-screen."""
+        view = self.view
+        if x < view.right and x + surface.get_width() > view.left and y < view.bottom and y + surface.get_height() > view.top:
+            self.layers[layer].append((surface, (x - view.x, y - view.y)))
+
+    def flush(self, screen):
+        """Draw every layer, back to front, and empty the queue for the next frame."""
+        for items in self.layers:
+            if items:
+                screen.blits(items, False)  # No per-blit rects back; pygame-ce's fblits would be the same call
+                items.clear()
@@ -1,5 +1,7 @@
 # settings.py
 
 TILE_SIZE = 34 # 32 pixels for the tile size
-FPS = 60
+FPS = 60  # Simulation steps per second
 PLAYER_SIZE = 32  # 30 pixels for the player size
+MAX_FPS = 240  # Render cap; frames drawn between simulation steps are interpolated
+MAX_CATCH_UP_STEPS = 5  # Most simulation steps run in one frame before the backlog is dropped
@@ -0,0 +1,76 @@
+import pygame
+from settings import TILE_SIZE
+from assets import load_sound
+
+# Sound effects by name: (path, most copies playing at once, priority when stealing a voice)
+SOUNDS = {
+    'sword': ('assets/sword.mp3', 2, 2),
+    'spell': ('assets/basicspell.mp3', 2, 2),
+    'teleport': ('assets/teleport.mp3', 1, 2),
+    'fireball': ('assets/fireball.mp3', 2, 2),
+    'thunder': ('assets/thunder.mp3', 1, 3),
+    'enemy attack': ('assets/retro-click.mp3', 3, 1),
+}
+
+class SoundBank:
+    """Plays the shared, decoded-once SOUNDS through a limited set of mixer voices.
+
+    Each effect has a cap on copies playing at once; past it new plays are dropped. When every
+    mixer channel is busy a new sound takes over the oldest voice of equal or lower priority, or is
+    dropped if all of them matter more. Sounds with a world position are skipped when the source
+    is off-screen or farther than hearing_radius from the listener.
+    """
+    def __init__(self, sounds=SOUNDS, hearing_radius=TILE_SIZE * 12):
+        self.sounds = sounds
+        self.hearing_radius = hearing_radius
+        self.voices = []  # (channel, name, priority), oldest first
+        self.listener = None  # Player centre in world coordinates
+        self.view = None  # World rect on screen
+        self.played = 0
+        self.culled = 0
+        self.dropped = 0
+
+    def preload(self):
+        """Decode every effect now, so the first attack of a round doesn't stall on an MP3."""
+        for path, max_voices, priority in self.sounds.values():
+            load_sound(path)
+
+    def listen(self, position, view):
+        """Set where sounds are heard from and the part of the world on screen."""
+        self.listener = pygame.Vector2(position)
+        self.view = view
+
+    def play(self, name, position=None):
+        """Play the effect called name, from a world position or (for the player's own sounds) from everywhere."""
+        if not pygame.mixer.get_init():
+            return  # Headless or no audio device
+        path, max_voices, priority = self.sounds[name]
+        if position is not None and self.listener is not None:
+            if not self.view.collidepoint(position) or self.listener.distance_to(position) > self.hearing_radius:
+                self.culled += 1
+                return
+
+        voices = self.voices = [voice for voice in self.voices if voice[0].get_busy()]
+        if sum(1 for voice in voices if voice[1] == name) >= max_voices:
+            self.dropped += 1
+            return
+        channel = pygame.mixer.find_channel()
+        if channel is None:
+            # Take over the oldest voice that matters no more than this one
+            for index, voice in enumerate(voices):
+                if voice[2] <= priority:
+                    channel = voice[0]
+                    del voices[index]
+                    break
+            else:
+                self.dropped += 1
+                return
+        channel.play(load_sound(path))
+        voices.append((channel, name, priority))
+        self.played += 1
+
+    def report(self):
+        return f"Sound bank: {self.played} played, {self.culled} out of earshot, {self.dropped} dropped by voice limits"
+
+# Process-wide sound bank shared by every module
+sound_bank = SoundBank()
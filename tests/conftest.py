@@ -0,0 +1,20 @@
+import os
+import sys
+
+# Tests run without a window or sound card, from the repo root so asset paths resolve
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pygame
+import pytest
+
+@pytest.fixture(scope='session')
+def screen():
+    """A dummy display, which chunk and sprite surfaces are converted to."""
+    pygame.display.init()
+    surface = pygame.display.set_mode((1280, 720))
+    yield surface
+    pygame.display.quit()
@@ -0,0 +1,51 @@
+import pygame
+from settings import TILE_SIZE
+from dungeon import Dungeon
+from chunk_cache import ChunkCache
+
+def make_dungeon(chunk_tiles=4, max_chunks=2):
+    dungeon = Dungeon(12, 12, seed=1)
+    dungeon.chunk_cache = ChunkCache(dungeon, chunk_tiles, max_chunks)
+    return dungeon
+
+def test_least_recently_used_chunk_is_evicted(screen):
+    cache = make_dungeon().chunk_cache
+    first = cache.get_chunk(0, 0)
+    cache.get_chunk(1, 0)
+    assert cache.get_chunk(0, 0) is first  # A hit returns the cached surface and marks it recently used
+    cache.get_chunk(0, 1)
+    assert list(cache.chunks) == [(0, 0), (0, 1)]
+
+def test_edge_chunks_are_cut_to_the_map(screen):
+    dungeon = Dungeon(10, 6, seed=1)
+    cache = ChunkCache(dungeon, chunk_tiles=4)
+    assert cache.get_chunk(2, 1).get_size() == (2 * TILE_SIZE, 2 * TILE_SIZE)
+
+def test_set_tile_invalidates_only_its_chunk(screen):
+    dungeon = make_dungeon(max_chunks=8)
+    cache = dungeon.chunk_cache
+    for chunk_x in range(3):
+        cache.get_chunk(chunk_x, 0)
+    dungeon.set_tile(5, 1, '0')
+    assert (1, 0) not in cache.chunks
+    assert (0, 0) in cache.chunks and (2, 0) in cache.chunks
+
+def test_rebuilt_chunk_shows_the_new_tile(screen):
+    dungeon = make_dungeon(max_chunks=8)
+    cache = dungeon.chunk_cache
+    dungeon.set_tile(5, 1, '0')
+    cache.get_chunk(1, 0)
+    dungeon.set_tile(5, 1, '1')
+    chunk = cache.get_chunk(1, 0)
+    variant = dungeon.store.variants()[1, 5] % len(dungeon.wall_tiles)
+    wall = dungeon.wall_tiles[variant]
+    tile = chunk.subsurface(pygame.Rect(1 * TILE_SIZE, 1 * TILE_SIZE, TILE_SIZE, TILE_SIZE))
+    assert pygame.image.tobytes(tile.convert(), 'RGB') == pygame.image.tobytes(wall.convert(), 'RGB')
+
+def test_draw_builds_only_visible_chunks(screen):
+    dungeon = Dungeon(200, 200, seed=1)
+    cache = dungeon.chunk_cache
+    cache.draw(screen, (0, 0))
+    width, height = screen.get_size()
+    visible = (-(-width // cache.chunk_pixels)) * (-(-height // cache.chunk_pixels))
+    assert len(cache.chunks) == visible
@@ -0,0 +1,64 @@
+import numpy as np
+import pygame
+import pytest
+from enemy import Enemy, RangedEnemy, BossMeleeEnemy
+from enemy_store import EnemyStore, MELEE, RANGED, BOSS
+
+def make_store():
+    store = EnemyStore(2)  # Small, so the third enemy makes it grow
+    goblin = Enemy(0, 0, store=store)
+    mage = RangedEnemy(100, 0, 1280, 720, store=store)
+    boss = BossMeleeEnemy(200, 0, store=store)
+    return store, goblin, mage, boss
+
+def test_views_read_their_own_slots(screen):
+    store, goblin, mage, boss = make_store()
+    assert store.capacity == 4 and len(store) == 3
+    assert [enemy.slot for enemy in store] == [0, 1, 2]
+    assert store.kind[:3].tolist() == [MELEE, RANGED, BOSS]
+    assert (mage.x, boss.size, boss.health) == (100, 80, 200)
+
+def test_remove_moves_the_last_enemy_into_the_gap(screen):
+    store, goblin, mage, boss = make_store()
+    boss.health = 150
+    store.remove(goblin)
+    assert list(store) == [boss, mage]
+    assert boss.slot == 0 and boss.store is store
+    assert (boss.x, boss.size, boss.health) == (200, 80, 150)  # The moved view still reads its own state
+    assert store.kind[:2].tolist() == [BOSS, RANGED]
+
+def test_removed_enemy_keeps_a_detached_copy(screen):
+    store, goblin, mage, boss = make_store()
+    store.remove(mage)
+    assert mage.store is not store and mage.slot == 0
+    assert (mage.x, mage.health) == (100, 50)
+    mage.health = 1  # Writes go to the private copy, not to whichever enemy took its slot
+    assert boss.health == 200
+
+def test_remove_rejects_an_enemy_from_another_store(screen):
+    store, goblin, mage, boss = make_store()
+    stray = Enemy(0, 0)
+    with pytest.raises(ValueError):
+        store.remove(stray)
+    store.remove(goblin)
+    with pytest.raises(ValueError):
+        store.remove(goblin)  # Already gone
+    store.clear()
+    assert len(store) == 0 and list(store) == []
+
+def test_overlap_queries(screen):
+    store, goblin, mage, boss = make_store()
+    area = pygame.Rect(30, 10, 100, 10)  # Reaches into the goblin (0..40) and the mage (100..140)
+    assert store.query(area) == [goblin, mage]
+    assert store.query(area, exclude=goblin) == [mage]
+    assert store.collides(area)
+    assert not store.collides(pygame.Rect(30, 10, 60, 10), exclude=goblin)
+    assert not store.collides(pygame.Rect(0, 300, 40, 40))
+
+    # Rect 0 touches nothing, rect 1 sits on the mage and the boss, rect 2 on the goblin
+    x = np.array([0.0, 130.0, 10.0])
+    y = np.array([500.0, 10.0, 10.0])
+    rects, slots = store.overlapping(x, y, np.array([10.0, 80.0, 10.0]))
+    assert list(zip(rects.tolist(), slots.tolist())) == [(1, 1), (1, 2), (2, 0)]
+    empty_rects, empty_slots = EnemyStore().overlapping(x, y, np.array([10.0, 80.0, 10.0]))
+    assert len(empty_rects) == len(empty_slots) == 0
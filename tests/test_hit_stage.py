@@ -0,0 +1,70 @@
+from pygame.math import Vector2
+from enemy import Enemy, BossMeleeEnemy
+from enemy_store import EnemyStore
+from player import Player
+from projectile import ProjectilePool, ENERGY, FIREBALL, ENEMY_BOLT
+from hit_stage import HitStage
+
+RIGHT = Vector2(1, 0)
+
+def make_world(*positions):
+    """A player in the top-left corner, goblins at positions and an empty projectile pool."""
+    store = EnemyStore()
+    goblins = [Enemy(x, y, store=store) for x, y in positions]
+    return Player(0, 0), store, goblins, ProjectilePool(8), HitStage()
+
+def test_energy_shot_hits_the_first_enemy_and_stops(screen):
+    player, store, (first, second), projectiles, stage = make_world((400, 400), (410, 400))
+    shot = projectiles.spawn(ENERGY, 420, 420, RIGHT, 1280, 720)
+    stage.resolve(player, store, projectiles, 0)
+    assert (first.health, second.health) == (25, 50)
+    assert not projectiles.alive[shot]
+
+def test_shot_passes_an_enemy_killed_earlier_in_the_tick(screen):
+    player, store, (weak, behind), projectiles, stage = make_world((400, 400), (460, 400))
+    weak.health = 20
+    first = projectiles.spawn(ENERGY, 420, 420, RIGHT, 1280, 720)
+    second = projectiles.spawn(ENERGY, 420, 420, RIGHT, 1280, 720)
+    third = projectiles.spawn(ENERGY, 450, 420, RIGHT, 1280, 720)  # Overlaps both goblins
+    stage.resolve(player, store, projectiles, 0)
+    assert list(store) == [behind] and behind.health == 25  # The third shot moved on to the next goblin
+    assert not projectiles.alive[first] and not projectiles.alive[third]
+    assert projectiles.alive[second]  # Its only target died to the first shot, so it keeps flying
+
+def test_fireball_burns_each_enemy_once(screen):
+    player, store, goblins, projectiles, stage = make_world((400, 400), (410, 400))
+    for goblin in goblins:
+        goblin.health = 500
+    fireball = projectiles.spawn(FIREBALL, 420, 420, RIGHT, 1280, 720)
+    for now in (0, 16, 32):
+        stage.resolve(player, store, projectiles, now)
+    assert [goblin.health for goblin in goblins] == [400, 400]
+    assert projectiles.alive[fireball] and projectiles.enemies_hit[fireball] == set(goblins)
+
+def test_circle_hits_only_within_its_radius_and_knocks_back(screen):
+    # The second goblin's rect reaches the circle's bounding box, but its centre is 60 px away
+    player, store, (near, far), projectiles, stage = make_world((400, 400), (425, 440))
+    stage.add_circle((400, 420), 30, 10, knockback=40)
+    stage.resolve(player, store, projectiles, 0)
+    assert (near.health, far.health) == (40, 50)
+    assert (near.x, near.y) == (440, 400)  # Pushed straight away from the centre
+    assert (far.x, far.y) == (425, 440)
+    assert not stage.shapes  # Shapes only last one tick
+
+def test_kills_remove_the_enemy_and_grant_xp_once(screen):
+    player, store, (goblin,), projectiles, stage = make_world((400, 400))
+    boss = BossMeleeEnemy(600, 400, store=store)
+    stage.add_rect(goblin.rect, 60)
+    stage.add_rect(goblin.rect, 60)  # Lands on an enemy the first contact already killed
+    stage.add_rect(boss.rect, 300, xp=10, boss_xp=30)
+    stage.resolve(player, store, projectiles, 0)
+    assert len(store) == 0
+    assert player.xp == 50 + 30
+
+def test_enemy_bolts_hit_the_player(screen):
+    player, store, goblins, projectiles, stage = make_world()
+    bolt = projectiles.spawn(ENEMY_BOLT, *player.rect.center, RIGHT, 1280, 720)
+    miss = projectiles.spawn(ENEMY_BOLT, 600, 600, RIGHT, 1280, 720)
+    stage.resolve(player, store, projectiles, 0)
+    assert player.health == 85
+    assert not projectiles.alive[bolt] and projectiles.alive[miss]
@@ -0,0 +1,120 @@
+import numpy as np
+import pygame
+from generator import FLOOR, WALL
+from settings import TILE_SIZE
+from tilestore import TileStore
+from open_tiles import OpenTileIndex, label_regions
+
+# Two 3x3 rooms joined by a one-tile corridor at (3, 1)
+ROOMS = [
+    "...#...",
+    ".......",
+    "...#...",
+]
+
+def make_index(rows=ROOMS):
+    types = np.array([[WALL if tile == '#' else FLOOR for tile in row] for row in rows], dtype=np.uint8)
+    store = TileStore.from_types(types, np.random.default_rng(0))
+    index = OpenTileIndex(store)
+    index.refresh()
+    return store, index
+
+def set_open(store, index, x, y, is_open):
+    """Change a tile the way Dungeon.set_tile does."""
+    store.set_type(x, y, FLOOR if is_open else WALL)
+    index.set_open(x, y, is_open)
+
+def assert_consistent(store, index):
+    """Every region list holds exactly the open tiles with its label, at the slots positions says."""
+    listed = []
+    for label, (tiles, count) in index.regions.items():
+        for slot, tile in enumerate(tiles[:count].tolist()):
+            assert index.labels[tile] == label
+            assert index.positions[tile] == slot
+            listed.append(tile)
+    assert sorted(listed) == np.flatnonzero(store.walkable()).tolist()
+
+def test_label_regions_counts_connected_areas():
+    walkable = np.array([[1, 1, 0, 1], [0, 1, 0, 1], [1, 0, 0, 1]], dtype=bool)
+    labels, count = label_regions(walkable)
+    assert count == 3
+    assert labels[0, 0] == labels[1, 1] != labels[0, 3]
+    assert labels[2, 0] not in (0, labels[0, 0], labels[0, 3])
+    assert (labels[~walkable] == 0).all()
+
+def test_close_tile_swap_removes_from_its_region():
+    store, index = make_index()
+    label = index.region_at(0, 0)
+    size = index.region_size(label)
+    set_open(store, index, 0, 0, False)
+    assert index.region_size(label) == size - 1
+    assert index.region_at(0, 0) == 0
+    assert_consistent(store, index)
+    rng = np.random.default_rng(1)
+    assert all(index.random_tile(rng) != (0, 0) for _ in range(200))
+
+def test_open_tile_merges_the_regions_it_joins():
+    store, index = make_index()
+    set_open(store, index, 3, 1, False)
+    assert index.region_at(0, 0) != index.region_at(6, 0)
+    set_open(store, index, 3, 1, True)
+    assert not index.stale
+    assert index.region_at(0, 0) == index.region_at(6, 0) == index.region_at(3, 1)
+    assert index.region_size(index.region_at(0, 0)) == 19
+    assert_consistent(store, index)
+
+def test_closing_a_corridor_splits_the_region():
+    store, index = make_index()
+    set_open(store, index, 3, 1, False)
+    assert index.stale  # Re-labelled on the next query
+    left, right = index.region_at(0, 0), index.region_at(6, 0)
+    assert left and right and left != right
+    assert index.region_size(left) == index.region_size(right) == 9
+    assert_consistent(store, index)
+
+def test_index_is_labelled_on_first_query():
+    types = np.zeros((4, 4), dtype=np.uint8)
+    store = TileStore.from_types(types, np.random.default_rng(0))
+    index = OpenTileIndex(store)
+    set_open(store, index, 1, 1, False)  # Before any query, the edit only has to reach the store
+    assert index.region_size(index.largest_region()) == 15
+    assert_consistent(store, index)
+
+def make_dungeon(rows):
+    from dungeon import Dungeon  # Needs a display for its tile images
+    types = np.array([[WALL if tile == '#' else FLOOR for tile in row] for row in rows], dtype=np.uint8)
+    store = TileStore.from_types(types, np.random.default_rng(0))
+    return Dungeon(store.tiles_x, store.tiles_y, seed=0, store=store)
+
+def test_spawn_positions_pass_every_filter(screen):
+    dungeon = make_dungeon([
+        "##########",
+        "#........#",
+        "#........#",
+        "#.#####..#",
+        "#........#",
+        "##########",
+    ])
+    near = pygame.Rect(TILE_SIZE, TILE_SIZE, TILE_SIZE, TILE_SIZE)
+    view = pygame.Rect(0, 0, 6 * TILE_SIZE, 6 * TILE_SIZE)
+    # Only these 2x2 tile footprints are clear of walls, right of the view and 5 tiles from the player
+    allowed = {(6, 1), (7, 1), (7, 2), (7, 3)}
+    seen = set()
+    for _ in range(100):
+        x, y = dungeon.get_random_open_position(near=near, min_distance=5 * TILE_SIZE, outside_rect=view, size=2 * TILE_SIZE)
+        seen.add((x // TILE_SIZE, y // TILE_SIZE))
+    assert seen == allowed
+
+def test_no_spawn_position_when_nothing_fits(screen):
+    dungeon = make_dungeon([
+        "#####",
+        "#...#",
+        "#.#.#",
+        "#...#",
+        "#####",
+    ])
+    near = pygame.Rect(TILE_SIZE, TILE_SIZE, TILE_SIZE, TILE_SIZE)
+    assert dungeon.get_random_open_position(near=near, min_distance=10 * TILE_SIZE) is None
+    assert dungeon.get_random_open_position(outside_rect=pygame.Rect(0, 0, 5 * TILE_SIZE, 5 * TILE_SIZE)) is None
+    assert dungeon.get_random_open_position(size=2 * TILE_SIZE) is None  # Every 2x2 footprint touches a wall
+    assert dungeon.get_random_open_position() is not None
@@ -0,0 +1,61 @@
+import numpy as np
+from pygame.math import Vector2
+from settings import TILE_SIZE
+from generator import WALL
+from tilestore import TileStore
+from collision_grid import CollisionGrid
+from projectile import ProjectilePool, ENERGY, FIREBALL, ENEMY_BOLT, PLAYER_KINDS
+
+RIGHT = Vector2(1, 0)
+
+def make_grid(wall_column=6):
+    """An open 10x10 room with a wall all the way down one column."""
+    types = np.zeros((10, 10), dtype=np.uint8)
+    types[:, wall_column] = WALL
+    return CollisionGrid(TileStore.from_types(types, np.random.default_rng(0)))
+
+def test_released_slots_are_reused_lowest_first(screen):
+    pool = ProjectilePool(4)
+    slots = [pool.spawn(ENERGY, 60, 60, RIGHT, 1280, 720) for _ in range(3)]
+    assert slots == [0, 1, 2] and len(pool) == 3
+    pool.release(1)
+    pool.release(1)  # Releasing twice must not put the slot on the free list twice
+    assert len(pool) == 2
+    assert pool.spawn(FIREBALL, 60, 60, RIGHT, 1280, 720) == 1
+    assert pool.spawn(ENERGY, 60, 60, RIGHT, 1280, 720) == 3
+    assert len(pool.free) == 0
+
+def test_pool_grows_and_keeps_live_projectiles(screen):
+    pool = ProjectilePool(2)
+    for x in (60, 80, 100):
+        pool.spawn(ENERGY, x, 60, RIGHT, 1280, 720)
+    assert pool.capacity == 4 and len(pool) == 3
+    assert pool.x[:3].tolist() == [60 - TILE_SIZE // 2, 80 - TILE_SIZE // 2, 100 - TILE_SIZE // 2]
+
+def test_live_slots_filters_by_kind(screen):
+    pool = ProjectilePool(8)
+    for kind in (ENERGY, ENEMY_BOLT, FIREBALL, ENEMY_BOLT):
+        pool.spawn(kind, 60, 60, RIGHT, 1280, 720)
+    assert pool.live_slots().tolist() == [0, 1, 2, 3]
+    assert pool.live_slots(PLAYER_KINDS).tolist() == [0, 2]
+    assert pool.live_slots((ENEMY_BOLT,)).tolist() == [1, 3]
+    assert 2 in pool.enemies_hit
+    pool.clear()
+    assert len(pool) == 0 and pool.live_slots().size == 0
+    assert not pool.enemies_hit and pool.images == [None] * 8
+
+def test_update_frees_projectiles_in_walls_and_out_of_bounds(screen):
+    grid = make_grid()
+    pool = ProjectilePool(4)
+    shot = pool.spawn(ENERGY, 2 * TILE_SIZE, 2 * TILE_SIZE, RIGHT, 1280, 720)
+    # Both head down the open room, past the bottom of a short bounds box
+    stray = pool.spawn(ENERGY, 2 * TILE_SIZE, 2 * TILE_SIZE, Vector2(0, 1), 1280, 2 * TILE_SIZE)
+    fireball = pool.spawn(FIREBALL, 2 * TILE_SIZE, 2 * TILE_SIZE, Vector2(0, 1), 1280, 2 * TILE_SIZE)
+    for step in range(20):
+        pool.update(grid, (0, 0), step * 16)
+    assert not pool.alive[stray]  # Left the bottom of its bounds
+    assert pool.alive[shot] and pool.alive[fireball]  # Fireballs only stop at walls
+    for step in range(20, 60):
+        pool.update(grid, (0, 0), step * 16)
+    assert not pool.alive[shot]
+    assert pool.x[shot] + pool.size[shot] > 6 * TILE_SIZE  # Freed once it reached the wall column
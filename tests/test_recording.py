@@ -0,0 +1,44 @@
+import pygame
+import pytest
+from game import ACTIONS
+from recording import HeldKeys, StepInput, InputRecorder, InputLog
+import headless
+
+def test_steps_survive_a_save_and_load(tmp_path):
+    steps = [
+        StepInput(),
+        StepInput(HeldKeys((pygame.K_LEFT, pygame.K_UP)), ["Fireball"]),
+        StepInput(HeldKeys((pygame.K_RETURN,)), ["Melee Attack", "Lightning Strike"], purchases=(2, 0, 5)),
+        StepInput(restart=True),
+        StepInput(actions=["Ranged Attack", "Melee Attack"]),  # Not in ACTIONS order
+        StepInput(actions=["Lightning Strike", "Teleport", "Lightning Strike"], purchases=(1,)),
+    ]
+    recorder = InputRecorder(1234, (1280, 720), (100, 80))
+    for step_input in steps:
+        recorder.record(step_input, ACTIONS)
+    path = tmp_path / 'session.drec'
+    recorder.save(path, digest=0xDEADBEEF)
+
+    log = InputLog.load(path)
+    assert (log.seed, log.screen_size, log.dungeon_size) == (1234, (1280, 720), (100, 80))
+    assert (log.steps, log.digest) == (6, 0xDEADBEEF)
+    loaded = list(log.inputs(ACTIONS))
+    assert len(loaded) == len(steps)
+    for original, replayed in zip(steps, loaded):
+        assert replayed.keys.keys == original.keys.keys
+        assert replayed.actions == original.actions
+        assert list(replayed.purchases) == list(original.purchases)
+        assert replayed.restart == original.restart
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'not_a_recording.drec'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        InputLog.load(path)
+
+def test_replay_ends_in_the_recorded_state(screen, tmp_path):
+    path = tmp_path / 'session.drec'
+    recorded = headless.run(600, seed=7, record_path=path)
+    replayed = headless.replay(path)
+    assert replayed['digest_matches']
+    assert (replayed['steps'], replayed['xp'], replayed['health']) == (recorded['steps'], recorded['xp'], recorded['health'])
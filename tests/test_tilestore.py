@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from generator import FLOOR, WALL
+from tilestore import TileStore, WALKABLE, BLOCKS_PROJECTILES, HEADER, MAGIC
+from dungeon import Dungeon
+
+def make_store(seed=0, size=(9, 13)):
+    rng = np.random.default_rng(seed)
+    types = (rng.random(size) < 0.4).astype(np.uint8)
+    return TileStore.from_types(types, rng)
+
+def test_flags_follow_the_tile_type():
+    store = make_store()
+    walls = store.types() == WALL
+    assert ((store.data & WALKABLE) != 0).tolist() == (~walls).tolist()
+    assert ((store.data & BLOCKS_PROJECTILES) != 0).tolist() == walls.tolist()
+
+def test_set_type_keeps_the_variant_and_refreshes_flags():
+    store = make_store()
+    variants = store.variants().copy()
+    for x, y in ((0, 0), (4, 3), (12, 8)):
+        store.set_type(x, y, WALL)
+        assert store.tile_type(x, y) == WALL and not store.walkable()[y, x]
+        store.set_type(x, y, FLOOR)
+        assert store.tile_type(x, y) == FLOOR and store.walkable()[y, x]
+        assert not store.data[y, x] & BLOCKS_PROJECTILES
+    assert (store.variants() == variants).all()
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_save_load_round_trip(tmp_path, use_mmap):
+    store = make_store()
+    path = tmp_path / 'map.dngn'
+    store.save(path)
+    loaded = TileStore.load(path, use_mmap)
+    assert (loaded.tiles_x, loaded.tiles_y) == (store.tiles_x, store.tiles_y)
+    assert (np.asarray(loaded.data) == store.data).all()
+
+def test_mapped_edits_never_reach_the_file(tmp_path):
+    store = make_store()
+    path = tmp_path / 'map.dngn'
+    store.save(path)
+    mapped = TileStore.load(path, use_mmap=True)
+    mapped.set_type(2, 2, WALL if mapped.tile_type(2, 2) == FLOOR else FLOOR)
+    assert (TileStore.load(path).data == store.data).all()
+
+def test_load_rejects_bad_files(tmp_path):
+    path = tmp_path / 'map.dngn'
+    path.write_bytes(b'DN')
+    with pytest.raises(ValueError, match='too short'):
+        TileStore.load(path)
+    path.write_bytes(HEADER.pack(b'NOPE', 1, 0, 2, 2) + bytes(4))
+    with pytest.raises(ValueError, match='not a map file'):
+        TileStore.load(path)
+    path.write_bytes(HEADER.pack(MAGIC, 99, 0, 2, 2) + bytes(4))
+    with pytest.raises(ValueError, match='version'):
+        TileStore.load(path)
+    path.write_bytes(HEADER.pack(MAGIC, 1, 0, 2, 2) + bytes(3))
+    with pytest.raises(ValueError, match='truncated'):
+        TileStore.load(path)
+
+def test_dungeon_set_tile_round_trips_through_a_saved_map(screen, tmp_path):
+    dungeon = Dungeon(20, 15, seed=3)
+    dungeon.set_tile(4, 5, '1')
+    dungeon.set_tile(6, 7, '0')
+    path = tmp_path / 'map.dngn'
+    dungeon.save(path)
+    loaded = Dungeon.load(path)
+    assert [list(row) for row in loaded.layout] == [list(row) for row in dungeon.layout]
+    assert loaded.layout[5][4] == '1' and loaded.layout[7][6] == '0'
+    assert loaded.collision_grid.is_solid_tile(4, 5) and not loaded.collision_grid.is_solid_tile(6, 7)
+
+def test_layout_writes_keep_the_dungeon_in_sync(screen):
+    dungeon = Dungeon(20, 15, seed=3)
+    dungeon.layout[5][5] = '0'
+    label = dungeon.open_tiles.region_at(5, 5)
+    version = dungeon.collision_grid.version
+    dungeon.chunk_cache.get_chunk(0, 0)
+    dungeon.layout[5][5] = '1'
+    assert dungeon.store.tile_type(5, 5) == WALL and dungeon.layout[5][5] == '1'
+    assert dungeon.open_tiles.region_at(5, 5) == 0
+    assert 5 * dungeon.tiles_x + 5 not in dungeon.open_tiles.region_tiles().tolist()
+    assert 5 * dungeon.tiles_x + 5 not in dungeon.open_tiles.region_tiles(label).tolist()
+    assert dungeon.collision_grid.version > version and dungeon.collision_grid.is_solid_tile(5, 5)
+    assert (0, 0) not in dungeon.chunk_cache.chunks
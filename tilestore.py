@@ -0,0 +1,97 @@
+import struct
+import numpy as np
+from generator import FLOOR, WALL
+
+# Bit layout of a tile byte
+TYPE_MASK = 0x03  # Bits 0-1: tile type (FLOOR / WALL)
+VARIANT_SHIFT = 2
+VARIANT_MASK = 0x1C  # Bits 2-4: image variant 0-7, wrapped to the number of images for the type
+WALKABLE = 0x20
+BLOCKS_PROJECTILES = 0x40  # Bit 7 is unused
+
+VARIANT_COUNT = 8
+TYPE_FLAGS = {
+    FLOOR: WALKABLE,
+    WALL: BLOCKS_PROJECTILES,
+}
+
+# File header: magic, format version, reserved, width, height (little-endian)
+MAGIC = b'DNGN'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+
+# Lookup table from a type value to its flag bits, so encoding is one vectorized index
+FLAG_TABLE = np.zeros(TYPE_MASK + 1, dtype=np.uint8)
+for tile_type, flags in TYPE_FLAGS.items():
+    FLAG_TABLE[tile_type] = flags
+
+def encode(tile_type, variant):
+    """Pack a tile type and image variant into a tile byte."""
+    return tile_type | (variant % VARIANT_COUNT) << VARIANT_SHIFT | TYPE_FLAGS[tile_type]
+
+class TileStore:
+    """One byte per tile holding type, image variant and the walkable and blocks-projectiles flags."""
+    def __init__(self, data):
+        self.data = data  # (tiles_y, tiles_x) uint8 array, possibly memory-mapped
+        self.tiles_y, self.tiles_x = data.shape
+        # Flat memoryview for fast per-tile reads from Python (plain ints, no numpy scalars)
+        self.cells = memoryview(data.reshape(-1))
+
+    @classmethod
+    def from_types(cls, types, rng):
+        """Build a store from a FLOOR/WALL array, picking a random image variant for every tile."""
+        types = types.astype(np.uint8) & TYPE_MASK
+        variants = rng.integers(0, VARIANT_COUNT, types.shape, dtype=np.uint8)
+        return cls(types | (variants << VARIANT_SHIFT) | FLAG_TABLE[types])
+
+    def types(self):
+        return self.data & TYPE_MASK
+
+    def variants(self):
+        return (self.data & VARIANT_MASK) >> VARIANT_SHIFT
+
+    def walkable(self):
+        return (self.data & WALKABLE) != 0
+
+    def tile_type(self, tile_x, tile_y):
+        return self.cells[tile_y * self.tiles_x + tile_x] & TYPE_MASK
+
+    def set_type(self, tile_x, tile_y, tile_type):
+        """Change a tile's type, keeping its image variant and refreshing its flags."""
+        index = tile_y * self.tiles_x + tile_x
+        variant = (self.cells[index] & VARIANT_MASK) >> VARIANT_SHIFT
+        self.cells[index] = encode(tile_type, variant)
+
+    def nbytes(self):
+        return self.data.nbytes
+
+    def save(self, path):
+        """Write the map as a versioned header followed by the raw tile bytes."""
+        with open(path, 'wb') as map_file:
+            map_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, self.tiles_x, self.tiles_y))
+            map_file.write(np.ascontiguousarray(self.data).tobytes())
+
+    @classmethod
+    def load(cls, path, use_mmap=False):
+        """Read a saved map. With use_mmap the tiles are paged in from disk on demand
+        (copy-on-write, so edits during play never touch the file). Collision, flow fields and
+        chunk drawing read only the tiles they need; the open-tile index reads the whole map
+        once, the first time it is asked for a region."""
+        with open(path, 'rb') as map_file:
+            header = map_file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path} is too short to be a map file")
+        magic, version, _, tiles_x, tiles_y = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a map file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has map format version {version}, expected {FORMAT_VERSION}")
+
+        if use_mmap:
+            data = np.memmap(path, dtype=np.uint8, mode='c', offset=HEADER.size, shape=(tiles_y, tiles_x))
+        else:
+            data = np.fromfile(path, dtype=np.uint8, count=tiles_x * tiles_y, offset=HEADER.size)
+            if data.size != tiles_x * tiles_y:
+                raise ValueError(f"{path} is truncated")
+            data = data.reshape(tiles_y, tiles_x)
+        return cls(data)